@@ -0,0 +1,381 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from json import dump, load
+from pathlib import Path
+from platform import platform, python_version
+from sys import exit as sys_exit
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Optional
+
+try:
+    from resource import getrusage, RUSAGE_CHILDREN, RUSAGE_SELF
+except ImportError:
+    getrusage = None
+
+try:
+    from PIL import Image, ImageDraw
+
+    from modules.Debug import log, LOG_FILE
+    from modules.ImageMagickInterface import ImageMagickInterface
+    from modules.ImageMagickTelemetry import ImageMagickTelemetry
+    from modules.ImageMagickWorkerPool import ImageMagickWorkerPool
+    from modules.TitleCard import TitleCard
+    from modules import global_objects
+except ImportError:
+    print(f'Required Python packages are missing - execute "pipenv install"')
+    sys_exit(1)
+
+"""Default file (alongside the logs) the benchmark results are written to"""
+DEFAULT_OUTPUT_FILE = LOG_FILE.parent / 'benchmark.json'
+
+"""Default percentage slowdown which is flagged in compare mode"""
+DEFAULT_THRESHOLD = 10.0
+
+"""Dimensions of the synthetic source images"""
+SOURCE_DIMENSIONS = (3840, 2160)
+
+"""Synthetic source images every card type is benchmarked with"""
+SOURCES = ('gradient', 'detailed')
+
+"""Titles every card type is benchmarked with"""
+TITLES = {
+    'short': 'Pilot',
+    'long': 'The One Where Everybody Finds Out About the Very Long Title',
+    'multiline': 'The Beginning\nof the End',
+    'non_latin': 'Добро пожаловать в Токио',
+}
+
+
+def create_sources(directory: Path) -> tuple[dict[str, Path], Path]:
+    """
+    Create the synthetic source images (and logo) all cards are
+    benchmarked against. These are generated deterministically, so every
+    benchmark renders identical inputs.
+
+    Args:
+        directory: Directory to write the images to.
+
+    Returns:
+        Tuple of the dictionary of source names to source images, and
+        the path to the logo image.
+    """
+
+    width, height = SOURCE_DIMENSIONS
+    sources = {}
+
+    # Smooth (easily compressed) gradient
+    gradient = Image.linear_gradient('L').resize((width, height))
+    sources['gradient'] = directory / 'gradient.jpg'
+    blue = Image.new('L', (width, height), 96)
+    Image.merge('RGB', (gradient, gradient.rotate(180), blue)).save(
+        sources['gradient'], quality=95,
+    )
+
+    # Detailed (poorly compressed) pattern of shapes
+    detailed = Image.new('RGB', (width, height), (20, 24, 32))
+    draw = ImageDraw.Draw(detailed)
+    for index in range(400):
+        x, y = (index * 397) % width, (index * 211) % height
+        size = 40 + (index * 37) % 240
+        color = ((index * 53) % 256, (index * 97) % 256, (index * 151) % 256)
+        draw.ellipse((x, y, x + size, y + size), fill=color, outline='white')
+    sources['detailed'] = directory / 'detailed.jpg'
+    detailed.save(sources['detailed'], quality=95)
+
+    # Transparent logo
+    logo = Image.new('RGBA', (1200, 400), (0, 0, 0, 0))
+    ImageDraw.Draw(logo).rounded_rectangle(
+        (0, 0, 1199, 399), radius=80, fill=(230, 180, 40, 255),
+    )
+    logo_file = directory / 'logo.png'
+    logo.save(logo_file)
+
+    return sources, logo_file
+
+
+def get_card_types(identifiers: Optional[list[str]]) -> dict[str, type]:
+    """
+    Get the card types to benchmark. Card types with multiple
+    identifiers are only benchmarked under their first identifier.
+
+    Args:
+        identifiers: Identifiers of the card types to benchmark. If
+            None, all card types are benchmarked.
+
+    Returns:
+        Dictionary of card type identifiers to CardType classes.
+    """
+
+    card_types = {}
+    for identifier, card_class in TitleCard.CARD_TYPES.items():
+        if identifiers is not None and identifier not in identifiers:
+            continue
+        if card_class not in card_types.values():
+            card_types[identifier] = card_class
+
+    return card_types
+
+
+def benchmark_card_type(
+        identifier: str,
+        directory: Path,
+        iterations: int,
+        imagemagick_arguments: dict[str, Any],
+    ) -> dict[str, Any]:
+    """
+    Benchmark the creation of the given card type. This is executed in
+    its own process, so that the peak memory usage of ImageMagick can be
+    attributed to this card type.
+
+    Args:
+        identifier: Identifier of the card type to benchmark.
+        directory: Directory containing the synthetic source images, and
+            to write all created cards to.
+        iterations: How many times to create each card.
+        imagemagick_arguments: Overrides of the ImageMagickInterface
+            arguments.
+
+    Returns:
+        Dictionary of the benchmark results.
+    """
+
+    # Record all commands executed by this card type
+    for attribute, value in imagemagick_arguments.items():
+        setattr(global_objects.pp, attribute, value)
+    telemetry = ImageMagickTelemetry(directory)
+    global_objects.set_imagemagick_telemetry(telemetry)
+
+    card_class = TitleCard.CARD_TYPES[identifier]
+    sources, logo_file = create_sources(directory)
+    cards, failures, output_bytes, wall_time = 0, 0, 0, 0.0
+    for source_name, source_file in sources.items():
+        for title_name, title in TITLES.items():
+            for iteration in range(iterations):
+                card_file = directory / (
+                    f'{identifier}-{source_name}-{title_name}-{iteration}'
+                    f'{TitleCard.DEFAULT_CARD_EXTENSION}'
+                ).replace(' ', '_')
+                card_file.unlink(missing_ok=True)
+
+                start = perf_counter()
+                try:
+                    card = card_class(
+                        source_file=source_file,
+                        card_file=card_file,
+                        title_text=title,
+                        season_text='Season 1',
+                        episode_text='Episode 1',
+                        font_color=card_class.TITLE_COLOR,
+                        font_file=card_class.TITLE_FONT,
+                        logo=logo_file,
+                        logo_file=logo_file,
+                        season_number=1,
+                        episode_number=1,
+                        abs_number=1,
+                        watched=True,
+                    )
+                    if card.valid:
+                        card.create()
+                except Exception: # pylint: disable=broad-except
+                    log.exception(f'Error creating {identifier} card')
+                wall_time += perf_counter() - start
+
+                # Record output
+                cards += 1
+                if card_file.exists():
+                    output_bytes += card_file.stat().st_size
+                else:
+                    failures += 1
+
+    # Terminate any persistent workers so their memory usage is counted
+    ImageMagickWorkerPool.shutdown_all()
+
+    # Peak resident memory (kilobytes) of ImageMagick and this process
+    peak_rss, peak_imagemagick_rss = None, None
+    if getrusage is not None:
+        peak_rss = getrusage(RUSAGE_SELF).ru_maxrss
+        peak_imagemagick_rss = getrusage(RUSAGE_CHILDREN).ru_maxrss
+
+    return {
+        'card_type': card_class.__name__,
+        'cards': cards,
+        'failures': failures,
+        'wall_time': round(wall_time, 4),
+        'wall_time_per_card': round(wall_time / max(cards, 1), 4),
+        'imagemagick_processes': sum(
+            stats['commands'] for stats in telemetry.as_dict().values()
+        ),
+        'peak_rss_kb': peak_rss,
+        'peak_imagemagick_rss_kb': peak_imagemagick_rss,
+        'output_bytes': output_bytes,
+    }
+
+
+def compare(
+        baseline: dict[str, Any],
+        results: dict[str, Any],
+        threshold: float,
+    ) -> list[str]:
+    """
+    Compare the given benchmark results against a baseline, logging the
+    change in the wall time of each card type.
+
+    Args:
+        baseline: Baseline benchmark results.
+        results: New benchmark results.
+        threshold: Percentage slowdown (per card) which is flagged as a
+            regression.
+
+    Returns:
+        List of the identifiers of the card types which regressed.
+    """
+
+    regressions = []
+    for identifier, result in results['card_types'].items():
+        if (previous := baseline['card_types'].get(identifier)) is None:
+            log.info(f'{identifier:>16}: no baseline')
+            continue
+
+        old = previous['wall_time_per_card']
+        new = result['wall_time_per_card']
+        change = 0.0 if old <= 0 else (new - old) / old * 100
+        message = (
+            f'{identifier:>16}: {old:.3f}s -> {new:.3f}s per card ({change:+.1f}%)'
+            f', {previous["imagemagick_processes"]} -> '
+            f'{result["imagemagick_processes"]} processes'
+        )
+        if change > threshold:
+            log.warning(f'{message} - REGRESSION')
+            regressions.append(identifier)
+        else:
+            log.info(message)
+
+    return regressions
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+
+    parser = ArgumentParser(
+        description='Benchmark title card rendering across every card type'
+    )
+    parser.add_argument(
+        '--card-types',
+        type=lambda s: str(s).lower(),
+        nargs='+',
+        default=None,
+        metavar='IDENTIFIER',
+        help='Which card types to benchmark. Defaults to all card types')
+    parser.add_argument(
+        '-n', '--iterations',
+        type=int,
+        default=1,
+        metavar='N',
+        help='How many times to create each card')
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=DEFAULT_OUTPUT_FILE,
+        metavar='FILE',
+        help=f'File to write the benchmark results to. Defaults to '
+             f'"{DEFAULT_OUTPUT_FILE.resolve()}"')
+    parser.add_argument(
+        '--compare',
+        type=Path,
+        default=None,
+        metavar='BASELINE',
+        help='Baseline benchmark results to compare these results against')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        metavar='PERCENT',
+        help=f'Percentage slowdown flagged as a regression when comparing. '
+             f'Defaults to {DEFAULT_THRESHOLD}')
+    parser.add_argument(
+        '--imagemagick-container',
+        type=str,
+        default=None,
+        metavar='CONTAINER',
+        help='Docker container to execute ImageMagick commands in')
+    parser.add_argument(
+        '--use-magick-prefix',
+        action='store_true',
+        help='Prefix ImageMagick commands with "magick"')
+    parser.add_argument(
+        '--imagemagick-workers',
+        type=int,
+        default=0,
+        metavar='N',
+        help='How many persistent ImageMagick workers to use')
+    args = parser.parse_args()
+
+    # Read baseline before benchmarking
+    baseline = None
+    if args.compare is not None:
+        try:
+            with args.compare.open('r', encoding='utf-8') as file_handle:
+                baseline = load(file_handle)
+        except (OSError, ValueError):
+            log.critical(f'Unable to read baseline "{args.compare.resolve()}"')
+            sys_exit(1)
+
+    if not (card_types := get_card_types(args.card_types)):
+        log.critical(f'No valid card types to benchmark')
+        sys_exit(1)
+
+    imagemagick_arguments = {
+        'imagemagick_container': args.imagemagick_container,
+        'use_magick_prefix': args.use_magick_prefix,
+        'imagemagick_workers': args.imagemagick_workers,
+    }
+    for attribute, value in imagemagick_arguments.items():
+        setattr(global_objects.pp, attribute, value)
+    version = ImageMagickInterface(
+        **global_objects.pp.imagemagick_arguments
+    ).run_get_output('convert --version').splitlines()
+
+    # Benchmark each card type in a new process
+    results = {
+        'metadata': {
+            'imagemagick': version[0] if version else None,
+            'iterations': args.iterations,
+            'platform': platform(),
+            'python': python_version(),
+            'sources': list(SOURCES),
+            'titles': list(TITLES),
+        },
+        'card_types': {},
+    }
+    with TemporaryDirectory() as directory, \
+            ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for identifier in card_types:
+            card_directory = Path(directory) / identifier.replace(' ', '_')
+            card_directory.mkdir()
+            result = pool.submit(
+                benchmark_card_type, identifier, card_directory,
+                args.iterations, imagemagick_arguments,
+            ).result()
+            results['card_types'][identifier] = result
+            log.info(f'{identifier:>16}: {result["wall_time_per_card"]:.3f}s '
+                     f'per card, {result["imagemagick_processes"]} processes, '
+                     f'{result["output_bytes"]} bytes, '
+                     f'{result["failures"]} failures')
+
+    # Write results
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open('w', encoding='utf-8') as file_handle:
+        dump(results, file_handle, indent=2)
+    log.info(f'Wrote benchmark results to "{args.output.resolve()}"')
+
+    # Compare against baseline, exit with error if any regressions
+    if baseline is not None:
+        if regressions := compare(baseline, results, args.threshold):
+            log.warning(f'{len(regressions)} card type(s) regressed more than '
+                        f'{args.threshold}%')
+            sys_exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -323,3 +323,4 @@ if hasattr(args, 'tmdb_download_images') and pp.use_tmdb:
             episode_range=episode_range,
             directory=Path(arg_set[4]),
         )
+        tmdb_interface.write_blacklist()
@@ -17,10 +17,16 @@ try:
     from modules.PreferenceParser import PreferenceParser
     from modules.RemoteFile import RemoteFile
     from modules.global_objects import set_preference_parser, \
-        set_font_validator, set_media_info_set, set_show_record_keeper
+        set_font_validator, set_media_info_set, set_show_record_keeper, \
+        set_text_metrics_cache, set_source_image_cache, set_render_cache, \
+        set_imagemagick_telemetry
+    from modules.ImageMagickTelemetry import ImageMagickTelemetry
     from modules.Manager import Manager
     from modules.MediaInfoSet import MediaInfoSet
+    from modules.RenderCache import RenderCache
     from modules.ShowRecordKeeper import ShowRecordKeeper
+    from modules.SourceImageCache import SourceImageCache
+    from modules.TextMetricsCache import TextMetricsCache
 except ImportError as e:
     print(f'Required Python packages are missing - execute "pipenv install"')
     print(f'  Specific Error: {e}')
@@ -165,6 +171,16 @@ set_preference_parser(pp)
 set_font_validator(FontValidator())
 set_media_info_set(MediaInfoSet())
 set_show_record_keeper(ShowRecordKeeper(pp.database_directory))
+if pp.text_metrics_cache_size > 0:
+    set_text_metrics_cache(
+        TextMetricsCache(pp.database_directory, pp.text_metrics_cache_size)
+    )
+if pp.source_cache_size > 0:
+    set_source_image_cache(SourceImageCache(pp.source_cache_size))
+if pp.render_cache_size > 0:
+    set_render_cache(RenderCache(pp.render_cache_size))
+if pp.imagemagick_telemetry:
+    set_imagemagick_telemetry(ImageMagickTelemetry(pp.database_directory))
 
 
 def check_for_update():
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Union
 from titlecase import titlecase
 
 from modules.Debug import log
+from modules import global_objects
 from modules.ImageMaker import ImageMaker, Dimensions
 
 if TYPE_CHECKING:
@@ -271,6 +272,13 @@ class BaseCardType(ImageMaker):
     """Standard blur effect to apply to spoiler-free images"""
     BLUR_PROFILE = '0x60'
 
+    """
+    Whether this class can render directly at the global card dimensions
+    (rather than at the standard size and then resizing). Classes which
+    support this must scale all geometry with `scaled()`.
+    """
+    SUPPORTS_NATIVE_RESOLUTION = False
+
 
     @property
     @abstractmethod
@@ -304,7 +312,7 @@ class BaseCardType(ImageMaker):
 
 
     """Slots for standard style attributes"""
-    __slots__ = ('valid', 'blur', 'grayscale')
+    __slots__ = ('valid', 'blur', 'grayscale', 'scale')
 
 
     @abstractmethod
@@ -336,6 +344,13 @@ class BaseCardType(ImageMaker):
         self.blur = blur
         self.grayscale = grayscale
 
+        # Render at the global card dimensions if enabled and supported
+        self.scale = 1.0
+        if (self.SUPPORTS_NATIVE_RESOLUTION
+            and getattr(self.preferences, 'native_resolution', False)):
+            width, _ = self.preferences.card_dimensions.lower().split('x')
+            self.scale = int(width) / self.WIDTH
+
 
     def __repr__(self) -> str:
         """Returns an unambiguous string representation of the object."""
@@ -426,6 +441,94 @@ class BaseCardType(ImageMaker):
         raise NotImplementedError
 
 
+    @property
+    def card_size(self) -> str:
+        """
+        Size (as WIDTHxHEIGHT) this card is rendered at. This is the
+        standard title card size unless rendering at native resolution.
+        """
+
+        if self.scale == 1.0:
+            return self.TITLE_CARD_SIZE
+
+        return f'{self.WIDTH * self.scale:.0f}x{self.HEIGHT * self.scale:.0f}'
+
+
+    def scaled(self, value: float) -> float:
+        """
+        Scale the given dimension - defined at the standard title card
+        size - to the size this card is rendered at.
+
+        Args:
+            value: Dimension (e.g. font size or offset) to scale.
+
+        Returns:
+            Scaled dimension.
+        """
+
+        return value if self.scale == 1.0 else value * self.scale
+
+
+    def scaled_offset(self, value: float) -> float:
+        """
+        Scale the given offset (e.g. a geometry or annotation offset) to
+        the size this card is rendered at, rounded to whole pixels. The
+        offset is not modified if the card is not scaled.
+
+        Args:
+            value: Offset to scale.
+
+        Returns:
+            Scaled offset.
+        """
+
+        return value if self.scale == 1.0 else round(value * self.scale)
+
+
+    def scaled_blur(self, profile: str) -> str:
+        """
+        Scale the given blur profile (e.g. `0x60`) - defined at the
+        standard title card size - to the size this card is rendered at.
+        The radius and sigma are both scaled, so the blur is equally
+        strong relative to the card.
+
+        Args:
+            profile: Blur profile (`{radius}x{sigma}`) to scale.
+
+        Returns:
+            Scaled blur profile.
+        """
+
+        if self.scale == 1.0:
+            return profile
+
+        return 'x'.join(
+            f'{self.scaled(float(value)):g}' if value else value
+            for value in profile.split('x')
+        )
+
+
+    def scaled_image(self, image: Path) -> ImageMagickCommands:
+        """
+        ImageMagick commands to read the given standard-sized image
+        (e.g. a gradient overlay) at the size this card is rendered at.
+
+        Args:
+            image: Path to the image to read.
+
+        Returns:
+            List of ImageMagick commands.
+        """
+
+        if self.scale == 1.0:
+            return [f'"{image.resolve()}"']
+
+        return [
+            f'\( "{image.resolve()}"',
+            f'-resize "{self.card_size}!" \)',
+        ]
+
+
     @property
     def resize(self) -> ImageMagickCommands:
         """
@@ -444,8 +547,8 @@ class BaseCardType(ImageMaker):
             f'-background transparent',
             f'-gravity center',
             # Fit to title card size
-            f'-resize "{self.TITLE_CARD_SIZE}^"',
-            f'-extent "{self.TITLE_CARD_SIZE}"',
+            f'-resize "{self.card_size}^"',
+            f'-extent "{self.card_size}"',
         ]
 
 
@@ -463,7 +566,7 @@ class BaseCardType(ImageMaker):
             # Ignore profile conversion warnings
             f'+profile "*"',
             # Optionally blur
-            f'-blur {self.BLUR_PROFILE}' if self.blur else '',
+            f'-blur {self.scaled_blur(self.BLUR_PROFILE)}' if self.blur else '',
             # Optionally set gray colorspace
             f'-colorspace gray' if self.grayscale else '',
             # Reset to full colorspace
@@ -489,10 +592,10 @@ class BaseCardType(ImageMaker):
             f'-background transparent',
             f'-gravity center',
             # Fit to title card size
-            f'-resize "{self.TITLE_CARD_SIZE}^"',
-            f'-extent "{self.TITLE_CARD_SIZE}"',
+            f'-resize "{self.card_size}^"',
+            f'-extent "{self.card_size}"',
             # Optionally blur
-            f'-blur {self.BLUR_PROFILE}' if self.blur else '',
+            f'-blur {self.scaled_blur(self.BLUR_PROFILE)}' if self.blur else '',
             # Optionally set gray colorspace
             f'-colorspace gray' if self.grayscale else '',
             # Reset to full colorspace
@@ -500,6 +603,55 @@ class BaseCardType(ImageMaker):
         ]
 
 
+    @property
+    def styled_source(self) -> ImageMagickCommands:
+        """
+        ImageMagick commands to read this card's source image, resized
+        and with any style modifiers applied. If the global source image
+        cache is enabled, the preprocessed image is read from the cache
+        (and only the settings of `resize_and_style` are applied).
+        """
+
+        source = self.source_file.resolve()
+        if ((cache := global_objects.source_image_cache) is not None
+            and (image := cache.get(
+                self.image_magick, source, self.resize_and_style
+            )) is not None):
+            return [
+                f'"{image.resolve()}"',
+                # Use 4:4:4 sampling by default
+                f'-sampling-factor 4:4:4',
+                # Full sRGB colorspace on source image
+                f'-set colorspace sRGB',
+                # Background resize shouldn't fill with any color
+                f'-background transparent',
+                f'-gravity center',
+            ]
+
+        return [f'"{source}"', *self.resize_and_style]
+
+
+    @staticmethod
+    def get_mask_file(file: Path) -> Optional[Path]:
+        """
+        Get the mask image for the given file. The episode-specific mask
+        is prioritized, then the general mask.
+
+        Args:
+            file: Path to the file to search for the mask image
+                alongside.
+
+        Returns:
+            Path to the mask image, None if there is no mask image.
+        """
+
+        for pattern in (f'{file.stem}-mask.*', f'{file.stem}_mask.*', 'mask.*'):
+            if (mask := list(file.parent.glob(pattern))):
+                return mask[0]
+
+        return None
+
+
     def add_overlay_mask(self,
             file: Path,
             /,
@@ -528,14 +680,7 @@ class BaseCardType(ImageMaker):
             return []
 
         # Look for mask file corresponding to this source image
-        # Prioritize episode-specific mask, then general mask
-        if (mask := list(file.parent.glob(f'{file.stem}-mask.*'))):
-            mask = mask[0]
-        elif (mask := list(file.parent.glob(f'{file.stem}_mask.*'))):
-            mask = mask[0]
-        elif (mask := list(file.parent.glob(f'mask.*'))):
-            mask = mask[0]
-        else:
+        if (mask := self.get_mask_file(file)) is None:
             return []
 
         log.debug(f'Identified mask image "{mask.resolve()}"')
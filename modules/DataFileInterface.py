@@ -1,13 +1,24 @@
+from contextlib import contextmanager
+from marshal import dumps as marshal_dumps, loads as marshal_loads
+from os import getpid, replace
 from pathlib import Path
-from typing import Any, Iterable, Iterator
-from yaml import safe_load, dump
+from typing import Any, Iterable, Iterator, Optional
+from yaml import dump, load
+
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
 
 from modules import global_objects
 from modules.Debug import log
 from modules.EpisodeInfo import EpisodeInfo
+from modules.FileLock import FileLock
 from modules.SeriesInfo import SeriesInfo
 from modules.Title import Title
 
+Change = tuple[str, int, dict[str, Any], bool]
+
 
 class DataFileInterface:
     """
@@ -19,8 +30,14 @@ class DataFileInterface:
     """Default name for a data file of episode information"""
     GENERIC_DATA_FILE_NAME = 'data.yml'
 
+    """Version of the format of compiled data file caches"""
+    CACHE_VERSION = 1
+
 
-    __slots__ = ('series_info', 'file', '_ignore_preferred_titles')
+    __slots__ = (
+        'series_info', 'file', '_ignore_preferred_titles', '__lock',
+        '__session', '__changes',
+    )
 
 
     def __init__(self,
@@ -46,6 +63,11 @@ class DataFileInterface:
         self.series_info = series_info
         self.file = data_file
         self._ignore_preferred_titles = ignore_preferred_titles
+        self.__lock = FileLock.for_file(self.file)
+
+        # No session until started
+        self.__session: Optional[dict[str, dict[int, dict]]] = None
+        self.__changes: list[Change] = []
 
         # Create parent directories if necessary
         if not self.file.exists():
@@ -59,27 +81,106 @@ class DataFileInterface:
                 f'file={self.file.resolve()}>')
 
 
+    @property
+    def __cache_file(self) -> Path:
+        """Path to the compiled cache of this interface's file."""
+
+        return self.file.with_name(f'.{self.file.name}.cache')
+
+
+    def __get_cache_key(self,
+            file: Optional[Path] = None,
+        ) -> Optional[tuple[int, ...]]:
+        """
+        Get the key which identifies the current state of this
+        interface's file (or the given file which will replace it) -
+        i.e. its size, modification time, and inode. None if the file
+        does not exist.
+        """
+
+        try:
+            stat = (self.file if file is None else file).stat()
+        except OSError:
+            return None
+
+        return (
+            self.CACHE_VERSION, stat.st_size, stat.st_mtime_ns, stat.st_ino
+        )
+
+
+    def __read_cache(self, key: tuple[int, ...]) -> Optional[dict[str, Any]]:
+        """
+        Read the compiled cache of this interface's file.
+
+        Args:
+            key: Key of the current state of the file.
+
+        Returns:
+            The cached YAML of the file. None if there is no cache, or
+            the cache is of a different state of the file.
+        """
+
+        try:
+            cached_key, yaml = marshal_loads(self.__cache_file.read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        return yaml if tuple(cached_key) == key else None
+
+
+    def __write_cache(self, key: tuple[int, ...], yaml: dict[str, Any]) -> None:
+        """
+        Write the given YAML to the compiled cache of this interface's
+        file, keyed by the given state of the file. YAML which cannot be
+        compiled (e.g. dates) is not cached, nor is YAML of a state of
+        the file which has since changed (e.g. by another writer).
+
+        Args:
+            key: Key of the state of the file the YAML was read from -
+                determined before the file was read.
+            yaml: YAML read from the file.
+        """
+
+        if self.__get_cache_key() != key:
+            return None
+
+        cache_file = self.__cache_file
+        temp_file = cache_file.with_name(f'{cache_file.name}.{getpid()}.tmp')
+        try:
+            temp_file.write_bytes(marshal_dumps((key, yaml)))
+            replace(temp_file, cache_file)
+        except ValueError:
+            cache_file.unlink(missing_ok=True)
+        except OSError:
+            log.debug(f'Unable to write datafile cache "{cache_file}"')
+
+        return None
+
+
     def __read_data(self) -> dict[str, dict[float, dict]]:
         """
         Read this interface's data from file. Returns an empty
         dictionary if the file does not exist, is misformatted, or if
-        'data' key is missing.
+        'data' key is missing. If the file is unchanged since it was
+        last read, its compiled cache is read instead of the YAML.
 
         Returns:
             Contents under 'data' key of this interface's file.
         """
 
         # If the file DNE, return empty dictionary
-        if not self.file.exists():
+        if (key := self.__get_cache_key()) is None:
             return {}
 
-        # Read file
-        with self.file.open('r', encoding='utf-8') as file_handle:
-            try:
-                yaml = safe_load(file_handle)
-            except Exception as e: # pylint: disable=broad-except
-                log.error(f'Error reading datafile:\n{e}\n')
-                return {}
+        # Read compiled cache if up to date, otherwise read and cache file
+        if (yaml := self.__read_cache(key)) is None:
+            with self.file.open('r', encoding='utf-8') as file_handle:
+                try:
+                    yaml = load(file_handle, Loader=SafeLoader)
+                except Exception as e: # pylint: disable=broad-except
+                    log.error(f'Error reading datafile:\n{e}\n')
+                    return {}
+            self.__write_cache(key, yaml)
 
         # If the top-level key is not 'data', error and return empty dictionary
         if 'data' not in yaml:
@@ -102,14 +203,29 @@ class DataFileInterface:
             yaml: YAML dictionary to write to file.
         """
 
-        # Write updated data with this entry added
-        with self.file.open('w', encoding='utf-8') as file_handle:
-            dump({'data': yaml}, file_handle, allow_unicode=True, width=100)
-
-
-    def read(self) -> Iterator[tuple[dict[str, Any], set[str]]]:
+        # Write updated data to a temporary file which replaces the file, so
+        # the file is never partially written
+        temp_file = self.file.with_name(f'.{self.file.name}.{getpid()}.tmp')
+        with temp_file.open('w', encoding='utf-8') as file_handle:
+            dump(
+                {'data': yaml}, file_handle, Dumper=SafeDumper,
+                allow_unicode=True, width=100,
+            )
+        key = self.__get_cache_key(temp_file)
+        replace(temp_file, self.file)
+        self.__write_cache(key, {'data': yaml})
+
+
+    def read(self,
+            episode_infos: Optional[Iterable[EpisodeInfo]] = None,
+        ) -> Iterator[tuple[dict[str, Any], set[str]]]:
         """
         Read the data file for this object, yielding each valid row.
+        Within a session, the data is read from memory.
+
+        Args:
+            episode_infos: Optional EpisodeInfo objects whose entries to
+                read. If omitted, all entries are read.
 
         Returns:
             Yields a dictionary for each entry in this datafile. The
@@ -119,7 +235,18 @@ class DataFileInterface:
         """
 
         # Read yaml, returns {} if empty/DNE
-        yaml = self.__read_data()
+        if self.__session is not None:
+            yaml = self.__session
+        else:
+            yaml = self.__read_data()
+
+        # Get indices of the entries to read
+        indices = None
+        if episode_infos is not None:
+            indices = {
+                (info.season_number, info.episode_number)
+                for info in episode_infos
+            }
 
         # Iterate through each season
         for season, season_data in yaml.items():
@@ -145,6 +272,11 @@ class DataFileInterface:
                                   f'be integers')
                     continue
 
+                # Skip entries not being read
+                if (indices is not None
+                    and (season_number, episode_number) not in indices):
+                    continue
+
                 # If title is missing (or no subkeys at all..) error
                 if (not isinstance(episode_data, dict)
                     or ('title' not in episode_data and
@@ -153,8 +285,9 @@ class DataFileInterface:
                               f'{self.series_info} datafile is missing a title')
                     continue
 
-                # Get existing keys for this episode
+                # Get existing keys for this episode, copy so data is unmodified
                 given_keys = set(episode_data)
+                episode_data = dict(episode_data)
 
                 # If translated title is available, prefer that
                 original_title = episode_data.pop('title', None)
@@ -214,6 +347,106 @@ class DataFileInterface:
         return entry
 
 
+    @staticmethod
+    def __apply_change(yaml: dict[str, dict[int, dict]], change: Change) -> bool:
+        """
+        Apply the given change to the given YAML data.
+
+        Args:
+            yaml: YAML data to modify in place.
+            change: Season key, episode number, data to add to the entry,
+                and whether to create the entry if it does not exist.
+
+        Returns:
+            Whether the change was applied.
+        """
+
+        season_key, episode_number, data, create = change
+
+        # Create blank entry if indicated, otherwise entry must exist
+        if yaml.get(season_key, {}).get(episode_number) is None:
+            if not create:
+                return False
+            if not isinstance(yaml.get(season_key), dict):
+                yaml[season_key] = {}
+            yaml[season_key][episode_number] = {}
+
+        yaml[season_key][episode_number].update(data)
+        return True
+
+
+    def __apply_changes(self, changes: list[Change]) -> list[bool]:
+        """
+        Apply the given changes to this interface's data. Within a
+        session the changes are applied in memory (and written when the
+        session exits), otherwise the file is read and written once.
+
+        Args:
+            changes: Changes to apply.
+
+        Returns:
+            Whether each change was applied.
+        """
+
+        # Within a session, apply in memory and record for writing later
+        if self.__session is not None:
+            applied = [
+                self.__apply_change(self.__session, change) for change in changes
+            ]
+            self.__changes.extend(
+                change for change, was_applied in zip(changes, applied)
+                if was_applied
+            )
+            return applied
+
+        # Read and write under lock so concurrent writes are not lost
+        with self.__lock.exclusive():
+            yaml = self.__read_data()
+            applied = [self.__apply_change(yaml, change) for change in changes]
+            if any(applied):
+                self.__write_data(yaml)
+
+        return applied
+
+
+    @contextmanager
+    def session(self) -> Iterator[None]:
+        """
+        Context manager to hold this interface's data in memory. Within
+        a session, all reads are from memory; and all changes are made
+        in memory, and written to file once when the (outermost) session
+        exits. Changes are re-applied to the latest file when written, so
+        changes made by other processes during the session are kept.
+
+        >>> with data_file_interface.session():
+        ...     data_file_interface.add_many_entries(...)
+        ...     data_file_interface.add_data_to_entry(...)
+        """
+
+        # Already within a session, data is written by the outer session
+        if self.__session is not None:
+            yield
+            return None
+
+        self.__session = self.__read_data()
+        self.__changes = []
+        try:
+            yield
+        finally:
+            changes, self.__changes = self.__changes, []
+            self.__session = None
+
+            # Write all changes at once
+            if changes:
+                with self.__lock.exclusive():
+                    yaml = self.__read_data()
+                    for change in changes:
+                        self.__apply_change(yaml, change)
+                    self.__write_data(yaml)
+
+        return None
+
+
     def add_data_to_entry(self,
             episode_info: EpisodeInfo,
             **new_data: dict[str, Any],
@@ -227,21 +460,15 @@ class DataFileInterface:
             new_data: Generic new data to write.
         """
 
-        yaml = self.__read_data()
-
-        # Verify this entry already exists, warn and exit if not
-        season_key = f'Season {episode_info.season_number}'
-        if (season_key not in yaml
-            or episode_info.episode_number not in yaml[season_key]):
+        # Add new data, error if this entry does not exist
+        change = (
+            f'Season {episode_info.season_number}', episode_info.episode_number,
+            new_data, False,
+        )
+        if not self.__apply_changes([change])[0]:
             log.error(f'Cannot add data to entry for {episode_info} in '
                       f'"{self.file.resolve()}" - entry does not exist')
-            return None
 
-        # Add new data
-        yaml[season_key][episode_info.episode_number].update(new_data)
-
-        # Write updated data
-        self.__write_data(yaml)
         return None
 
 
@@ -258,35 +485,21 @@ class DataFileInterface:
         if len(new_episodes) == 0:
             return None
 
-        # Read yaml
-        yaml = self.__read_data()
-
-        # Go through each episode to possibly add to file
-        added = {'count': 0, 'info': None}
-        for episode_info in new_episodes:
-            # Create blank season data if this key doesn't exist
-            season_key = f'Season {episode_info.season_number}'
-            if season_key not in yaml:
-                yaml[season_key] = {}
-
-            # Construct episode data
-            data = self.__info_as_entry(episode_info)
-
-            # Add episode data to existing entry or create new entry for episode
-            added = {'count': added['count'] + 1, 'info': episode_info}
-            if yaml[season_key].get(episode_info.episode_number) is not None:
-                yaml[season_key][episode_info.episode_number].update(data)
-            else:
-                yaml[season_key][episode_info.episode_number] = data
-
-        # If nothing was added, exit - otherwise log to user
-        if (count := added['count']) == 0:
-            return None
-        if count > 1:
+        # Add episode data to existing entry or create new entry for episode
+        self.__apply_changes([
+            (
+                f'Season {episode_info.season_number}',
+                episode_info.episode_number,
+                self.__info_as_entry(episode_info),
+                True,
+            )
+            for episode_info in new_episodes
+        ])
+
+        # Log to user
+        if (count := len(new_episodes)) > 1:
             log.info(f'Added {count} episodes to "{self.file.parent.name}"')
         else:
-            log.info(f'Added {added["info"]} to "{self.file.parent.name}"')
+            log.info(f'Added {new_episodes[0]} to "{self.file.parent.name}"')
 
-        # Write updated yaml
-        self.__write_data(yaml)
         return None
@@ -1,7 +1,7 @@
 from base64 import b64encode
 from datetime import datetime
 from sys import exit as sys_exit
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Optional
 
 from modules import global_objects
 from modules.Debug import log
@@ -41,6 +41,9 @@ class EmbyInterface(EpisodeDataSource, MediaServer, SyncInterface):
     """Range of years to query series by"""
     YEAR_RANGE = range(1960, datetime.now().year)
 
+    """How many episodes to request per page when loading a library"""
+    EPISODE_PAGE_SIZE = 1000
+
 
     def __init__(self,
             url: str,
@@ -98,6 +101,9 @@ class EmbyInterface(EpisodeDataSource, MediaServer, SyncInterface):
         # Get the ID's of all libraries within this server
         self.libraries = self._map_libraries()
 
+        # Loaded episodes of each library, by series ID
+        self.__episodes: dict[str, dict[str, list[dict[str, Any]]]] = {}
+
 
     def _get_user_id(self, username: str) -> Optional[str]:
         """
@@ -148,6 +154,105 @@ class EmbyInterface(EpisodeDataSource, MediaServer, SyncInterface):
         }
 
 
+    def load_episodes(self, library_names: Iterable[str]) -> None:
+        """
+        Load all episodes (and their ID's, titles, and played statuses)
+        within the given libraries. All episodes of a library are
+        requested in a few large pages, rather than per series. Loaded
+        episodes are then used instead of querying each series.
+
+        Args:
+            library_names: Names of the libraries to load.
+        """
+
+        for library_name in library_names:
+            # Skip libraries already loaded, or which are not mapped
+            if (library_name in self.__episodes
+                or (library_ids := self.libraries.get(library_name)) is None):
+                continue
+
+            # Request each page of episodes in each subfolder of this library
+            episodes: dict[str, list[dict[str, Any]]] = {}
+            count, loaded = 0, True
+            try:
+                for parent_id in library_ids:
+                    start, total = 0, None
+                    while total is None or start < total:
+                        response = self.session.get(
+                            f'{self.url}/Items',
+                            params={
+                                'ParentId': parent_id,
+                                'Recursive': True,
+                                'IncludeItemTypes': 'Episode',
+                                'Fields': 'ProviderIds,UserData',
+                                'UserId': self.user_id,
+                                'StartIndex': start,
+                                'Limit': self.EPISODE_PAGE_SIZE,
+                            } | self.__params,
+                        )
+
+                        if (not isinstance(response, dict)
+                            or 'Items' not in response):
+                            log.error(f'Emby returned bad Episode data for '
+                                      f'library "{library_name}"')
+                            log.debug(f'{response=}')
+                            loaded = False
+                            break
+                        if not response['Items']:
+                            break
+
+                        # Store each episode under its series
+                        for episode in response['Items']:
+                            episodes.setdefault(
+                                str(episode.get('SeriesId')), []
+                            ).append(episode)
+
+                        start += len(response['Items'])
+                        total = response.get('TotalRecordCount', start)
+
+                    count += start
+            except Exception: # pylint: disable=broad-except
+                log.exception(f'Unable to load Episodes of library '
+                              f'"{library_name}"')
+                loaded = False
+
+            # Only store completely loaded libraries
+            if loaded:
+                self.__episodes[library_name] = episodes
+                log.debug(f'Loaded {count} episodes in "{library_name}"')
+
+        return None
+
+
+    def __get_episodes(self,
+            library_name: Optional[str],
+            series_info: SeriesInfo,
+        ) -> list[dict[str, Any]]:
+        """
+        Get all the episodes (with their ID's and played statuses) of
+        the given series. These are taken from the loaded episodes of
+        the library if available, and queried otherwise.
+
+        Args:
+            library_name: The name of the library containing the series.
+            series_info: Series to get the episodes of.
+
+        Returns:
+            List of the episode data of the series.
+        """
+
+        # Get from loaded episodes of the library, if loaded
+        library = self.__episodes.get(library_name, {})
+        if (episodes := library.get(str(series_info.emby_id))) is not None:
+            return episodes
+
+        # Query for all episodes of this series
+        return self.session.get(
+            f'{self.url}/Shows/{series_info.emby_id}/Episodes',
+            params={'Fields': 'ProviderIds', 'UserId': self.user_id}|self.__params,
+        )['Items']
+
+
     def get_usernames(self) -> list[str]:
         """
         Get all the usernames for this interface's Emby server.
@@ -390,15 +495,9 @@ class EmbyInterface(EpisodeDataSource, MediaServer, SyncInterface):
             log.warning(f'Series not found in Emby {series_info!r}')
             return []
 
-        # Get all episodes for this series
-        response = self.session.get(
-            f'{self.url}/Shows/{series_info.emby_id}/Episodes',
-            params={'Fields': 'ProviderIds'} | self.__params
-        )
-
-        # Parse each returned episode into EpisodeInfo object
+        # Parse each episode of this series into EpisodeInfo object
         all_episodes = []
-        for episode in response['Items']:
+        for episode in self.__get_episodes(library_name, series_info):
             # Parse airdate for this episode
             airdate = None
             try:
@@ -496,18 +595,10 @@ class EmbyInterface(EpisodeDataSource, MediaServer, SyncInterface):
             return None
 
         # Get current loaded characteristics of the series
-        loaded_series = self.loaded_db.search(
-            self._get_condition(library_name, series_info)
-        )
-
-        # Query for all episodes of this series
-        response = self.session.get(
-            f'{self.url}/Shows/{series_info.emby_id}/Episodes',
-            params={'UserId': self.user_id} | self.__params
-        )
+        loaded_series = self._get_loaded_series(library_name, series_info)
 
         # Go through each episode in Emby, update Episode status/card
-        for emby_episode in response['Items']:
+        for emby_episode in self.__get_episodes(library_name, series_info):
             # Skip if this episode isn't in TCM
             season_number = emby_episode['ParentIndexNumber']
             ep_key = f'{season_number}-{emby_episode["IndexNumber"]}'
@@ -529,11 +620,13 @@ class EmbyInterface(EpisodeDataSource, MediaServer, SyncInterface):
             # Delete card, reset size in loaded map to force reload
             if delete_and_reset and loaded:
                 episode.delete_card(reason='updating style')
-                self.loaded_db.update(
-                    {'filesize': 0},
-                    self._get_condition(library_name, series_info, episode)
+                self._set_loaded_episode(
+                    library_name, series_info, episode, filesize=0
                 )
 
+        # Write any reset details to the loaded database
+        self._write_loaded_assets()
+
         return None
 
 
@@ -597,14 +690,14 @@ class EmbyInterface(EpisodeDataSource, MediaServer, SyncInterface):
                 continue
 
             # Update loaded database for this episode
-            self.loaded_db.upsert({
-                'library': library_name,
-                'series': series_info.full_name,
-                'season': episode.episode_info.season_number,
-                'episode': episode.episode_info.episode_number,
-                'filesize': episode.destination.stat().st_size,
-                'spoiler': episode.spoil_type,
-            }, self._get_condition(library_name, series_info, episode))
+            self._set_loaded_episode(
+                library_name, series_info, episode,
+                filesize=episode.destination.stat().st_size,
+                spoiler=episode.spoil_type,
+            )
+
+        # Write all loaded details to the loaded database
+        self._write_loaded_assets()
 
         # Log load operations to user
         if loaded_count > 0:
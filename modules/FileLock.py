@@ -0,0 +1,171 @@
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock, RLock
+from time import sleep
+from typing import IO, Iterator, Optional
+
+try:
+    from fcntl import flock, LOCK_EX, LOCK_SH, LOCK_UN
+except ImportError:
+    flock = None
+    from msvcrt import locking, LK_NBLCK, LK_UNLCK
+
+from modules.Debug import log
+
+
+class FileLock:
+    """
+    This class describes a cross-process lock on a file, so that
+    multiple processes (e.g. the CLI and the web UI) can safely write
+    to the same files. The lock is an advisory lock on a hidden sidecar
+    lock file, so the locked file itself can still be atomically
+    replaced while locked.
+
+    Locks are either shared (for readers) or exclusive (for writers).
+    Within a process, a lock is re-entrant and held by one thread at a
+    time; and a shared lock is upgraded to exclusive if an exclusive
+    lock is acquired while it is held. Shared locks are not supported on
+    Windows, where all locks are exclusive.
+    """
+
+    """How often (in seconds) to re-attempt a contended lock on Windows"""
+    WINDOWS_RETRY_INTERVAL = 0.05
+
+    """All locks by the path of their lock file"""
+    __locks: dict[Path, 'FileLock'] = {}
+    __locks_lock = Lock()
+
+    __slots__ = ('file', '__lock', '__handle', '__depth', '__shared')
+
+
+    def __init__(self, file: Path) -> None:
+        """
+        Initialize this lock. This does not acquire the lock. Use
+        `for_file()` to get the (shared) lock of a file.
+
+        Args:
+            file: Path to the lock file.
+        """
+
+        self.file = file
+        self.__lock = RLock()
+        self.__handle: Optional[IO] = None
+        self.__depth = 0
+        self.__shared = False
+
+
+    @staticmethod
+    def for_file(file: Path) -> 'FileLock':
+        """
+        Get the lock of the given file. All calls for the same file
+        return the same lock object within a process.
+
+        Args:
+            file: Path to the file to lock.
+
+        Returns:
+            The lock of the given file.
+        """
+
+        lock_file = file.parent.resolve() / f'.{file.name}.lock'
+        with FileLock.__locks_lock:
+            if (lock := FileLock.__locks.get(lock_file)) is None:
+                lock = FileLock.__locks[lock_file] = FileLock(lock_file)
+
+            return lock
+
+
+    def __lock_handle(self, shared: bool) -> None:
+        """Lock this object's open lock file, blocking until locked."""
+
+        if flock is not None:
+            flock(self.__handle.fileno(), LOCK_SH if shared else LOCK_EX)
+            return None
+
+        # Windows locks the first byte of the file, retrying until locked
+        self.__handle.seek(0)
+        while True:
+            try:
+                locking(self.__handle.fileno(), LK_NBLCK, 1)
+                return None
+            except OSError:
+                sleep(self.WINDOWS_RETRY_INTERVAL)
+
+
+    def __unlock_handle(self) -> None:
+        """Unlock this object's open lock file."""
+
+        if flock is not None:
+            flock(self.__handle.fileno(), LOCK_UN)
+        else:
+            self.__handle.seek(0)
+            locking(self.__handle.fileno(), LK_UNLCK, 1)
+
+
+    @contextmanager
+    def __acquire(self, shared: bool) -> Iterator[None]:
+        """
+        Context manager to acquire this lock.
+
+        Args:
+            shared: Whether to acquire a shared (rather than exclusive)
+                lock.
+        """
+
+        with self.__lock:
+            # Lock file is not yet locked by this process
+            if self.__depth == 0:
+                self.file.parent.mkdir(parents=True, exist_ok=True)
+                self.__handle = self.file.open('a+b')
+                try:
+                    self.__lock_handle(shared)
+                except OSError:
+                    self.__handle.close()
+                    self.__handle = None
+                    raise
+                self.__shared = shared
+            # Upgrade shared lock to exclusive
+            elif self.__shared and not shared:
+                self.__lock_handle(False)
+                self.__shared = False
+
+            self.__depth += 1
+            try:
+                yield
+            finally:
+                self.__depth -= 1
+                if self.__depth == 0:
+                    try:
+                        self.__unlock_handle()
+                    except OSError:
+                        log.debug(f'Unable to unlock "{self.file}"')
+                    self.__handle.close()
+                    self.__handle = None
+
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """
+        Context manager to acquire a shared (read) lock. Any number of
+        processes can hold a shared lock at the same time.
+
+        >>> with FileLock.for_file(file).shared():
+        ...     read(file)
+        """
+
+        with self.__acquire(shared=True):
+            yield
+
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Context manager to acquire an exclusive (write) lock. Only one
+        process can hold an exclusive lock at a time.
+
+        >>> with FileLock.for_file(file).exclusive():
+        ...     write(file)
+        """
+
+        with self.__acquire(shared=False):
+            yield
@@ -0,0 +1,200 @@
+from functools import lru_cache
+from pathlib import Path
+from shlex import split as command_split
+from typing import NamedTuple, Optional
+
+from PIL import ImageFont
+
+
+class TextStyle(NamedTuple): # pylint: disable=missing-class-docstring
+    font: str
+    pointsize: float
+    density: float
+    kerning: float
+    interword_spacing: float
+
+
+class FreeTypeMeasurer:
+    """
+    This class describes an in-process text measurement engine. Rather
+    than executing an ImageMagick `-debug annotate` command, the command
+    is parsed for its text settings (font, pointsize, kerning,
+    interword spacing, and density) and text, and each line of text is
+    measured directly with FreeType (via Pillow).
+
+    Measurements are reported in the same form as ImageMagick's
+    `Metrics:` debug output - including the duplicate metrics of
+    `label:` text - so they can be used interchangeably. Any command
+    which cannot be measured exactly (e.g. named fonts, `caption:` text,
+    or property escapes) is not measured, and should be measured by
+    ImageMagick instead.
+    """
+
+    """ImageMagick's default density"""
+    DEFAULT_DENSITY = 72
+
+    """Options whose single argument updates the text style"""
+    __STYLE_OPTIONS = (
+        '-font', '-pointsize', '-density', '-kerning', '-interword-spacing',
+    )
+
+    """Options which reset a text style setting to its default"""
+    __RESET_OPTIONS = {
+        '+kerning': {'kerning': 0},
+        '+interword-spacing': {'interword_spacing': 0},
+        '+density': {'density': DEFAULT_DENSITY},
+        '+pointsize': {'pointsize': 0},
+    }
+
+    """Options whose single argument does not affect measurement"""
+    __IGNORED_ARGUMENT_OPTIONS = ('-debug', '-interline-spacing')
+
+    """Options or images which cannot be measured by this engine"""
+    __UNSUPPORTED_PREFIXES = (
+        'caption:', 'text:', 'pango:', '-draw', '-family', '-size',
+        '-stretch', '-style', '-weight', '-text-font',
+    )
+
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def __get_font(file: str, size: float) -> ImageFont.FreeTypeFont:
+        """
+        Get the (cached) Pillow font for the given file and size.
+
+        Args:
+            file: Path to the font file to load.
+            size: Pixel size of the font to load.
+
+        Returns:
+            Loaded font.
+        """
+
+        return ImageFont.truetype(
+            file, size, layout_engine=ImageFont.Layout.BASIC,
+        )
+
+
+    @staticmethod
+    def __unescape(text: str) -> Optional[str]:
+        """
+        Interpret the escape sequences within the given text as done by
+        ImageMagick.
+
+        Args:
+            text: Text to unescape.
+
+        Returns:
+            Unescaped text. None if the text contains property escapes
+            (e.g. `%w`) or file references, which cannot be interpreted.
+        """
+
+        if text.startswith('@'):
+            return None
+
+        unescaped, index = '', 0
+        while index < len(text):
+            char = text[index]
+            if char == '\\' and index + 1 < len(text):
+                index += 1
+                unescaped += {'n': '\n', 'r': '\r'}.get(text[index],text[index])
+            elif char == '%':
+                return None
+            else:
+                unescaped += char
+            index += 1
+
+        return unescaped
+
+
+    @staticmethod
+    def measure(
+            text_command: str,
+        ) -> Optional[tuple[list[int], list[int], list[int], list[int]]]:
+        """
+        Measure the text produced by the given ImageMagick command.
+
+        Args:
+            text_command: Complete `-debug annotate` command to measure.
+
+        Returns:
+            Tuple of the widths, heights, ascents, and descents of each
+            line of measured text (in the order ImageMagick would report
+            them). None if the command cannot be measured.
+        """
+
+        try:
+            arguments = command_split(text_command)
+        except ValueError:
+            return None
+
+        style = TextStyle('', 0, FreeTypeMeasurer.DEFAULT_DENSITY, 0, 0)
+        widths, heights, ascents, descents = [], [], [], []
+        index = 0
+        while index < len(arguments):
+            argument = arguments[index]
+            text, repeat = None, 1
+
+            # Unmeasurable argument, exit
+            if argument.startswith(FreeTypeMeasurer.__UNSUPPORTED_PREFIXES):
+                return None
+            # Update style
+            if (argument in FreeTypeMeasurer.__STYLE_OPTIONS
+                and index + 1 < len(arguments)):
+                value = arguments[index + 1]
+                try:
+                    if argument == '-font':
+                        if not Path(value).is_file():
+                            return None
+                        style = style._replace(font=value)
+                    elif argument == '-density':
+                        style = style._replace(
+                            density=float(value.split('x')[0])
+                        )
+                    else:
+                        style = style._replace(
+                            **{argument[1:].replace('-', '_'): float(value)}
+                        )
+                except ValueError:
+                    return None
+                index += 1
+            # Reset style
+            elif argument in FreeTypeMeasurer.__RESET_OPTIONS:
+                style = style._replace(
+                    **FreeTypeMeasurer.__RESET_OPTIONS[argument]
+                )
+            # Skip ignored arguments
+            elif argument in FreeTypeMeasurer.__IGNORED_ARGUMENT_OPTIONS:
+                index += 1
+            # Annotated text
+            elif argument == '-annotate' and index + 2 < len(arguments):
+                text = arguments[index + 2]
+                index += 2
+            # Label text is measured (and reported) twice by ImageMagick
+            elif argument.startswith('label:'):
+                text, repeat = argument[len('label:'):], 2
+
+            # Measure text
+            if text is not None:
+                if (not style.font or style.pointsize <= 0
+                    or (text := FreeTypeMeasurer.__unescape(text)) is None):
+                    return None
+
+                size = style.pointsize * style.density / 72
+                font = FreeTypeMeasurer.__get_font(style.font, size)
+                ascent, descent = font.getmetrics()
+                for _ in range(repeat):
+                    for line in text.split('\n'):
+                        width = (
+                            font.getlength(line)
+                            + style.kerning * max(len(line) - 1, 0)
+                            + style.interword_spacing * line.count(' ')
+                        )
+                        widths.append(max(int(width), 0))
+                        heights.append(int(font.font.height))
+                        ascents.append(ascent)
+                        descents.append(descent)
+
+            index += 1
+
+        return widths, heights, ascents, descents
@@ -1,15 +1,19 @@
+from collections import deque
 from os import environ, name as os_name
 from pathlib import Path
-from random import choices as random_choices
 from re import findall
+from secrets import token_hex
 from shlex import split as command_split
-from string import hexdigits
 from subprocess import Popen, PIPE, TimeoutExpired
+from time import perf_counter
 from typing import Iterable, Literal, NamedTuple, Optional, overload
 
 from imagesize import get as im_get
 
 from modules.Debug import log
+from modules.FreeTypeMeasurer import FreeTypeMeasurer
+from modules import global_objects
+from modules.ImageMagickWorkerPool import ImageMagickWorkerPool
 
 
 class Dimensions(NamedTuple): # pylint: disable=missing-class-docstring
@@ -17,6 +21,13 @@ class Dimensions(NamedTuple): # pylint: disable=missing-class-docstring
     height: float
 
 
+class TextMetrics(NamedTuple): # pylint: disable=missing-class-docstring
+    widths: list[int]
+    heights: list[int]
+    ascents: list[int]
+    descents: list[int]
+
+
 class ImageMagickInterface:
     """
     This class describes an interface to ImageMagick. If initialized
@@ -27,6 +38,13 @@ class ImageMagickInterface:
     assumed to be a path to an ImageMagick executable, which is then
     used for command execution.
 
+    If initialized with a docker container and a non-zero number of
+    workers, then commands are streamed to a shared pool of persistent
+    shells launched (once) inside the container, so commands are not
+    individually wrapped in `docker exec`. On the host, a shell would
+    still launch a new process for each command, so workers are not
+    used.
+
     Note: This class does not validate the provided container
     corresponds to a valid ImageMagick container. Commands are passed to
     docker so long as any container name/ID is provided.
@@ -49,6 +67,21 @@ class ImageMagickInterface:
     """Temporary file location for svg -> png conversion"""
     TEMPORARY_SVG_FILE = TEMP_DIR / 'temp_logo.svg'
 
+    """Valid engines for measuring text"""
+    TEXT_ENGINES = ('imagemagick', 'freetype', 'validate')
+
+    """Default tolerance (in pixels) when validating text measurements"""
+    DEFAULT_TEXT_ENGINE_TOLERANCE = 2
+
+    """Shell used by persistent ImageMagick workers"""
+    WORKER_SHELL = ('sh',)
+
+    """How many of the most recent commands to keep for debugging"""
+    HISTORY_SIZE = 10
+
+    """Exit status of commands whose executable does not exist"""
+    COMMAND_NOT_FOUND_STATUS = 127
+
     """Characters that must be escaped in commands"""
     __REQUIRED_ESCAPE_CHARACTERS = ('\\', '"', '`', '%')
 
@@ -56,7 +89,8 @@ class ImageMagickInterface:
     __REQUIRED_VERSION_SUBSTRINGS = ('Version','Copyright','License','Features')
 
     __slots__ = (
-        'executable', 'container', 'use_docker', 'prefix', 'timeout', '__history'
+        'executable', 'container', 'use_docker', 'prefix', 'timeout', 'pool',
+        'text_engine', 'text_engine_tolerance', 'card_type', '__history',
     )
 
 
@@ -64,6 +98,10 @@ class ImageMagickInterface:
             container: Optional[str] = None,
             use_magick_prefix: bool = False,
             timeout: int = COMMAND_TIMEOUT_SECONDS,
+            workers: int = 0,
+            text_engine: str = 'imagemagick',
+            text_engine_tolerance: int = DEFAULT_TEXT_ENGINE_TOLERANCE,
+            card_type: Optional[str] = None,
         ) -> None:
         """
         Construct a new instance of an interface to ImageMagick.
@@ -73,6 +111,17 @@ class ImageMagickInterface:
                 ImageMagick commands to.
             use_magick_prefix: Whether to use 'magick' command prefix.
             timeout: How many seconds to wait for a command to execute.
+            workers: How many persistent workers (within the docker
+                container) to execute commands with. If 0, or if not
+                using docker, then each command is executed in a new
+                process.
+            text_engine: Which engine to measure text with - must be
+                one of `TEXT_ENGINES`.
+            text_engine_tolerance: Maximum difference (in pixels)
+                between FreeType and ImageMagick text metrics when
+                validating measurements.
+            card_type: Name of the card type executing commands with
+                this interface, for telemetry.
         """
 
         # Definitions of this interface, i.e. whether to use docker and how
@@ -86,8 +135,27 @@ class ImageMagickInterface:
         # Store command timeout
         self.timeout = timeout
 
-        # Command history for debug purposes
-        self.__history: list[tuple[str, bytes, bytes]] = []
+        # Store how to measure text
+        self.text_engine = text_engine
+        self.text_engine_tolerance = text_engine_tolerance
+
+        # Use shared pool of persistent workers in the container if
+        # indicated; Windows pipes do not support select, so workers are
+        # not used
+        self.pool = None
+        if workers > 0 and self.use_docker and os_name != 'nt':
+            self.pool = ImageMagickWorkerPool.get(
+                ('docker', 'exec', '-i', container, *self.WORKER_SHELL),
+                workers,
+            )
+
+        # Label of all commands for telemetry
+        self.card_type = card_type
+
+        # Most recent commands for debugging failures
+        self.__history: deque[tuple[str, bytes, bytes]] = deque(
+            maxlen=self.HISTORY_SIZE
+        )
 
 
     def validate_interface(self) -> bool:
@@ -133,12 +201,36 @@ class ImageMagickInterface:
         return string
 
 
+    @staticmethod
+    def __get_output_size(command: list[str], stdout: bytes) -> int:
+        """
+        Get the size of the output of the given executed command.
+
+        Args:
+            command: Executed command (as separated arguments).
+            stdout: STDOUT of the executed command.
+
+        Returns:
+            Size (in bytes) of the image written by the command (its
+            last argument) if one exists, otherwise the size of STDOUT.
+        """
+
+        if len(command) > 1 and not command[-1].startswith(('-', '+')):
+            try:
+                return Path(command[-1]).stat().st_size
+            except (OSError, ValueError):
+                pass
+
+        return len(stdout)
+
+
     def run(self, command: str) -> tuple[bytes, bytes]:
         """
         Wrapper for running a given command. This uses either the host
         machine (i.e. direct calls); or through the provided docker
         container (if preferences has been set; i.e. wrapped through
-        "docker exec -t {id} {command}").
+        "docker exec -t {id} {command}", or streamed to a persistent
+        worker within that container).
 
         Args:
             command: The command (as string) to execute.
@@ -153,8 +245,11 @@ class ImageMagickInterface:
 
         # If a docker image ID is specified, execute the command in that
         # container otherwise, execute on the host machine (no docker wrapper)
-        if self.use_docker:
+        # Workers for a container already execute inside that container
+        if self.use_docker and self.pool is None:
             command = f'docker exec -t {self.container} {self.prefix}{command}'
+        elif self.use_docker:
+            command = f'{self.prefix}{command}'
         # If an executable was indicated, use as 
         elif self.executable:
             command = f'{self.executable} {command}'
@@ -169,19 +264,32 @@ class ImageMagickInterface:
             log.debug(command)
             return b'', b''
 
-        # Execute, capturing stdout and stderr
-        stdout, stderr = b'', b''
+        # Execute, capturing stdout, stderr, and the exit status
+        stdout, stderr, status = b'', b'', None
+        start = perf_counter()
         try:
-            with Popen(cmd, stdout=PIPE, stderr=PIPE) as process:
-                stdout, stderr = process.communicate(timeout=self.timeout)
+            if self.pool is None:
+                with Popen(cmd, stdout=PIPE, stderr=PIPE) as process:
+                    stdout, stderr = process.communicate(timeout=self.timeout)
+                    status = process.returncode
+            else:
+                stdout, stderr, status = self.pool.execute(cmd, self.timeout)
         except TimeoutExpired:
             log.error('ImageMagick command timed out')
             log.debug(command)
         except FileNotFoundError:
+            status = self.COMMAND_NOT_FOUND_STATUS
             log.exception('Command error')
             log.debug(command)
 
-        # Add command to history and return results
+        # Record telemetry, add command to history, and return results
+        if (telemetry := global_objects.imagemagick_telemetry) is not None:
+            telemetry.record(
+                self.card_type,
+                perf_counter() - start,
+                status,
+                self.__get_output_size(cmd, stdout),
+            )
         self.__history.append((command, stdout, stderr))
 
         return stdout, stderr
@@ -220,7 +328,10 @@ class ImageMagickInterface:
 
 
     def print_command_history(self) -> None:
-        """Print the command history of this Interface."""
+        """
+        Print the most recent commands (up to `HISTORY_SIZE`) of this
+        Interface.
+        """
 
         for command, stdout, stderr in self.__history:
             log.debug(f'Command:\n{command}\n\n'
@@ -246,6 +357,110 @@ class ImageMagickInterface:
         return Dimensions(*im_get(image))
 
 
+    def __get_imagemagick_text_metrics(self, text_command: str) -> TextMetrics:
+        """
+        Get the metrics of all text produced by the given measurement
+        command, as reported by ImageMagick. If the global text metrics
+        cache is enabled, this is consulted before (and updated after)
+        executing the command.
+
+        Args:
+            text_command: Complete `-debug annotate` command to execute.
+
+        Returns:
+            TextMetrics namedtuple of each dimension of each measured
+            line of text.
+        """
+
+        # Return cached metrics if available
+        cache = global_objects.text_metrics_cache
+        if cache is not None and (cached := cache.get(text_command)):
+            return TextMetrics(**cached)
+
+        # Execute dimension command, parse output
+        output = self.run_get_output(text_command)
+        metrics = TextMetrics(
+            list(map(int, findall(r'Metrics:.*width:\s+(\d+)', output))),
+            list(map(int, findall(r'Metrics:.*height:\s+(\d+)', output))),
+            list(map(int, findall(r'Metrics:.*ascent:\s+(\d+)', output))),
+            list(map(int, findall(r'Metrics:.*descent:\s+-(\d+)', output))),
+        )
+
+        # Only cache successful measurements
+        if cache is not None and metrics.widths:
+            cache.set(text_command, metrics._asdict())
+
+        return metrics
+
+
+    def __validate_text_metrics(self,
+            text_command: str,
+            measured: TextMetrics,
+            metrics: TextMetrics,
+        ) -> bool:
+        """
+        Validate the given in-process text measurements against the
+        metrics reported by ImageMagick, logging any differences larger
+        than this interface's tolerance.
+
+        Args:
+            text_command: Command which was measured.
+            measured: Metrics measured in-process.
+            metrics: Metrics reported by ImageMagick.
+
+        Returns:
+            True if the metrics agree within the tolerance, False
+            otherwise.
+        """
+
+        valid = all(
+            len(measured_values) == len(values)
+            and all(abs(measured_value - value) <= self.text_engine_tolerance
+                    for measured_value, value in zip(measured_values, values))
+            for measured_values, values in zip(measured, metrics)
+        )
+
+        if not valid:
+            log.warning(f'FreeType text metrics differ from ImageMagick by '
+                        f'more than {self.text_engine_tolerance}px')
+            log.debug(f'Command: {text_command}\n'
+                      f'FreeType: {measured}\nImageMagick: {metrics}')
+
+        return valid
+
+
+    def get_text_metrics(self, text_command: str) -> TextMetrics:
+        """
+        Get the metrics of all text produced by the given measurement
+        command. Depending on this interface's text engine, the text is
+        measured by ImageMagick, in-process with FreeType, or both (in
+        which case the two are compared and ImageMagick's metrics are
+        returned). Commands which FreeType cannot measure are always
+        measured by ImageMagick.
+
+        Args:
+            text_command: Complete `-debug annotate` command to measure.
+
+        Returns:
+            TextMetrics namedtuple of each dimension of each measured
+            line of text.
+        """
+
+        # Measure in-process if indicated and possible
+        if (self.text_engine != 'imagemagick'
+            and (measured := FreeTypeMeasurer.measure(text_command))):
+            if self.text_engine == 'freetype':
+                return TextMetrics(*measured)
+
+            metrics = self.__get_imagemagick_text_metrics(text_command)
+            self.__validate_text_metrics(
+                text_command, TextMetrics(*measured), metrics
+            )
+            return metrics
+
+        return self.__get_imagemagick_text_metrics(text_command)
+
+
     def get_text_dimensions(self,
             text_command: list[str],
             *,
@@ -295,11 +510,7 @@ class ImageMagickInterface:
         ])
 
         # Execute dimension command, parse output
-        metrics = self.run_get_output(text_command)
-        widths = list(map(int, findall(r'Metrics:.*width:\s+(\d+)', metrics)))
-        heights = list(map(int, findall(r'Metrics:.*height:\s+(\d+)', metrics)))
-        ascents = list(map(int, findall(r'Metrics:.*ascent:\s+(\d+)', metrics)))
-        descents = list(map(int, findall(r'Metrics:.*descent:\s+-(\d+)', metrics)))
+        widths, heights, ascents, descents = self.get_text_metrics(text_command)
 
         try:
             # Label text produces duplicate Metrics
@@ -314,7 +525,7 @@ class ImageMagickInterface:
             )
         except ValueError as e:
             log.debug(f'Cannot identify text dimensions - {e}')
-            log.trace(f'{widths=} {heights=}')
+            log.debug(f'{widths=} {heights=}')
             return Dimensions(0, 0)
 
 
@@ -417,13 +628,15 @@ class ImageMagickInterface:
             extension: Extension of randomized file to create.
 
         Returns:
-            Path to the randomized file. This file LIKELY DOES NOT
-            exist.
+            Path to the randomized file. This file does not exist at
+            the time of return.
         """
 
-        random_chars = ''.join(random_choices(hexdigits, k=8))
-
-        return base.parent / f'{base.stem}.{random_chars}.{extension}'
+        # Regenerate in the (unlikely) event this file already exists
+        while True:
+            file = base.parent / f'{base.stem}.{token_hex(8)}.{extension}'
+            if not file.exists():
+                return file
 
 
     def round_image_corners(self,
@@ -0,0 +1,178 @@
+from atexit import register as atexit_register
+from bisect import bisect_left
+from json import dump
+from os import getpid, replace
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional
+
+from modules.Debug import log
+
+
+class Histogram:
+    """
+    This class describes a fixed-bucket histogram. Each bucket is
+    labeled by its (inclusive) upper bound, and values larger than all
+    bounds are counted in a final overflow bucket.
+    """
+
+    __slots__ = ('bounds', 'counts', 'total', 'minimum', 'maximum')
+
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        """
+        Initialize an empty histogram.
+
+        Args:
+            bounds: Sorted upper bounds of each bucket.
+        """
+
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+
+
+    def add(self, value: float) -> None:
+        """
+        Add the given value to this histogram.
+
+        Args:
+            value: Value to add.
+        """
+
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the JSON-serializable dictionary of this histogram."""
+
+        labels = [f'<={bound}' for bound in self.bounds]
+        labels.append(f'>{self.bounds[-1]}')
+
+        return {
+            'total': round(self.total, 6),
+            'min': self.minimum,
+            'max': self.maximum,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class ImageMagickTelemetry:
+    """
+    This class describes a thread-safe collection of ImageMagick command
+    telemetry. Each executed command is recorded with its wall time,
+    exit status, and output size, and aggregated into per-card-type
+    histograms which are exported as JSON at the end of each run (and
+    automatically at exit).
+    """
+
+    """Upper bounds (in seconds) of the wall time histogram buckets"""
+    DURATION_BOUNDS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    """Upper bounds (in bytes) of the output size histogram buckets"""
+    SIZE_BOUNDS = (
+        0, 1_000, 10_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000,
+        5_000_000, 10_000_000,
+    )
+
+    """Card type label of commands not associated with any card"""
+    UNKNOWN_CARD_TYPE = 'unknown'
+
+    """File (within the database directory) telemetry is exported to"""
+    TELEMETRY_FILE = 'imagemagick_telemetry.json'
+
+    __slots__ = ('file', '__card_types', '__lock')
+
+
+    def __init__(self, database_directory: Path) -> None:
+        """
+        Initialize an empty collection of telemetry.
+
+        Args:
+            database_directory: Directory to export telemetry to.
+        """
+
+        self.file = database_directory / self.TELEMETRY_FILE
+        self.__card_types: dict[str, dict[str, Any]] = {}
+        self.__lock = Lock()
+
+        atexit_register(self.export)
+
+
+    def record(self,
+            card_type: Optional[str],
+            duration: float,
+            status: Optional[int],
+            output_size: int,
+        ) -> None:
+        """
+        Record the execution of a single command.
+
+        Args:
+            card_type: Name of the card type which executed the command.
+            duration: Wall time (in seconds) of the command.
+            status: Exit status of the command. None if the command did
+                not finish (e.g. timed out).
+            output_size: Size (in bytes) of the command's output.
+        """
+
+        card_type = card_type or self.UNKNOWN_CARD_TYPE
+        with self.__lock:
+            if (stats := self.__card_types.get(card_type)) is None:
+                stats = self.__card_types[card_type] = {
+                    'commands': 0,
+                    'failures': 0,
+                    'statuses': {},
+                    'duration': Histogram(self.DURATION_BOUNDS),
+                    'output_size': Histogram(self.SIZE_BOUNDS),
+                }
+
+            stats['commands'] += 1
+            stats['failures'] += status != 0
+            status_key = 'timeout' if status is None else str(status)
+            stats['statuses'][status_key] = \
+                stats['statuses'].get(status_key, 0) + 1
+            stats['duration'].add(duration)
+            stats['output_size'].add(output_size)
+
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Get the JSON-serializable dictionary of all telemetry."""
+
+        with self.__lock:
+            return {
+                card_type: stats | {
+                    'statuses': dict(stats['statuses']),
+                    'duration': stats['duration'].as_dict(),
+                    'output_size': stats['output_size'].as_dict(),
+                }
+                for card_type, stats in sorted(self.__card_types.items())
+            }
+
+
+    def export(self) -> None:
+        """
+        Export all recorded telemetry to this object's JSON file. The
+        file is written to a temporary file which then replaces the
+        telemetry file.
+        """
+
+        if not (telemetry := self.as_dict()):
+            return None
+
+        temp_file = self.file.with_name(f'.{self.file.name}.{getpid()}.tmp')
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            with temp_file.open('w', encoding='utf-8') as file_handle:
+                dump(telemetry, file_handle, indent=2)
+            replace(temp_file, self.file)
+            log.debug(f'Exported ImageMagick telemetry to "{self.file}"')
+        except OSError:
+            log.exception(f'Unable to export ImageMagick telemetry')
+
+        return None
@@ -0,0 +1,295 @@
+from atexit import register as atexit_register
+from os import read as os_read
+from secrets import token_hex
+from selectors import DefaultSelector, EVENT_READ
+from shlex import quote
+from subprocess import Popen, PIPE, TimeoutExpired
+from threading import Condition, Lock
+from time import monotonic
+from typing import Optional
+
+from modules.Debug import log
+
+
+class ImageMagickWorker:
+    """
+    This class describes a single long-lived shell process which
+    executes ImageMagick commands streamed to it over STDIN. The output
+    of each command is delimited by a random sentinel so that the STDOUT
+    and STDERR (and exit status) of each individual command can be
+    recovered without re-launching the shell (or `docker exec`) for
+    every command.
+    """
+
+    """How many bytes to read from the worker pipes at a time"""
+    READ_SIZE = 65536
+
+    __slots__ = ('shell', '__process', '__sentinel')
+
+
+    def __init__(self, shell: tuple[str, ...]) -> None:
+        """
+        Launch a new worker process.
+
+        Args:
+            shell: Command (as separated arguments) which launches the
+                shell that commands are streamed to.
+        """
+
+        self.shell = shell
+        self.__sentinel = f'__TCM_WORKER_{token_hex(8)}__'
+        self.__process = Popen(
+            shell, stdin=PIPE, stdout=PIPE, stderr=PIPE, bufsize=0,
+        )
+
+
+    @property
+    def alive(self) -> bool:
+        """Whether this worker's process is still running."""
+
+        return self.__process.poll() is None
+
+
+    def terminate(self) -> None:
+        """Terminate this worker's process."""
+
+        if self.alive:
+            self.__process.kill()
+        self.__process.wait()
+        for pipe in (self.__process.stdin, self.__process.stdout,
+                     self.__process.stderr):
+            pipe.close()
+
+
+    def execute(self,
+            command: list[str],
+            timeout: Optional[float] = None,
+        ) -> tuple[bytes, bytes, int]:
+        """
+        Execute the given command in this worker.
+
+        Args:
+            command: Command (as separated arguments) to execute. Each
+                argument is quoted before being sent to the shell, so
+                the command is executed exactly as with `Popen`.
+            timeout: How many seconds to wait for the command to finish.
+
+        Returns:
+            Tuple of the STDOUT, STDERR, and exit status of the executed
+            command.
+
+        Raises:
+            TimeoutExpired if the command does not finish in time. The
+                worker is terminated in this case.
+            BrokenPipeError if the worker process has exited.
+        """
+
+        # Quote each argument, redirect STDIN so the command cannot
+        # consume subsequent commands, then write the sentinels
+        script = (
+            f'{" ".join(map(quote, command))} </dev/null; '
+            f"printf '\\n{self.__sentinel} %d\\n' \"$?\"; "
+            f"printf '\\n{self.__sentinel}\\n' >&2\n"
+        )
+        self.__process.stdin.write(script.encode())
+        self.__process.stdin.flush()
+
+        # Read STDOUT and STDERR until both sentinels have been written
+        stdout_marker = f'\n{self.__sentinel} '.encode()
+        stderr_marker = f'\n{self.__sentinel}\n'.encode()
+        stdout, stderr = bytearray(), bytearray()
+        stdout_done, stderr_done = False, False
+        deadline = None if timeout is None else monotonic() + timeout
+        with DefaultSelector() as selector:
+            selector.register(self.__process.stdout, EVENT_READ, stdout)
+            selector.register(self.__process.stderr, EVENT_READ, stderr)
+            while not (stdout_done and stderr_done):
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.terminate()
+                    raise TimeoutExpired(command, timeout)
+
+                for key, _ in selector.select(remaining):
+                    if not (chunk := os_read(key.fd, self.READ_SIZE)):
+                        raise BrokenPipeError('ImageMagick worker exited')
+                    key.data.extend(chunk)
+
+                stdout_done = (
+                    stdout.endswith(b'\n') and stdout_marker in stdout
+                )
+                stderr_done = stderr.endswith(stderr_marker)
+
+        # Strip sentinels from the output, parse exit status
+        index = stdout.rindex(stdout_marker)
+        status = int(stdout[index + len(stdout_marker):])
+
+        return (
+            bytes(stdout[:index]),
+            bytes(stderr[:-len(stderr_marker)]),
+            status,
+        )
+
+
+class ImageMagickWorkerPool:
+    """
+    This class describes a bounded pool of ImageMagickWorker objects.
+    Pools are shared across all ImageMagickInterface objects with the
+    same shell, and workers are launched on demand (up to the pool
+    size) and re-used for all subsequent commands. Workers which exit
+    are discarded, and replaced on demand.
+    """
+
+    """Exit status of shells when the executed command does not exist"""
+    COMMAND_NOT_FOUND_STATUS = 127
+
+    """All active pools, keyed by shell and size"""
+    __pools: dict[tuple[tuple[str, ...], int], 'ImageMagickWorkerPool'] = {}
+    __pools_lock = Lock()
+
+    __slots__ = ('shell', 'size', '__idle', '__workers', '__condition')
+
+
+    def __init__(self, shell: tuple[str, ...], size: int) -> None:
+        """
+        Initialize a new (empty) pool of workers.
+
+        Args:
+            shell: Command which launches each worker's shell.
+            size: Maximum number of concurrent workers in this pool.
+        """
+
+        self.shell = shell
+        self.size = max(1, size)
+        self.__idle: list[ImageMagickWorker] = []
+        self.__workers: list[ImageMagickWorker] = []
+        self.__condition = Condition()
+
+
+    @staticmethod
+    def get(shell: tuple[str, ...], size: int) -> 'ImageMagickWorkerPool':
+        """
+        Get the shared pool for the given shell, creating it if it does
+        not exist.
+
+        Args:
+            shell: Command which launches each worker's shell.
+            size: Maximum number of concurrent workers in the pool.
+
+        Returns:
+            The shared pool.
+        """
+
+        with ImageMagickWorkerPool.__pools_lock:
+            key = (shell, size)
+            if (pool := ImageMagickWorkerPool.__pools.get(key)) is None:
+                pool = ImageMagickWorkerPool(shell, size)
+                ImageMagickWorkerPool.__pools[key] = pool
+
+            return pool
+
+
+    @staticmethod
+    def shutdown_all() -> None:
+        """Terminate the workers of all active pools."""
+
+        with ImageMagickWorkerPool.__pools_lock:
+            for pool in ImageMagickWorkerPool.__pools.values():
+                pool.shutdown()
+            ImageMagickWorkerPool.__pools.clear()
+
+
+    def shutdown(self) -> None:
+        """Terminate all workers of this pool."""
+
+        with self.__condition:
+            for worker in self.__workers:
+                worker.terminate()
+            self.__workers.clear()
+            self.__idle.clear()
+            self.__condition.notify_all()
+
+
+    def __acquire(self) -> ImageMagickWorker:
+        """
+        Get an idle worker from this pool. If none are idle and the pool
+        is not full, a new worker is launched; otherwise this blocks
+        until a worker is released (or discarded, freeing a slot).
+
+        Returns:
+            The acquired worker.
+        """
+
+        with self.__condition:
+            while True:
+                if self.__idle:
+                    return self.__idle.pop()
+
+                if len(self.__workers) < self.size:
+                    worker = ImageMagickWorker(self.shell)
+                    self.__workers.append(worker)
+                    log.debug(f'Launched ImageMagick worker '
+                              f'{len(self.__workers)}/{self.size}')
+                    return worker
+
+                self.__condition.wait()
+
+
+    def __release(self, worker: ImageMagickWorker) -> None:
+        """
+        Return the given worker to this pool, waking a waiting
+        acquisition. Exited workers are discarded so that they are
+        replaced on the next acquisition.
+
+        Args:
+            worker: Worker being released.
+        """
+
+        with self.__condition:
+            if worker.alive:
+                self.__idle.append(worker)
+            elif worker in self.__workers:
+                self.__workers.remove(worker)
+            self.__condition.notify()
+
+        return None
+
+
+    def execute(self,
+            command: list[str],
+            timeout: Optional[float] = None,
+        ) -> tuple[bytes, bytes, int]:
+        """
+        Execute the given command on a worker of this pool.
+
+        Args:
+            command: Command (as separated arguments) to execute.
+            timeout: How many seconds to wait for the command to finish.
+
+        Returns:
+            Tuple of the STDOUT, STDERR, and exit status of the executed
+            command.
+
+        Raises:
+            TimeoutExpired if the command does not finish in time.
+            FileNotFoundError if the command executable does not exist.
+        """
+
+        worker = self.__acquire()
+        try:
+            stdout, stderr, status = worker.execute(command, timeout)
+        except BrokenPipeError:
+            # Worker died mid-command, retry once on a fresh worker
+            worker.terminate()
+            self.__release(worker)
+            worker = self.__acquire()
+            stdout, stderr, status = worker.execute(command, timeout)
+        finally:
+            self.__release(worker)
+
+        if status == self.COMMAND_NOT_FOUND_STATUS:
+            raise FileNotFoundError(stderr.decode(errors='replace').strip())
+
+        return stdout, stderr, status
+
+
+atexit_register(ImageMagickWorkerPool.shutdown_all)
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from collections import namedtuple
+from os import getpid
 from pathlib import Path
-from re import findall
+from threading import get_native_id
 from typing import TYPE_CHECKING, Iterable, Literal, Optional
 
 from modules import global_objects
@@ -32,10 +33,16 @@ class ImageMaker(ABC):
     """Directory for all temporary images created during image creation"""
     TEMP_DIR = Path(__file__).parent / '.objects'
 
-    """Temporary file location for svg -> png conversion"""
+    """
+    Temporary file location for svg -> png conversion - this should be
+    made unique with `get_temporary_file()` before use
+    """
     TEMPORARY_SVG_FILE = TEMP_DIR / 'temp_logo.svg'
 
-    """Temporary file location for image filesize reduction"""
+    """
+    Temporary file location for image filesize reduction - this should
+    be made unique with `get_temporary_file()` before use
+    """
     TEMPORARY_COMPRESS_FILE = TEMP_DIR / 'temp_compress.jpg'
 
     """
@@ -60,17 +67,34 @@ class ImageMaker(ABC):
         # No Preferences object, use global
         if preferences is None:
             self.preferences = global_objects.pp
-            self.image_magick = ImageMagickInterface(
-                self.preferences.imagemagick_container,
-                self.preferences.use_magick_prefix,
-                self.preferences.imagemagick_timeout,
-            )
         # Preferences object provided, use directly
         else:
             self.preferences = preferences
-            self.image_magick = ImageMagickInterface(
-                **preferences.imagemagick_arguments,
-            )
+
+        self.image_magick = ImageMagickInterface(
+            **self.preferences.imagemagick_arguments,
+            card_type=self.__class__.__name__,
+        )
+
+
+    @staticmethod
+    def get_temporary_file(file: Path) -> Path:
+        """
+        Get a version of the given temporary file which is unique to the
+        current process and thread, so that concurrent image creation
+        does not share intermediate files.
+
+        Args:
+            file: Temporary file (e.g. `TEMPORARY_SVG_FILE`) to make
+                unique.
+
+        Returns:
+            Path to the process- and thread-specific temporary file.
+        """
+
+        unique_id = f'{getpid()}-{get_native_id()}'
+
+        return file.parent / f'{file.stem}.{unique_id}{file.suffix}'
 
 
     def get_text_dimensions(self,
@@ -113,9 +137,8 @@ class ImageMaker(ABC):
         ])
 
         # Execute dimension command, parse output
-        metrics = self.image_magick.run_get_output(text_command)
-        widths = map(int, findall(r'Metrics:.*width:\s+(\d+)', metrics))
-        heights = map(int, findall(r'Metrics:.*height:\s+(\d+)', metrics))
+        metrics = self.image_magick.get_text_metrics(text_command)
+        widths, heights = metrics.widths, metrics.heights
 
         try:
             # Label text produces duplicate Metrics
@@ -158,23 +181,24 @@ class ImageMaker(ABC):
 
         # Create ImageMagickInterface for this command
         image_magick_interface = ImageMagickInterface(
-            global_objects.pp.imagemagick_container,
-            global_objects.pp.use_magick_prefix,
-            global_objects.pp.imagemagick_timeout,
+            **global_objects.pp.imagemagick_arguments,
         )
 
         # Downsample and reduce quality of source image
+        compressed = ImageMaker.get_temporary_file(
+            ImageMaker.TEMPORARY_COMPRESS_FILE
+        )
         command = ' '.join([
             f'convert',
             f'"{image.resolve()}"',
             f'-sampling-factor 4:2:0',
             f'-quality {quality}%',
-            f'"{ImageMaker.TEMPORARY_COMPRESS_FILE.resolve()}"',
+            f'"{compressed.resolve()}"',
         ])
 
         image_magick_interface.run(command)
 
-        return ImageMaker.TEMPORARY_COMPRESS_FILE
+        return compressed
 
 
     @staticmethod
@@ -201,9 +225,7 @@ class ImageMaker(ABC):
 
         # Create ImageMagickInterface for this command
         image_magick_interface = ImageMagickInterface(
-            global_objects.pp.imagemagick_container,
-            global_objects.pp.use_magick_prefix,
-            global_objects.pp.imagemagick_timeout,
+            **global_objects.pp.imagemagick_arguments,
         )
 
         # Command to convert file to PNG
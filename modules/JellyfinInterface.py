@@ -1,7 +1,7 @@
 from base64 import b64encode
 from datetime import datetime
 from sys import exit as sys_exit
-from typing import Optional, Union
+from typing import Any, Iterable, Optional, Union
 
 from modules import global_objects
 from modules.Debug import log
@@ -39,6 +39,9 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
     """Datetime format string for airdates reported by Jellyfin"""
     AIRDATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f000000Z'
 
+    """How many episodes to request per page when loading a library"""
+    EPISODE_PAGE_SIZE = 1000
+
 
     def __init__(self,
             url: str,
@@ -97,6 +100,9 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
         # Get the ID's of all libraries within this server
         self.libraries = self._map_libraries()
 
+        # Loaded episodes of each library, by series ID
+        self.__episodes: dict[str, dict[str, list[dict[str, Any]]]] = {}
+
 
     def _get_user_id(self, username: str) -> Optional[str]:
         """
@@ -149,6 +155,108 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
         }
 
 
+    def load_episodes(self, library_names: Iterable[str]) -> None:
+        """
+        Load all episodes (and their ID's, titles, and played statuses)
+        within the given libraries. All episodes of a library are
+        requested in a few large pages, rather than per series. Loaded
+        episodes are then used instead of querying each series.
+
+        Args:
+            library_names: Names of the libraries to load.
+        """
+
+        for library_name in library_names:
+            # Skip libraries already loaded, or which are not mapped
+            if (library_name in self.__episodes
+                or (library_id := self.libraries.get(library_name)) is None):
+                continue
+
+            # Request each page of episodes in this library
+            episodes: dict[str, list[dict[str, Any]]] = {}
+            start, total = 0, None
+            try:
+                while total is None or start < total:
+                    response = self.session.get(
+                        f'{self.url}/Items',
+                        params={
+                            'ParentId': library_id,
+                            'Recursive': True,
+                            'IncludeItemTypes': 'Episode',
+                            'Fields': 'ProviderIds,UserData',
+                            'UserId': self.user_id,
+                            'StartIndex': start,
+                            'Limit': self.EPISODE_PAGE_SIZE,
+                        } | self.__params,
+                    )
+
+                    if not isinstance(response, dict) or 'Items' not in response:
+                        log.error(f'Jellyfin returned bad Episode data for library '
+                                  f'"{library_name}"')
+                        log.debug(f'{response=}')
+                        break
+                    if not response['Items']:
+                        total = start
+                        break
+
+                    # Store each episode under its series
+                    for episode in response['Items']:
+                        episodes.setdefault(episode.get('SeriesId'), []).append(
+                            episode
+                        )
+
+                    start += len(response['Items'])
+                    total = response.get('TotalRecordCount', start)
+            except Exception: # pylint: disable=broad-except
+                log.exception(f'Unable to load Episodes of library '
+                              f'"{library_name}"')
+                total = None
+
+            # Only store completely loaded libraries
+            if total is not None and start >= total:
+                self.__episodes[library_name] = episodes
+                log.debug(f'Loaded {start} episodes in "{library_name}"')
+
+        return None
+
+
+    def __get_episodes(self,
+            library_name: Optional[str],
+            series_info: SeriesInfo,
+        ) -> Optional[list[dict[str, Any]]]:
+        """
+        Get all the episodes (with their ID's and played statuses) of
+        the given series. These are taken from the loaded episodes of
+        the library if available, and queried otherwise.
+
+        Args:
+            library_name: The name of the library containing the series.
+            series_info: Series to get the episodes of.
+
+        Returns:
+            List of the episode data of the series. None if Jellyfin
+            returned invalid data.
+        """
+
+        # Get from loaded episodes of the library, if loaded
+        library = self.__episodes.get(library_name, {})
+        if (episodes := library.get(series_info.jellyfin_id)) is not None:
+            return episodes
+
+        # Query for all episodes of this series
+        response = self.session.get(
+            f'{self.url}/Shows/{series_info.jellyfin_id}/Episodes',
+            params={'Fields': 'ProviderIds', 'UserId': self.user_id}|self.__params,
+        )
+
+        if not isinstance(response, dict) or 'Items' not in response:
+            log.error(f'Jellyfin returned bad Episode data for {series_info}')
+            log.debug(f'{response=} {series_info=!r}')
+            return None
+
+        return response['Items']
+
+
     def set_series_ids(self,
             library_name: str,
             series_info: SeriesInfo,
@@ -354,7 +462,7 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
         have already aired are returned.
 
         Args:
-            library_name: Unused argument.
+            library_name: The name of the library containing the series.
             series_info: Series to get the episodes of.
             episode_infos: Optional EpisodeInfos to set the ID's of.
 
@@ -368,19 +476,12 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
             return []
 
         # Get all episodes for this series
-        response = self.session.get(
-            f'{self.url}/Shows/{series_info.jellyfin_id}/Episodes',
-            params={'Fields': 'ProviderIds'} | self.__params
-        )
-
-        if not isinstance(response, dict) or 'Items' not in response:
-            log.error(f'Jellyfin returned bad Episode data for {series_info}')
-            log.debug(f'{response=} {series_info=!r}')
+        if (episodes := self.__get_episodes(library_name, series_info)) is None:
             return []
 
         # Parse each returned episode into EpisodeInfo object
         all_episodes = []
-        for episode in response['Items']:
+        for episode in episodes:
             # Skip Episodes without episode or season numbers
             if (episode.get('IndexNumber', None) is None
                 or episode.get('ParentIndexNumber', None) is None):
@@ -478,23 +579,14 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
             return None
 
         # Get current loaded characteristics of the series
-        loaded_series = self.loaded_db.search(
-            self._get_condition(library_name, series_info)
-        )
-
-        # Query for all episodes of this series
-        response = self.session.get(
-            f'{self.url}/Shows/{series_info.jellyfin_id}/Episodes',
-            params={'UserId': self.user_id} | self.__params
-        )
+        loaded_series = self._get_loaded_series(library_name, series_info)
 
-        if not isinstance(response, dict) or 'Items' not in response:
-            log.error(f'Jellyfin returned bad Episode data')
-            log.debug(f'{response=} {series_info=!r}')
+        # Get all episodes of this series
+        if (episodes := self.__get_episodes(library_name, series_info)) is None:
             return None
 
         # Go through each episode in Jellyfin, update Episode status/card
-        for jellyfin_episode in response['Items']:
+        for jellyfin_episode in episodes:
             # Skip if this episode isn't in TCM
             season_number = jellyfin_episode['ParentIndexNumber']
             ep_key = f'{season_number}-{jellyfin_episode["IndexNumber"]}'
@@ -519,11 +611,13 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
             # Delete card, reset size in loaded map to force reload
             if delete_and_reset and loaded:
                 episode.delete_card(reason='updating style')
-                self.loaded_db.update(
-                    {'filesize': 0},
-                    self._get_condition(library_name, series_info, episode)
+                self._set_loaded_episode(
+                    library_name, series_info, episode, filesize=0
                 )
 
+        # Write any reset details to the loaded database
+        self._write_loaded_assets()
+
         return None
 
 
@@ -591,14 +685,14 @@ class JellyfinInterface(EpisodeDataSource, MediaServer, SyncInterface):
                 continue
 
             # Update loaded database for this episode
-            self.loaded_db.upsert({
-                'library': library_name,
-                'series': series_info.full_name,
-                'season': episode.episode_info.season_number,
-                'episode': episode.episode_info.episode_number,
-                'filesize': episode.destination.stat().st_size,
-                'spoiler': episode.spoil_type,
-            }, self._get_condition(library_name, series_info, episode))
+            self._set_loaded_episode(
+                library_name, series_info, episode,
+                filesize=episode.destination.stat().st_size,
+                spoiler=episode.spoil_type,
+            )
+
+        # Write all loaded details to the loaded database
+        self._write_loaded_assets()
 
         # Log load operations to user
         if loaded_count > 0:
@@ -8,7 +8,9 @@ from modules import global_objects
 from modules.EmbyInterface import EmbyInterface
 from modules.Debug import log, TQDM_KWARGS
 from modules.JellyfinInterface import JellyfinInterface
+from modules.PersistentDatabase import PersistentDatabase
 from modules.PlexInterface import PlexInterface
+from modules.RenderExecutor import RenderExecutor
 from modules.Show import Show
 from modules.ShowArchive import ShowArchive
 from modules.SonarrInterface import SonarrInterface
@@ -200,6 +202,13 @@ class Manager:
             )
 
 
+    def __write_tmdb_blacklist(self) -> None:
+        """Write any updated TMDb blacklist entries (if TMDb is enabled)."""
+
+        if self.tmdb_interface is not None:
+            self.tmdb_interface.write_blacklist()
+
+
     @notify("Starting to set show ID's..")
     def set_show_ids(self) -> None:
         """Set the series ID's of each Show known to this Manager"""
@@ -208,7 +217,8 @@ class Manager:
         for show in tqdm(self.shows + self.archives, desc='Setting series IDs',
                          **TQDM_KWARGS):
             # Select interfaces based on what's enabled
-            show.set_series_ids()
+            with PersistentDatabase.batch_all():
+                show.set_series_ids()
 
 
     @notify('Starting to read source files..')
@@ -230,11 +240,22 @@ class Manager:
     def add_new_episodes(self) -> None:
         """Add any new episodes to this Manager's shows."""
 
+        # Load all episodes of the Emby and Jellyfin libraries at once
+        for name, interface in (('emby', self.emby_interface),
+                                ('jellyfin', self.jellyfin_interface)):
+            if interface:
+                interface.load_episodes({
+                    show.library_name for show in self.shows
+                    if (name in (show.media_server, show.episode_data_source)
+                        and show.library_name)
+                })
+
         # For each show in the Manager, look for new episodes using any of the
         # possible interfaces
         for show in (pbar := tqdm(self.shows + self.archives, **TQDM_KWARGS)):
             pbar.set_description(f'Adding new episodes for {show}')
-            show.add_new_episodes()
+            with PersistentDatabase.batch_all():
+                show.add_new_episodes()
 
 
     @notify("Starting to set episode ID's..")
@@ -244,7 +265,8 @@ class Manager:
         # For each show in the Manager, set IDs for every episode
         for show in (pbar := tqdm(self.shows + self.archives, **TQDM_KWARGS)):
             pbar.set_description(f'Setting episode IDs for {show}')
-            show.set_episode_ids()
+            with PersistentDatabase.batch_all():
+                show.set_episode_ids()
 
 
     @notify('Starting to add translations..')
@@ -258,7 +280,9 @@ class Manager:
         # For each show in the Manager, add translation
         for show in (pbar := tqdm(self.shows + self.archives, **TQDM_KWARGS)):
             pbar.set_description(f'Adding translations for {show}')
-            show.add_translations()
+            with PersistentDatabase.batch_all():
+                show.add_translations()
+                self.__write_tmdb_blacklist()
 
         return None
 
@@ -274,7 +298,9 @@ class Manager:
         # For each show in the Manager, download a logo
         for show in (pbar := tqdm(self.shows + self.archives, **TQDM_KWARGS)):
             pbar.set_description(f'Downloading logo for {show}')
-            show.download_logo()
+            with PersistentDatabase.batch_all():
+                show.download_logo()
+                self.__write_tmdb_blacklist()
 
         return None
 
@@ -283,20 +309,41 @@ class Manager:
     def select_source_images(self) -> None:
         """Select and download the source images for all shows."""
 
+        # Load the watched statuses of all Plex libraries at once
+        if self.plex_interface:
+            self.plex_interface.load_watched_statuses({
+                show.library_name for show in self.shows
+                if show.media_server == 'plex' and show.library_name
+            })
+
         # Go through each show and download source images
         for show in (pbar := tqdm(self.shows + self.archives, **TQDM_KWARGS)):
             pbar.set_description(f'Selecting sources for {show}')
-            show.select_source_images()
+            with PersistentDatabase.batch_all():
+                show.select_source_images()
+                self.__write_tmdb_blacklist()
 
 
     @notify('Starting to create missing title cards..')
     def create_missing_title_cards(self) -> None:
         """Creates all missing title cards for all shows."""
 
-        # Go through every show in the Manager, create cards
-        for show in (pbar := tqdm(self.shows, **TQDM_KWARGS)):
-            pbar.set_description(f'Creating cards for {show}')
-            show.create_missing_title_cards()
+        with RenderExecutor(self.preferences.render_workers) as executor:
+            # Submit the cards of every show in the Manager, so rendering
+            # is not serialized by show
+            pending = []
+            for show in self.shows:
+                with PersistentDatabase.batch_all():
+                    title_cards = show.get_missing_title_cards()
+                if title_cards is not None:
+                    pending.append((show, executor.submit_all(title_cards)))
+
+            # Collect results of each show (in order), record each show
+            for show, futures in (pbar := tqdm(pending, **TQDM_KWARGS)):
+                pbar.set_description(f'Creating cards for {show}')
+                created = executor.wait(futures, f'Creating {show}')
+                with PersistentDatabase.batch_all():
+                    show.record_title_cards(created)
 
 
     @notify('Starting to create season posters..')
@@ -306,7 +353,8 @@ class Manager:
         # For each show in the Manager, create its posters
         for show in tqdm(self.shows + self.archives,
                          desc='Creating season posters',**TQDM_KWARGS):
-            show.create_season_posters()
+            with PersistentDatabase.batch_all():
+                show.create_season_posters()
 
 
     @notify('Starting to update Media Servers..')
@@ -325,7 +373,8 @@ class Manager:
         # Go through each show in the Manager, update Plex
         for show in (pbar := tqdm(self.shows, **TQDM_KWARGS)):
             pbar.set_description(f'Updating Server for {show}')
-            show.update_media_server()
+            with PersistentDatabase.batch_all():
+                show.update_media_server()
 
         return None
 
@@ -339,9 +388,10 @@ class Manager:
             return None
 
         # Update each archive
-        for show_archive in (pbar := tqdm(self.archives, **TQDM_KWARGS)):
-            pbar.set_description(f'Updating archive for {show_archive}')
-            show_archive.create_missing_title_cards()
+        with RenderExecutor(self.preferences.render_workers) as executor:
+            for show_archive in (pbar := tqdm(self.archives, **TQDM_KWARGS)):
+                pbar.set_description(f'Updating archive for {show_archive}')
+                show_archive.create_missing_title_cards(executor)
 
         return None
 
@@ -415,9 +465,11 @@ class Manager:
                 archive = ShowArchive(self.preferences.archive_directory, show)
                 self.archives = [archive]
 
-            # Run all functions on this series
+            # Run all functions on this series, writing the datafile once;
+            # databases are batched by each step
             try:
-                self.__run(serial=True)
+                with show.file_interface.session():
+                    self.__run(serial=True)
             except Exception:
                 log.exception(f'Uncaught Exception while processing {show}')
                 continue
@@ -426,11 +478,26 @@ class Manager:
     def run(self) -> None:
         """Run the Manager either in either serial or batch mode"""
 
+        # Re-query any Plex state cached by a previous run
+        if self.plex_interface:
+            self.plex_interface.clear_cache()
+
         if self.preferences.execution_mode == 'serial':
             self.__run_serially()
         elif self.preferences.execution_mode == 'batch':
             self.__run()
 
+        # Write any updated TMDb blacklist entries
+        self.__write_tmdb_blacklist()
+
+        # Write any new text measurements to disk
+        if global_objects.text_metrics_cache is not None:
+            global_objects.text_metrics_cache.flush()
+
+        # Export ImageMagick telemetry of this run
+        if global_objects.imagemagick_telemetry is not None:
+            global_objects.imagemagick_telemetry.export()
+
 
     def remake_cards(self, rating_keys: Iterable[int]) -> None:
         """
@@ -448,6 +515,9 @@ class Manager:
             log.error(f'Tautulli integration requires Plex')
             return None
 
+        # Re-query any Plex state cached by a previous run
+        self.plex_interface.clear_cache()
+
         # Get details for each rating key from Plex
         entry_list = []
         for key in rating_keys:
@@ -487,6 +557,9 @@ class Manager:
                         f' within library "{library_name}" - no matching YAML '
                         f'entry was found')
 
+        # Write any updated TMDb blacklist entries
+        self.__write_tmdb_blacklist()
+
         return None
 
 
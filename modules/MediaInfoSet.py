@@ -1,10 +1,12 @@
+from atexit import register as atexit_register
 from datetime import datetime
+from os import getpid, replace
+from pickle import dump as pickle_dump, load as pickle_load, HIGHEST_PROTOCOL
 from typing import Any, Optional
 
-from tinydb import where, Query
-
 from modules.Debug import log
 from modules.EpisodeInfo import EpisodeInfo
+from modules.FileLock import FileLock
 from modules.PersistentDatabase import PersistentDatabase
 from modules.SeriesInfo import SeriesInfo
 
@@ -21,6 +23,19 @@ class MediaInfoSet:
     """
 
 
+    """Database ID keys of each SeriesInfo database entry"""
+    SERIES_ID_KEYS = (
+        'emby_id', 'imdb_id', 'jellyfin_id', 'sonarr_id', 'tmdb_id', 'tvdb_id',
+        'tvrage_id',
+    )
+
+    """Keys of each SeriesInfo database entry, in index order"""
+    SERIES_KEYS = ('full_name', ) + SERIES_ID_KEYS
+
+    """Filename of the persisted SeriesInfo database index"""
+    SERIES_INDEX_FILE = 'series_infos.index'
+
+
     def __init__(self) -> None:
         """
         Construct a new instance of the MediaInfoSet. This creates empty
@@ -28,38 +43,160 @@ class MediaInfoSet:
         to Info objects.
         """
 
-        # Database of full names and database ID's
-        self.series_info_db = PersistentDatabase('series_infos.json')
+        # Database of full names and database ID's; written immediately
+        # (not batched), so the database state after each write is known
+        self.series_info_db = PersistentDatabase(
+            'series_infos.json', batched=False,
+        )
+        self.__index_file = self.series_info_db.file.with_name(
+            self.SERIES_INDEX_FILE
+        )
+        self.__database_lock = FileLock.for_file(self.series_info_db.file)
+
+        # Entries of the series database by document ID, and hash indexes
+        # of each key's values to document ID's; and the key of the
+        # database state the index was built (or last updated) for
+        self.__series_infos: dict[int, tuple] = {}
+        self.__series_index: dict[str, dict[Any, set[int]]] = {}
+        self.__database_key: Optional[tuple[int, ...]] = None
+        self.__index_modified = False
+        self.__read_series_index()
+        atexit_register(self.write_series_index)
 
         # Dictionary mapping various database keys to EpisodeInfo objects
         self.episode_info: dict[str, EpisodeInfo] = {}
 
 
-    @staticmethod
-    def __test_id_match(db_value: Any, search_value: Any) -> bool:
+    def __get_database_key(self) -> tuple[int, ...]:
+        """
+        Get the key which identifies the current state of the series
+        database file(s) - i.e. their sizes and modification times.
         """
-        Determine whether the given ID's match for filtering.
 
-        Args:
-            db_value: Existing value from the ID database.
-            search_value: New value to potentially store in the ID
-                database.
+        database_key = ()
+        for file in (self.series_info_db.file,
+                     self.series_info_db.file.with_name(
+                        f'{self.series_info_db.file.name}-wal')):
+            try:
+                stat = file.stat()
+                database_key += (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                database_key += (-1, -1)
 
-        Returns:
-            True if the row indicated by these ID's should be included
-            (NOT filtered out); False if the row should be excluded
-            (filtered out).
+        return database_key
+
+
+    def __read_series_index(self) -> None:
+        """
+        Read the series database index. The persisted index is used if
+        it was written for the current state of the series database;
+        otherwise the index is rebuilt from the database.
+        """
+
+        # Read the persisted index, use if up to date
+        try:
+            with self.__index_file.open('rb') as file_handle:
+                persisted = pickle_load(file_handle)
+            if (persisted['database_key'] == self.__get_database_key()
+                and persisted['keys'] == self.SERIES_KEYS):
+                self.__series_infos = persisted['series_infos']
+                self.__series_index = persisted['index']
+                self.__database_key = persisted['database_key']
+                return None
+        except FileNotFoundError:
+            pass
+        except Exception: # pylint: disable=broad-except
+            log.debug(f'Series index "{self.__index_file}" is invalid')
+
+        self.__build_series_index()
+
+        return None
+
+
+    def __build_series_index(self) -> None:
+        """Rebuild the series database index from the database."""
+
+        # Get the key before reading, so a concurrent write causes a rebuild
+        self.__database_key = self.__get_database_key()
+        self.__series_infos = {}
+        self.__series_index = {key: {} for key in self.SERIES_KEYS}
+        for info in self.series_info_db.all():
+            self.__index_series_info(
+                info.doc_id, tuple(info.get(key) for key in self.SERIES_KEYS),
+            )
+        self.__index_modified = True
+
+        return None
+
+
+    def __refresh_series_index(self) -> None:
+        """
+        Rebuild the series database index if the series database has
+        been modified (i.e. by another process) since the index was
+        built or last updated by this object.
         """
 
-        # None indicates unquerable, do not filter out
-        if db_value is None or search_value is None:
-            return True
+        if self.__database_key != self.__get_database_key():
+            log.debug(f'Series database was modified, rebuilding index')
+            self.__build_series_index()
 
-        # Both values are populated, filter on equality
-        return db_value == search_value
+
+    def write_series_index(self) -> None:
+        """
+        Write the series database index to file (if modified). The index
+        is written to a temporary file which then replaces the index
+        file.
+        """
+
+        # Rebuild the index if out of date, so it is written for the
+        # database state it was built for
+        self.__refresh_series_index()
+        if not self.__index_modified:
+            return None
+
+        temp_file = self.__index_file.with_name(
+            f'.{self.__index_file.name}.{getpid()}.tmp'
+        )
+        try:
+            with temp_file.open('wb') as file_handle:
+                pickle_dump({
+                    'database_key': self.__database_key,
+                    'keys': self.SERIES_KEYS,
+                    'series_infos': self.__series_infos,
+                    'index': self.__series_index,
+                }, file_handle, protocol=HIGHEST_PROTOCOL)
+            replace(temp_file, self.__index_file)
+            self.__index_modified = False
+        except OSError:
+            log.exception(f'Unable to write series index "{self.__index_file}"')
+
+        return None
 
 
-    def __series_info_condition(self,
+    def __index_series_info(self, doc_id: int, values: tuple) -> None:
+        """
+        Add the given series database entry to all indexes, replacing
+        any existing entry with the same document ID.
+
+        Args:
+            doc_id: Document ID of the entry.
+            values: Values of the entry, in the order of `SERIES_KEYS`.
+        """
+
+        # Remove any existing entry from the index
+        if (existing := self.__series_infos.get(doc_id)) is not None:
+            for key, value in zip(self.SERIES_KEYS, existing):
+                self.__series_index[key][value].discard(doc_id)
+
+        # Add new entry to the index
+        self.__series_infos[doc_id] = values
+        for key, value in zip(self.SERIES_KEYS, values):
+            self.__series_index[key].setdefault(value, set()).add(doc_id)
+
+        self.__index_modified = True
+
+
+    def __search_series_infos(self,
             full_name: Optional[str],
             emby_id: Optional[str],
             imdb_id: Optional[str],
@@ -68,29 +205,90 @@ class MediaInfoSet:
             tmdb_id: Optional[int],
             tvdb_id: Optional[int],
             tvrage_id: Optional[int]
-        ) -> Query:
+        ) -> list[int]:
         """
-        Get the Query condition associated with the given SeriesInfo
-        attributes.
+        Search the series database for the entries matching the given
+        SeriesInfo attributes. Entries must match the full name, and
+        each ID must either match or be None (in the entry, or the
+        given value).
 
         Args:
             All SeriesInfo arguments.
 
         Returns:
-            Query that filters the SeriesInfo database for any matching
-            series indicated by the given arguments.
+            Sorted list of document ID's of the matching entries.
         """
 
-        return (
-            (where('full_name') == full_name) &
-            Query().emby_id.test(self.__test_id_match, emby_id) &
-            Query().imdb_id.test(self.__test_id_match, imdb_id) &
-            Query().jellyfin_id.test(self.__test_id_match, jellyfin_id) &
-            Query().sonarr_id.test(self.__test_id_match, sonarr_id) &
-            Query().tmdb_id.test(self.__test_id_match, tmdb_id) &
-            Query().tvdb_id.test(self.__test_id_match, tvdb_id) &
-            Query().tvrage_id.test(self.__test_id_match, tvrage_id)
-        )
+        # Candidates are those whose full name matches
+        if not (candidates := self.__series_index['full_name'].get(full_name)):
+            return []
+        candidates = set(candidates)
+
+        # Intersect with the candidates of each given ID
+        ids = (emby_id, imdb_id, jellyfin_id, sonarr_id, tmdb_id, tvdb_id,
+               tvrage_id)
+        for key, id_ in zip(self.SERIES_ID_KEYS, ids):
+            if id_ is None:
+                continue
+
+            index = self.__series_index[key]
+            candidates &= index.get(id_, set()) | index.get(None, set())
+            if not candidates:
+                return []
+
+        return sorted(candidates)
+
+
+    def __get_series_info_dict(self, doc_id: int) -> dict[str, Any]:
+        """Get the dictionary of the series database entry."""
+
+        return dict(zip(self.SERIES_KEYS, self.__series_infos[doc_id]))
+
+
+    def __update_series_infos(self,
+            data: dict[str, Any],
+            doc_ids: list[int],
+        ) -> None:
+        """
+        Update the given series database entries with the given data.
+
+        Args:
+            data: Data to update the entries with.
+            doc_ids: Document ID's of the entries to update.
+        """
+
+        with self.__database_lock.exclusive():
+            in_sync = self.__database_key == self.__get_database_key()
+            self.series_info_db.update(data, doc_ids=doc_ids)
+            for doc_id in doc_ids:
+                info = self.__get_series_info_dict(doc_id) | data
+                self.__index_series_info(
+                    doc_id, tuple(info[key] for key in self.SERIES_KEYS)
+                )
+
+            # Index only matches the updated database if it matched before
+            if in_sync:
+                self.__database_key = self.__get_database_key()
+
+
+    def __insert_series_info(self, data: dict[str, Any]) -> None:
+        """
+        Insert the given entry into the series database.
+
+        Args:
+            data: Entry to insert.
+        """
+
+        with self.__database_lock.exclusive():
+            in_sync = self.__database_key == self.__get_database_key()
+            doc_id = self.series_info_db.insert(data)
+            self.__index_series_info(
+                doc_id, tuple(data.get(key) for key in self.SERIES_KEYS)
+            )
+
+            # Index only matches the updated database if it matched before
+            if in_sync:
+                self.__database_key = self.__get_database_key()
 
 
     def get_series_info(self,
@@ -122,22 +320,23 @@ class MediaInfoSet:
             The SeriesInfo object indicated by the given attributes.
         """
 
-        # Get condition to search for this series in the database
+        # Search for this series in the (up to date) database
+        self.__refresh_series_index()
         full_name = SeriesInfo(name, year).full_name
-        condition = self.__series_info_condition(
+        doc_ids = self.__search_series_infos(
             full_name, emby_id, imdb_id, jellyfin_id, sonarr_id, tmdb_id,
             tvdb_id, tvrage_id
         )
 
         # Series doesn't exist, create new info, insert into database, return
-        if not (info := self.series_info_db.search(condition)):
+        if not doc_ids:
             series_info = SeriesInfo(
                 name, year, emby_id=emby_id, imdb_id=imdb_id,
                 jellyfin_id=jellyfin_id, sonarr_id=sonarr_id, tmdb_id=tmdb_id,
                 tvdb_id=tvdb_id, tvrage_id=tvrage_id, match_titles=match_titles
             )
 
-            self.series_info_db.insert({
+            self.__insert_series_info({
                 'full_name': full_name, 'emby_id': emby_id, 'imdb_id': imdb_id,
                 'jellyfin_id': jellyfin_id, 'sonarr_id': sonarr_id,
                 'tmdb_id': tmdb_id, 'tvdb_id': tvdb_id, 'tvrage_id': tvrage_id,
@@ -147,9 +346,10 @@ class MediaInfoSet:
 
         # Info for this series already exists
         # Check if multiple matches were returned (somehow)
-        if len(info) > 1:
-            log.debug(f'Multiple matches for existing SeriesInfo: {info}')
-        info = info[0]
+        if len(doc_ids) > 1:
+            log.debug(f'Multiple matches for existing SeriesInfo: '
+                      f'{[self.__get_series_info_dict(id_) for id_ in doc_ids]}')
+        info = self.__get_series_info_dict(doc_ids[0])
 
         # Update database only with ID's that are more accurate
         update_data = {}
@@ -168,11 +368,11 @@ class MediaInfoSet:
         if info['tvrage_id'] is None and tvrage_id is not None:
             update_data |= {'tvrage_id': tvrage_id}
 
-        # Update database, re-query for finalized data
+        # Update database, get finalized data
         if update_data:
             log.debug(f'Updating SeriesInfo database.. {update_data=}')
-            self.series_info_db.upsert(update_data, condition)
-            info = self.series_info_db.get(condition)
+            self.__update_series_infos(update_data, doc_ids)
+            info = self.__get_series_info_dict(doc_ids[0])
 
         # Return SeriesInfo created from finalized data
         return SeriesInfo(
@@ -212,23 +412,22 @@ class MediaInfoSet:
         # Update series info object with the given ID
         getattr(series_info, f'set_{id_type}_id')(id_)
 
-        # Update database
-        self.series_info_db.upsert({
-                'full_name': series_info.full_name,
-                'emby_id': series_info.emby_id,
-                'imdb_id': series_info.imdb_id,
-                'jellyfin_id': series_info.jellyfin_id,
-                'sonarr_id': series_info.sonarr_id,
-                'tmdb_id': series_info.tmdb_id,
-                'tvdb_id': series_info.tvdb_id,
-                'tvrage_id': series_info.tvrage_id,
-            },
-            self.__series_info_condition(
-                series_info.full_name, series_info.emby_id, series_info.imdb_id,
-                series_info.jellyfin_id, series_info.sonarr_id,
-                series_info.tmdb_id, series_info.tvdb_id, series_info.tvrage_id
-            )
-        )
+        # Update (or insert into) database
+        data = {
+            'full_name': series_info.full_name,
+            'emby_id': series_info.emby_id,
+            'imdb_id': series_info.imdb_id,
+            'jellyfin_id': series_info.jellyfin_id,
+            'sonarr_id': series_info.sonarr_id,
+            'tmdb_id': series_info.tmdb_id,
+            'tvdb_id': series_info.tvdb_id,
+            'tvrage_id': series_info.tvrage_id,
+        }
+        self.__refresh_series_index()
+        if doc_ids := self.__search_series_infos(*data.values()):
+            self.__update_series_infos(data, doc_ids)
+        else:
+            self.__insert_series_info(data)
 
         return None
 
@@ -3,6 +3,7 @@ from typing import Any, Optional, Union
 from pathlib import Path
 
 from tinydb import where, Query
+from tinydb.table import Document
 
 from modules.Debug import log
 from modules.Episode import Episode
@@ -14,6 +15,7 @@ from modules.SeriesInfo import SeriesInfo
 from modules.StyleSet import StyleSet
 
 SourceImage = Union[str, bytes, None]
+LoadedSeries = dict[tuple[int, int], dict[str, Any]]
 
 class MediaServer(ABC):
     """
@@ -51,6 +53,10 @@ class MediaServer(ABC):
         self.loaded_db = PersistentDatabase(self.LOADED_DB)
         self.filesize_limit = filesize_limit
 
+        # Index of loaded assets by library and series, read on first use
+        self.__loaded_assets: Optional[dict[tuple[str, str], LoadedSeries]]=None
+        self.__modified_assets: set[tuple[str, str, int, int]] = set()
+
 
     def __bool__(self) -> bool:
         return True
@@ -129,28 +135,157 @@ class MediaServer(ABC):
         )
 
 
+    def __get_loaded_assets(self) -> dict[tuple[str, str], LoadedSeries]:
+        """
+        Get the index of all loaded assets, reading the loaded database
+        if it has not been read yet.
+
+        Returns:
+            Dictionary of library and series names to the loaded details
+            of that series - keyed by season and episode number.
+        """
+
+        if self.__loaded_assets is None:
+            self.__loaded_assets = {}
+            for entry in self.loaded_db.all():
+                try:
+                    series_key = (entry['library'], entry['series'])
+                    episode_key = (entry['season'], entry['episode'])
+                except KeyError:
+                    continue
+                self.__loaded_assets.setdefault(series_key, {})[episode_key] \
+                    = entry
+
+        return self.__loaded_assets
+
+
+    def _get_loaded_series(self,
+            library_name: str,
+            series_info: SeriesInfo,
+        ) -> LoadedSeries:
+        """
+        Get the loaded details of all episodes of the given series.
+
+        Args:
+            library_name: Library name containing the series.
+            series_info: Series to get the details of.
+
+        Returns:
+            Dictionary of season and episode numbers to the loaded
+            details of that episode.
+        """
+
+        return self.__get_loaded_assets().get(
+            (library_name, series_info.full_name), {}
+        )
+
+
     def _get_loaded_episode(self,
-            loaded_series: list[dict[str, Any]],
+            loaded_series: LoadedSeries,
             episode: Episode
         ) -> Optional[dict[str, Any]]:
         """
-        Get the loaded details of the given Episode from the given list
-        of loaded series details.
+        Get the loaded details of the given Episode from the given
+        loaded series details.
 
         Args:
-            loaded_series: Filtered List from the loaded database to
-                search.
+            loaded_series: Loaded details of the series to search, as
+                returned by `_get_loaded_series()`.
             episode: The Episode to get the details of.
 
         Returns:
             Loaded details for the specified episode. None if an episode
-            of that index DNE in the given list.
+            of that index DNE in the given details.
+        """
+
+        return loaded_series.get((
+            episode.episode_info.season_number,
+            episode.episode_info.episode_number,
+        ))
+
+
+    def _set_loaded_episode(self,
+            library_name: str,
+            series_info: SeriesInfo,
+            episode: Episode,
+            **details: Any,
+        ) -> None:
+        """
+        Update (or add) the loaded details of the given Episode. This
+        only updates the in-memory index, and must be written to the
+        loaded database with `_write_loaded_assets()`.
+
+        Args:
+            library_name: Library name containing the series.
+            series_info: Series of the Episode.
+            episode: The Episode to update the details of.
+            details: Details of the Episode to update.
+        """
+
+        season = episode.episode_info.season_number
+        episode_number = episode.episode_info.episode_number
+        loaded_series = self.__get_loaded_assets().setdefault(
+            (library_name, series_info.full_name), {}
+        )
+        if (entry := loaded_series.get((season, episode_number))) is None:
+            entry = loaded_series[(season, episode_number)] = {
+                'library': library_name,
+                'series': series_info.full_name,
+                'season': season,
+                'episode': episode_number,
+            }
+
+        entry.update(details)
+        self.__modified_assets.add(
+            (library_name, series_info.full_name, season, episode_number)
+        )
+
+
+    def _write_loaded_assets(self) -> None:
+        """
+        Write all modified loaded details to the loaded database. All
+        details are written in a single batch.
+
+        Details are updated by their indexed document ID only if that
+        document is still the same episode - the database may have been
+        modified (e.g. records removed, or documents renumbered) by
+        another process since it was indexed. Otherwise the details are
+        upserted by their library, series, season, and episode.
         """
 
-        for entry in loaded_series:
-            if (entry['season'] == episode.episode_info.season_number and
-                entry['episode'] == episode.episode_info.episode_number):
-                return entry
+        if not self.__modified_assets:
+            return None
+
+        loaded_assets = self.__get_loaded_assets()
+        with self.loaded_db.batch():
+            for library, series, season, episode in self.__modified_assets:
+                loaded_series = loaded_assets.get((library, series), {})
+                if (entry := loaded_series.get((season, episode))) is None:
+                    continue
+
+                # Update the indexed document if it is still this episode
+                if isinstance(entry, Document):
+                    document = self.loaded_db.get(doc_id=entry.doc_id)
+                    if (document is not None
+                        and document.get('library') == library
+                        and document.get('series') == series
+                        and document.get('season') == season
+                        and document.get('episode') == episode):
+                        self.loaded_db.update(
+                            dict(entry), doc_ids=[entry.doc_id]
+                        )
+                        continue
+
+                # Document is new or has moved, upsert by episode
+                doc_ids = self.loaded_db.upsert(dict(entry), (
+                    (where('library') == library) &
+                    (where('series') == series) &
+                    (where('season') == season) &
+                    (where('episode') == episode)
+                ))
+                loaded_series[(season, episode)] = Document(entry, doc_ids[0])
+
+        self.__modified_assets.clear()
 
         return None
 
@@ -177,9 +312,7 @@ class MediaServer(ABC):
         """
 
         # Get all loaded details for this series
-        series = self.loaded_db.search(
-            self._get_condition(library_name, series_info)
-        )
+        series = self._get_loaded_series(library_name, series_info)
 
         filtered = {}
         for key, episode in episode_map.items():
@@ -225,6 +358,13 @@ class MediaServer(ABC):
         records = self.loaded_db.remove(condition)
         log.info(f'Deleted {len(records)} records')
 
+        # Remove records from the index
+        self.__get_loaded_assets().pop((library_name, series_info.full_name),None)
+        self.__modified_assets = {
+            key for key in self.__modified_assets
+            if key[:2] != (library_name, series_info.full_name)
+        }
+
 
     @abstractmethod
     def has_series(self,
@@ -1,12 +1,373 @@
+from contextlib import contextmanager, ExitStack
+from copy import deepcopy
+from json import dump, load
+from os import fsync, getpid, link, replace
 from pathlib import Path
+from shutil import copy2
+from sqlite3 import DatabaseError, OperationalError
+from threading import RLock
 from time import sleep
-from typing import Callable
+from typing import Any, Callable, Iterator, Optional, Union
+from weakref import WeakSet
 
 from json.decoder import JSONDecodeError
 from tinydb import TinyDB
+from tinydb.storages import Storage
 
 from modules.Debug import log
+from modules.FileLock import FileLock
 from modules import global_objects
+from modules.SQLiteDatabase import SQLiteDatabase
+
+
+class BatchedJSONStorage(Storage):
+    """
+    This class describes a TinyDB JSON storage which writes atomically,
+    and which can defer writes. Every write is done to a temporary file
+    which then replaces the database file, so a partial write never
+    corrupts the database.
+
+    Each write is first recorded in a write-ahead journal, and the
+    previous state of the database is kept as a backup - so a crash
+    mid-write is replayed from the journal the next time the database
+    is opened, and a corrupted database can be recovered from either.
+
+    All writes are done under an exclusive cross-process `FileLock` of
+    the database file, so multiple processes can share a database.
+    Reads are never locked, as the database file is always replaced
+    atomically.
+
+    Within a `batch()`, the database is read from disk once and all
+    writes are kept in memory (like TinyDB's CachingMiddleware), then
+    written to disk once at the end of the (outermost) batch. If the
+    database was modified by another process during the batch, the
+    documents changed within the batch are merged into the modified
+    database.
+    """
+
+    """Suffix of the write-ahead journal of each database"""
+    JOURNAL_SUFFIX = '.journal'
+
+    """Suffix of the backup (previous state) of each database"""
+    BACKUP_SUFFIX = '.bak'
+
+
+    def __init__(self, path: Path, **_) -> None:
+        """
+        Initialize this storage, creating the database file if it does
+        not exist, and replaying any journal left by an interrupted
+        write.
+
+        Args:
+            path: Path to the database file.
+        """
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self.path.touch()
+        self.journal = self.path.with_name(f'{self.path.name}{self.JOURNAL_SUFFIX}')
+        self.backup = self.path.with_name(f'{self.path.name}{self.BACKUP_SUFFIX}')
+
+        self.lock = FileLock.for_file(self.path)
+
+        self.__lock = RLock()
+        self.__batch_depth = 0
+        self.__cache: Optional[dict[str, dict[str, Any]]] = None
+        self.__base: Optional[dict[str, dict[str, Any]]] = None
+        self.__modified = False
+        self.__file_key: Optional[tuple[int, int]] = None
+
+        self.__replay_journal()
+
+
+    @staticmethod
+    def __read_json(file: Path) -> Optional[dict[str, dict[str, Any]]]:
+        """Read the given JSON file - None if the file is empty."""
+
+        with file.open('r', encoding='utf-8') as file_handle:
+            if not file_handle.read(1):
+                return None
+            file_handle.seek(0)
+            return load(file_handle)
+
+
+    def __get_file_key(self) -> Optional[tuple[int, int]]:
+        """
+        Get the key which identifies the current state of the database
+        file - i.e. its size and modification time. None if the file
+        does not exist.
+        """
+
+        try:
+            stat = self.path.stat()
+            return stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+
+    def __read_file(self) -> Optional[dict[str, dict[str, Any]]]:
+        """Read the database file - None if the file is empty."""
+
+        self.__file_key = self.__get_file_key()
+
+        return self.__read_json(self.path)
+
+
+    def is_stale(self) -> bool:
+        """
+        Whether the database file has been modified (i.e. by another
+        process) since it was last read or written by this storage.
+        """
+
+        return self.__get_file_key() != self.__file_key
+
+
+    def __write_json(self, data: dict[str, dict[str, Any]], file: Path) -> None:
+        """
+        Write the given data to the given file atomically - i.e. to a
+        (synced) temporary file which then replaces the file.
+        """
+
+        temp_file = self.path.with_name(f'.{file.name}.{getpid()}.tmp')
+        with temp_file.open('w', encoding='utf-8') as file_handle:
+            dump(data, file_handle)
+            file_handle.flush()
+            fsync(file_handle.fileno())
+        replace(temp_file, file)
+
+
+    def __backup_file(self) -> None:
+        """
+        Keep the current state of the database file as this database's
+        backup. The backup is a hardlink (or copy, if not possible) of
+        the database file.
+        """
+
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+
+        temp_file = self.path.with_name(f'.{self.backup.name}.{getpid()}.tmp')
+        try:
+            temp_file.unlink(missing_ok=True)
+            try:
+                link(self.path, temp_file)
+            except OSError:
+                copy2(self.path, temp_file)
+            replace(temp_file, self.backup)
+        except OSError:
+            log.debug(f'Unable to back up database {self.path.resolve()}')
+
+        return None
+
+
+    def __write_file(self, data: dict[str, dict[str, Any]]) -> None:
+        """
+        Write the given data to the database file. The data is written
+        to the journal first, then the current database is backed up,
+        and finally the data replaces the database (and the journal is
+        deleted).
+        """
+
+        with self.lock.exclusive():
+            self.__write_json(data, self.journal)
+            self.__backup_file()
+            self.__write_json(data, self.path)
+            self.journal.unlink(missing_ok=True)
+            self.__file_key = self.__get_file_key()
+
+
+    def __replay_journal(self) -> bool:
+        """
+        Replay any journal left by an interrupted write, writing the
+        journaled data to the database.
+
+        Returns:
+            True if a journal was replayed, False otherwise.
+        """
+
+        with self.__lock, self.lock.exclusive():
+            try:
+                data = self.__read_json(self.journal)
+            except FileNotFoundError:
+                return False
+            except (OSError, ValueError):
+                log.debug(f'Discarding invalid journal {self.journal.resolve()}')
+                self.journal.unlink(missing_ok=True)
+                return False
+
+            if data is None:
+                self.journal.unlink(missing_ok=True)
+                return False
+
+            self.__write_file(data)
+            log.info(f'Replayed interrupted write of {self.path.resolve()}')
+            return True
+
+
+    def recover(self) -> bool:
+        """
+        Recover the (corrupted) database file from this database's
+        journal or backup. Any deferred writes are discarded if the
+        database is recovered.
+
+        Returns:
+            True if the database was recovered (or is not corrupted),
+            False if there was nothing to recover from.
+        """
+
+        with self.__lock:
+            if self.__replay_journal():
+                self.__cache, self.__modified = None, False
+                return True
+
+            # Database is not corrupted, nothing to recover
+            try:
+                self.__read_file()
+                return True
+            except (OSError, ValueError):
+                pass
+
+            try:
+                if (data := self.__read_json(self.backup)) is None:
+                    return False
+            except (OSError, ValueError):
+                return False
+
+            self.__cache, self.__modified = None, False
+            with self.lock.exclusive():
+                self.__write_json(data, self.path)
+                self.__file_key = self.__get_file_key()
+            log.warning(f'Recovered {self.path.resolve()} from backup '
+                        f'{self.backup.resolve()}')
+            return True
+
+
+    def read(self) -> Optional[dict[str, dict[str, Any]]]:
+        """
+        Read the current state of the database - from memory if within
+        a batch, otherwise from disk.
+        """
+
+        with self.__lock:
+            if self.__batch_depth > 0 and self.__cache is not None:
+                return self.__cache
+
+            data = self.__read_file()
+            if self.__batch_depth > 0:
+                self.__cache = data
+                self.__base = deepcopy(data)
+
+            return data
+
+
+    def write(self, data: dict[str, dict[str, Any]]) -> None:
+        """
+        Write the given state of the database - to memory if within a
+        batch, otherwise to disk.
+        """
+
+        with self.__lock:
+            if self.__batch_depth > 0:
+                self.__cache = data
+                self.__modified = True
+            else:
+                self.__write_file(data)
+
+
+    @staticmethod
+    def __merge(
+            base: Optional[dict[str, dict[str, Any]]],
+            ours: dict[str, dict[str, Any]],
+            theirs: Optional[dict[str, dict[str, Any]]],
+        ) -> dict[str, dict[str, Any]]:
+        """
+        Merge the documents changed from the given base state into our
+        state into their (concurrently modified) state. Documents we
+        inserted whose ID was also used by them are given a new ID.
+
+        Args:
+            base: State of the database our changes were made to.
+            ours: State of the database with our changes.
+            theirs: Current state of the database.
+
+        Returns:
+            Merged state of the database.
+        """
+
+        base, theirs = base or {}, theirs or {}
+        for name, our_table in ours.items():
+            base_table = base.get(name, {})
+            their_table = theirs.setdefault(name, {})
+
+            # Remove documents we removed
+            for doc_id in base_table.keys() - our_table.keys():
+                their_table.pop(doc_id, None)
+
+            for doc_id, document in our_table.items():
+                # Skip documents we did not change
+                if base_table.get(doc_id) == document:
+                    continue
+
+                # Move any document we inserted with a conflicting ID
+                if (doc_id not in base_table
+                    and their_table.get(doc_id, document) != document):
+                    doc_id = str(max(map(int, their_table)) + 1)
+                their_table[doc_id] = document
+
+        # Clear any tables we truncated
+        for name in base.keys() - ours.keys():
+            theirs.pop(name, None)
+
+        return theirs
+
+
+    def flush(self) -> None:
+        """
+        Write any deferred changes to disk, merging them into the
+        database if it was modified by another process.
+        """
+
+        with self.__lock:
+            if self.__modified and self.__cache is not None:
+                with self.lock.exclusive():
+                    if not self.is_stale():
+                        self.__write_file(self.__cache)
+                    else:
+                        log.debug(f'Merging changes into concurrently modified '
+                                  f'{self.path.resolve()}')
+                        self.__write_file(self.__merge(
+                            self.__base, self.__cache, self.__read_file()
+                        ))
+                        # Database differs from the batch, so remains stale
+                        self.__file_key = None
+            self.__cache, self.__base = None, None
+            self.__modified = False
+
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Context manager to defer all writes until the end of the
+        (outermost) batch.
+        """
+
+        with self.__lock:
+            self.__batch_depth += 1
+        try:
+            yield
+        finally:
+            with self.__lock:
+                self.__batch_depth -= 1
+                if self.__batch_depth == 0:
+                    self.flush()
+
+
+    def close(self) -> None:
+        """Close this storage, writing any deferred changes."""
+
+        self.flush()
+
 
 class PersistentDatabase:
     """
@@ -15,42 +376,84 @@ class PersistentDatabase:
     TinyDB databases without littering the code with try/except
     statements. Any function calls on this object are called on the
     underlying TinyDB object and any raised JSONDecodeError Exceptions
-    are caught, the database is deleted, and the function is
-    re-executed.
+    are caught, the database is recovered (from its journal or backup),
+    and the function is re-executed. The database is only reset if it
+    cannot be recovered.
+
+    If the SQLite database backend is enabled, the underlying object is
+    instead an (indexed) SQLiteDatabase, which is migrated from the
+    existing TinyDB file the first time it is used.
+
+    Writes can be grouped with `batch()` (or `batch_all()` for every
+    database) so that the database is only written once per batch.
+
+    TinyDB databases are written under a cross-process lock, so the CLI
+    and web UI can share databases. SQLite databases are locked by
+    SQLite itself.
     """
 
     MAX_DB_RETRY_COUNT: int = 5
 
+    """Database functions which write to the database"""
+    WRITE_FUNCTIONS = (
+        'insert', 'insert_multiple', 'update', 'update_multiple', 'upsert',
+        'remove', 'truncate',
+    )
+
+    """How long to wait (in seconds) before retrying a failed function"""
+    RETRY_DELAY = 0.5
+
+    """All initialized (batched) databases, for batching"""
+    __databases: 'WeakSet[PersistentDatabase]' = WeakSet()
 
-    def __init__(self, filename: str) -> None:
+    """Valid database backends"""
+    BACKENDS = ('tinydb', 'sqlite')
+
+    """File extension of SQLite databases"""
+    SQLITE_EXTENSION = '.db'
+
+
+    def __init__(self, filename: str, *, batched: bool = True) -> None:
         """
         Initialize an instance of an object for the given TinyDB object
         with the given filename.
 
         Args:
             filename: Filename to the Database object.
+            batched: Whether this database is batched by `batch_all()`.
+                Unbatched databases are written immediately, unless
+                batched explicitly with `batch()`.
         """
 
         # Path to the file itself
         self.file: Path = global_objects.pp.database_directory / filename
         self.file.parent.mkdir(exist_ok=True, parents=True)
 
-        # Initialize TinyDB from file
+        # Path to the original TinyDB file if using SQLite
+        self.backend = global_objects.pp.database_backend
+        self.json_file = self.file
+        if self.backend == 'sqlite':
+            self.file = self.file.with_suffix(self.SQLITE_EXTENSION)
+
+        # Initialize database from file
         try:
-            self.db = TinyDB(self.file)
-        except JSONDecodeError:
+            self.db = self.__open()
+        except (JSONDecodeError, DatabaseError):
             log.exception(f'Database {self.file.resolve()} is corrupted')
-            self.reset()
+            self.recover()
         except Exception:
             log.exception(f'Uncaught exception on Database initialization')
             self.reset()
 
+        if batched:
+            PersistentDatabase.__databases.add(self)
+
 
     def __getattr__(self, database_func: str) -> Callable:
         """
         Get an arbitrary function for this object. This returns a
         wrapped version of the accessed function that catches any
-        uncaught JSONDecodeError exceptions (prompting a DB reset).
+        uncaught JSONDecodeError exceptions (prompting a DB recovery).
 
         Args:
             database_func: The function being called.
@@ -58,46 +461,183 @@ class PersistentDatabase:
         Returns:
             Wrapped callable that is the indicated function with any
             uncaught JSONDecodeError exceptions caught, the database
-            reset, and then the function recalled.
+            recovered, and then the function recalled.
         """
 
         # Define wrapper that calls given function with args, and then catches
         # any uncaught exceptions
-        def wrapper(*args, __retries: int = 0, **kwargs) -> None:
-            try:
-                kwargs.pop('__retries', None)
-                return getattr(self.db, database_func)(*args, **kwargs)
-            except (ValueError, JSONDecodeError) as e:
-                # If this function has been attempted too many times, just raise
-                if __retries > self.MAX_DB_RETRY_COUNT:
-                    raise e
-
-                # Log conflict, sleep, reset database, and try function again
-                log.exception(f'Database {self.file.resolve()} has conflict')
-                sleep(3)
-                self.reset()
-                return wrapper(*args, **kwargs, __retries=__retries+1)
+        def wrapper(*args, **kwargs) -> Any:
+            retries = 0
+            while True:
+                try:
+                    return self.__call(database_func, *args, **kwargs)
+                except (ValueError, JSONDecodeError, DatabaseError) as e:
+                    # If attempted too many times, just raise
+                    if retries >= self.MAX_DB_RETRY_COUNT:
+                        raise e
+
+                    # Locked (SQLite) databases and the first conflict are
+                    # retried as-is, as these are likely from a concurrent writer
+                    log.exception(f'Database {self.file.resolve()} has conflict')
+                    sleep(self.RETRY_DELAY)
+                    if retries > 0 and not isinstance(e, OperationalError):
+                        self.recover()
+                    retries += 1
 
         # Return "attribute" that is the wrapped function
         return wrapper
 
 
+    def __call(self, database_func: str, *args, **kwargs) -> Any:
+        """
+        Call the given function of this object's database. Functions
+        which write to a TinyDB database are called under an exclusive
+        lock of the database file, and TinyDB's caches are cleared if
+        the database was modified by another process. SQLite databases
+        are locked by SQLite itself.
+
+        Args:
+            database_func: The function being called.
+            args: Positional arguments to call the function with.
+            kwargs: Keyword arguments to call the function with.
+
+        Returns:
+            The return of the called function.
+        """
+
+        if not isinstance(self.db, TinyDB):
+            return getattr(self.db, database_func)(*args, **kwargs)
+
+        # Reads are not locked, as writes replace the file atomically
+        storage: BatchedJSONStorage = self.db.storage
+        if database_func not in self.WRITE_FUNCTIONS:
+            if storage.is_stale():
+                self.__clear_cache()
+            return getattr(self.db, database_func)(*args, **kwargs)
+
+        # Writes read and then write the database, so lock both
+        with storage.lock.exclusive():
+            if storage.is_stale():
+                self.__clear_cache()
+            return getattr(self.db, database_func)(*args, **kwargs)
+
+
+    def __clear_cache(self) -> None:
+        """
+        Clear the query and document ID caches of this object's TinyDB
+        database, e.g. after being modified by another process.
+        """
+
+        # TinyDB caches the next document ID, which may now be taken
+        table = self.db.table(self.db.default_table_name)
+        table.clear_cache()
+        table._next_id = None # pylint: disable=protected-access
+
+
+    def __open(self) -> Union[TinyDB, SQLiteDatabase]:
+        """
+        Open this object's database file with the indicated backend.
+
+        Returns:
+            The opened database.
+        """
+
+        if self.backend == 'sqlite':
+            return SQLiteDatabase(self.file, self.json_file)
+
+        return TinyDB(self.file, storage=BatchedJSONStorage)
+
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Context manager to defer all writes to this database until the
+        end of the (outermost) batch.
+
+        >>> with db.batch():
+        ...     db.upsert(...)
+        ...     db.upsert(...)
+        """
+
+        if isinstance(self.db, SQLiteDatabase):
+            with self.db.batch():
+                yield
+        else:
+            with self.db.storage.batch():
+                yield
+
+
+    @staticmethod
+    @contextmanager
+    def batch_all() -> Iterator[None]:
+        """
+        Context manager to batch the writes of every initialized
+        (batched) database, e.g. for all the operations of a single
+        show.
+        """
+
+        with ExitStack() as stack:
+            for database in list(PersistentDatabase.__databases):
+                stack.enter_context(database.batch())
+            yield
+
+
     def __len__(self) -> int:
-        """Call len() on this object's underlying TinyDB object."""
+        """Call len() on this object's underlying database object."""
 
         return len(self.db)
 
 
+    def recover(self) -> None:
+        """
+        Recover this object's (corrupted) associated database. TinyDB
+        databases are recovered from their journal or backup, and SQLite
+        databases from any readable records. If the database cannot be
+        recovered, it is reset.
+        """
+
+        database = getattr(self, 'db', None)
+
+        # Recover JSON database from journal or backup, reset if not possible
+        if isinstance(database, TinyDB):
+            if not database.storage.recover():
+                log.warning(f'Unable to recover database {self.file.resolve()}'
+                            f' - resetting')
+                self.reset()
+            database.clear_cache()
+            return None
+
+        # Recover any readable records of SQLite database (if corrupted)
+        if isinstance(database, SQLiteDatabase):
+            if database.is_intact():
+                return None
+            database.close()
+        if self.backend == 'sqlite':
+            SQLiteDatabase.recover(self.file)
+        elif not BatchedJSONStorage(self.file).recover():
+            self.file.unlink(missing_ok=True)
+        self.db = self.__open()
+
+        return None
+
+
     def reset(self) -> None:
         """
         Reset this object's associated database. This deletes the file
-        and  recreates a new TinyDB.
+        and  recreates a new database.
         """
 
         # Attempt to remove all records; if that fails delete and remake file
         try:
             self.db.truncate()
         except Exception:
+            if isinstance(getattr(self, 'db', None), SQLiteDatabase):
+                self.db.close()
             self.file.unlink(missing_ok=True)
+            if self.backend == 'sqlite':
+                for suffix in ('-wal', '-shm'):
+                    self.file.with_name(f'{self.file.name}{suffix}').unlink(
+                        missing_ok=True
+                    )
             self.file.parent.mkdir(exist_ok=True, parents=True)
-            self.db = TinyDB(self.file)
+            self.db = self.__open()
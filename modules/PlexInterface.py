@@ -3,7 +3,7 @@ from os import environ
 from pathlib import Path
 from re import IGNORECASE, compile as re_compile
 from sys import exit as sys_exit
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, Iterable, Optional, Union
 
 from PIL import Image
 from plexapi.exceptions import PlexApiException
@@ -33,6 +33,9 @@ from modules.StyleSet import StyleSet
 from modules.SyncInterface import SyncInterface
 from modules.WebInterface import WebInterface
 
+SeriesKey = tuple[str, str, Optional[str], Optional[int], Optional[int]]
+EpisodeIndex = tuple[Optional[int], Optional[int]]
+
 
 def catch_and_log(message: str, *, default: Any = None) -> Callable:
     """
@@ -87,6 +90,9 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
     """How many seconds to allow for a single transaction"""
     DEFAULT_TIMEOUT = 30 # seconds
 
+    """How many episodes to request per page when loading watched statuses"""
+    WATCHED_STATUS_PAGE_SIZE = 2500
+
     """Episode titles that indicate a placeholder and are to be ignored"""
     __TEMP_IGNORE_REGEX = re_compile(r'^(tba|tbd|episode \d+)$', IGNORECASE)
 
@@ -151,13 +157,30 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
         # List of "not found" warned series
         self.__warned = set()
 
+        # Libraries and series (or None if not found) resolved in this run;
+        # all keyed by case-insensitive library name (as Plex resolves them)
+        self.__libraries: dict[str, PlexLibrary] = {}
+        self.__series: dict[SeriesKey, Optional[PlexShow]] = {}
+
+        # Snapshots of each series' episodes, and those episodes by index
+        self.__episodes: dict[SeriesKey, list[PlexEpisode]] = {}
+        self.__episode_indices: dict[
+            SeriesKey, dict[EpisodeIndex, PlexEpisode]
+        ] = {}
+
+        # Watched statuses of all episodes of a library, by series rating key
+        self.__watched_statuses: dict[
+            str, dict[int, dict[EpisodeIndex, bool]]
+        ] = {}
+
 
     @retry(stop=stop_after_attempt(5),
            wait=wait_fixed(3)+wait_exponential(min=1, max=32),
            reraise=True)
     def __get_library(self, library_name: str) -> Optional[PlexLibrary]:
         """
-        Get the Library object under the given name.
+        Get the Library object under the given name. Libraries are only
+        queried once, until the cache is cleared.
 
         Args:
             library_name: The name of the library to get.
@@ -166,12 +189,144 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
             The Library object if found, None otherwise.
         """
 
+        # Return previously resolved library
+        key = self.__get_library_key(library_name)
+        if (library := self.__libraries.get(key)) is not None:
+            return library
+
         try:
-            return self.__server.library.section(library_name)
+            library = self.__server.library.section(library_name)
         except NotFound:
             log.error(f'Library "{library_name}" was not found in Plex')
             return None
 
+        self.__libraries[key] = library
+        return library
+
+
+    @staticmethod
+    def __get_library_key(library_name: str) -> str:
+        """
+        Get the key of the given library within the caches. Plex library
+        names are case-insensitive, so keys are casefolded.
+        """
+
+        return library_name.casefold()
+
+
+    def __get_series_key(self,
+            library_name: str,
+            series_info: SeriesInfo,
+        ) -> SeriesKey:
+        """Get the key of the given series within the series cache."""
+
+        return (
+            self.__get_library_key(library_name), series_info.full_name,
+            *(getattr(series_info, id_type) for id_type in self.SERIES_IDS),
+        )
+
+
+    def clear_cache(self,
+            library_name: Optional[str] = None,
+            series_info: Optional[SeriesInfo] = None,
+        ) -> None:
+        """
+        Clear the cached libraries, series, and episodes, so they are
+        re-queried from Plex when next accessed.
+
+        Args:
+            library_name: Name of the library to clear. If omitted, all
+                libraries and series are cleared.
+            series_info: Series to clear from the given library. If
+                omitted, the library and all its series are cleared.
+        """
+
+        if library_name is None:
+            self.__libraries.clear()
+            self.__series.clear()
+            self.__episodes.clear()
+            self.__episode_indices.clear()
+            self.__watched_statuses.clear()
+        elif series_info is None:
+            library_key = self.__get_library_key(library_name)
+            self.__libraries.pop(library_key, None)
+            self.__watched_statuses.pop(library_key, None)
+            for key in [key for key in self.__series if key[0] == library_key]:
+                del self.__series[key]
+            for key in [key for key in self.__episodes if key[0] == library_key]:
+                self.__clear_episodes(key)
+        else:
+            key = self.__get_series_key(library_name, series_info)
+            self.__series.pop(key, None)
+            self.__clear_episodes(key)
+
+
+    def __clear_episodes(self, key: SeriesKey) -> None:
+        """Clear the episode snapshot of the series with the given key."""
+
+        self.__episodes.pop(key, None)
+        self.__episode_indices.pop(key, None)
+
+
+    def __get_episodes(self,
+            library_name: str,
+            series_info: SeriesInfo,
+            series: PlexShow,
+        ) -> list[PlexEpisode]:
+        """
+        Get a snapshot of all the episodes of the given series. All the
+        episodes (and their indices, titles, GUIDs, watched statuses,
+        thumbnails, and rating keys) are fetched in one request, and
+        then reused until the series is modified or the cache cleared.
+
+        Args:
+            library_name: The name of the library containing the series.
+            series_info: The series to get the episodes of.
+            series: The Series object to get the episodes of.
+
+        Returns:
+            List of all the episodes of the series.
+        """
+
+        key = self.__get_series_key(library_name, series_info)
+        if (episodes := self.__episodes.get(key)) is None:
+            episodes = self.__episodes[key] = series.episodes()
+            self.__episode_indices[key] = {
+                (episode.parentIndex, episode.index): episode
+                for episode in episodes
+            }
+
+        return episodes
+
+
+    def __get_episode(self,
+            library_name: str,
+            series_info: SeriesInfo,
+            series: PlexShow,
+            episode_info: EpisodeInfo,
+        ) -> Optional[PlexEpisode]:
+        """
+        Get the given episode from the snapshot of the given series'
+        episodes.
+
+        Args:
+            library_name: The name of the library containing the series.
+            series_info: The series to get the episode of.
+            series: The Series object to get the episode of.
+            episode_info: The episode to get.
+
+        Returns:
+            The episode with the same indices as the given EpisodeInfo.
+            None if the episode DNE.
+        """
+
+        self.__get_episodes(library_name, series_info, series)
+        key = self.__get_series_key(library_name, series_info)
+
+        return self.__episode_indices[key].get(
+            (episode_info.season_number, episode_info.episode_number)
+        )
+
 
     @retry(stop=stop_after_attempt(5),
            wait=wait_fixed(3)+wait_exponential(min=1, max=32),
@@ -182,7 +337,8 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
         """
         Get the Series object from within the given Library associated
         with the given SeriesInfo. This tries to match by TVDb ID,
-        TMDb ID, name, and finally name.
+        TMDb ID, name, and finally name. Series are only resolved once
+        (per library and series ID's), until the cache is cleared.
 
         Args:
             library: The Library object to search for within Plex.
@@ -192,6 +348,32 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
             The Series associated with this SeriesInfo object.
         """
 
+        # Return previously resolved series
+        key = self.__get_series_key(library.title, series_info)
+        if key in self.__series:
+            return self.__series[key]
+
+        self.__series[key] = series = self.__find_series(library, series_info)
+        return series
+
+
+    def __find_series(self,
+            library: PlexLibrary,
+            series_info: SeriesInfo,
+        ) -> Optional[PlexShow]:
+        """
+        Find the Series object from within the given Library associated
+        with the given SeriesInfo in Plex.
+
+        Args:
+            library: The Library object to search for within Plex.
+            series_info: Series to find.
+
+        Returns:
+            The Series associated with this SeriesInfo object. None if
+            the series cannot be found.
+        """
+
         # Try by IMDb ID
         if series_info.has_id('imdb_id'):
             try:
@@ -421,7 +603,7 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
 
         # Create list of all episodes in Plex
         all_episodes = []
-        for plex_episode in series.episodes():
+        for plex_episode in self.__get_episodes(library_name, series_info, series):
             # Skip if episode has no season or episode number
             if (plex_episode.parentIndex is None
                 or plex_episode.index is None):
@@ -489,6 +671,65 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
         return self.__get_series(library, series_info) is not None
 
 
+    @catch_and_log('Error loading watched statuses')
+    def load_watched_statuses(self, library_names: Iterable[str]) -> None:
+        """
+        Load the watched statuses of every episode within the given
+        libraries. All episodes of a library are requested in a few
+        large pages, rather than per series. Loaded statuses are then
+        used by `update_watched_statuses()` until the cache is cleared.
+
+        Args:
+            library_names: Names of the libraries to load.
+        """
+
+        for library_name in library_names:
+            # Skip libraries already loaded, or which cannot be found
+            if (self.__get_library_key(library_name) in self.__watched_statuses
+                or not (library := self.__get_library(library_name))):
+                continue
+
+            # Request each page of episodes in this library
+            statuses: dict[int, dict[EpisodeIndex, bool]] = {}
+            start, total = 0, None
+            while total is None or start < total:
+                container = self.__server.query(
+                    f'/library/sections/{library.key}/all?type=4',
+                    headers={
+                        'X-Plex-Container-Start': str(start),
+                        'X-Plex-Container-Size': str(
+                            self.WATCHED_STATUS_PAGE_SIZE
+                        ),
+                    },
+                )
+                if container is None or not (videos := container.findall('Video')):
+                    break
+
+                # Store whether each episode is watched under its series
+                for video in videos:
+                    try:
+                        series_key = int(video.attrib['grandparentRatingKey'])
+                        index = (
+                            int(video.attrib['parentIndex']),
+                            int(video.attrib['index']),
+                        )
+                    except (KeyError, ValueError):
+                        continue
+                    statuses.setdefault(series_key, {})[index] = (
+                        int(video.attrib.get('viewCount', 0)) > 0
+                    )
+
+                start += len(videos)
+                total = int(container.attrib.get('totalSize', start))
+
+            self.__watched_statuses[self.__get_library_key(library_name)] = \
+                statuses
+            log.debug(f'Loaded watched statuses of {start} episodes in '
+                      f'"{library_name}"')
+
+        return None
+
+
     @catch_and_log('Error updating watched statuses')
     def update_watched_statuses(self,
             library_name: str,
@@ -501,7 +742,8 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
         the corresponding episodes within Plex, and the spoil status of
         the object. If a loaded card needs its spoiler status changed,
         the card is deleted and the loaded map is forced to reload that
-        card.
+        card. Watched statuses are taken from the loaded statuses of the
+        library (see `load_watched_statuses()`) if the series is loaded.
 
         Args:
             library_name: The name of the library containing the series.
@@ -525,19 +767,30 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
             return None
 
         # Get loaded characteristics of the series
-        loaded_series = self.loaded_db.search(
-            self._get_condition(library_name, series_info)
+        loaded_series = self._get_loaded_series(library_name, series_info)
+
+        # Get watched statuses of all episodes from the library; or series if
+        # not loaded (e.g. added after the library was loaded)
+        library_statuses = self.__watched_statuses.get(
+            self.__get_library_key(library_name), {}
         )
+        if (statuses := library_statuses.get(series.ratingKey)) is None:
+            statuses = {
+                (plex_episode.parentIndex, plex_episode.index):
+                    plex_episode.isWatched
+                for plex_episode in
+                self.__get_episodes(library_name, series_info, series)
+            }
 
         # Go through each episode within Plex and update Episode spoiler status
-        for plex_episode in series.episodes():
+        for (season_number, episode_number), watched in statuses.items():
             # If this Plex episode doesn't have Episode object(?) skip
-            ep_key = f'{plex_episode.parentIndex}-{plex_episode.index}'
+            ep_key = f'{season_number}-{episode_number}'
             if not (episode := episode_map.get(ep_key)):
                 continue
 
             # Set Episode watched/spoil statuses
-            episode.update_statuses(plex_episode.isWatched, style_set)
+            episode.update_statuses(watched, style_set)
 
             # Get characteristics of this Episode's loaded card
             details = self._get_loaded_episode(loaded_series, episode)
@@ -551,11 +804,13 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
             # Delete card, reset size in loaded map to force reload
             if delete_and_reset and loaded:
                 episode.delete_card(reason='updating style')
-                self.loaded_db.update(
-                    {'filesize': 0},
-                    self._get_condition(library_name, series_info, episode)
+                self._set_loaded_episode(
+                    library_name, series_info, episode, filesize=0
                 )
 
+        # Write any reset details to the loaded database
+        self._write_loaded_assets()
+
         return None
 
 
@@ -606,6 +861,9 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
                         series_info, guid.id[len('tvdb://'):]
                     )
 
+        # Store series under its updated ID's so it is not re-resolved
+        self.__series[self.__get_series_key(library_name, series_info)] = series
+
         return None
 
 
@@ -646,12 +904,10 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
 
             # Get episode from Plex
             info.queried_plex = True
-            try:
-                plex_episode = series.episode(
-                    season=info.season_number,
-                    episode=info.episode_number,
-                )
-            except NotFound:
+            plex_episode = self.__get_episode(
+                library_name, series_info, series, info
+            )
+            if plex_episode is None:
                 continue
 
             # Set the ID's for this object
@@ -693,19 +949,16 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
         if not (series := self.__get_series(library, series_info)):
             return None
 
-        # Get Episode from within Plex
-        try:
-            plex_episode = series.episode(
-                season=episode_info.season_number,
-                episode=episode_info.episode_number
-            )
-
-            return (f'{self.__server._baseurl}{plex_episode.thumb}' # pylint: disable=protected-access
-                    f'?X-Plex-Token={self.__token}')
-        except NotFound:
-            # Episode DNE in Plex, return
+        # Get Episode from within Plex, return if DNE
+        plex_episode = self.__get_episode(
+            library_name, series_info, series, episode_info
+        )
+        if plex_episode is None:
             return None
 
+        return (f'{self.__server._baseurl}{plex_episode.thumb}' # pylint: disable=protected-access
+                f'?X-Plex-Token={self.__token}')
+
 
     @catch_and_log('Error getting library names', default=[])
     def get_libraries(self) -> list[str]:
@@ -799,7 +1052,8 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
 
         # Go through each episode within Plex, set title cards
         error_count, loaded_count = 0, 0
-        for pl_episode in (pbar := tqdm(series.episodes(), **TQDM_KWARGS)):
+        episodes = self.__get_episodes(library_name, series_info, series)
+        for pl_episode in (pbar := tqdm(episodes, **TQDM_KWARGS)):
             pl_episode: PlexEpisode = pl_episode
             # If error count is too high, skip this series
             if error_count >= self.SKIP_SERIES_THRESHOLD:
@@ -840,18 +1094,19 @@ class PlexInterface(EpisodeDataSource, MediaServer, SyncInterface):
                 loaded_count += 1
 
             # Update/add loaded map with this entry
-            self.loaded_db.upsert({
-                'library': library_name,
-                'series': series_info.full_name,
-                'season': episode.episode_info.season_number,
-                'episode': episode.episode_info.episode_number,
-                'filesize': episode.destination.stat().st_size,
-                'spoiler': episode.spoil_type,
-            }, self._get_condition(library_name, series_info, episode))
+            self._set_loaded_episode(
+                library_name, series_info, episode,
+                filesize=episode.destination.stat().st_size,
+                spoiler=episode.spoil_type,
+            )
 
-        # Log load operations to user
+        # Write all loaded details to the loaded database
+        self._write_loaded_assets()
+
+        # Log load operations to user, series is modified so clear its cache
         if loaded_count > 0:
             log.info(f'Loaded {loaded_count} cards for "{series_info}"')
+            self.clear_cache(library_name, series_info)
 
         return None
 
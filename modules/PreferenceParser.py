@@ -14,7 +14,9 @@ from modules.ImageMagickInterface import ImageMagickInterface
 from modules.ImageMaker import ImageMaker
 from modules.JellyfinInterface import JellyfinInterface
 from modules.Manager import Manager
+from modules.PersistentDatabase import PersistentDatabase
 from modules.PlexInterface import PlexInterface
+from modules.RenderExecutor import RenderExecutor
 from modules.SeriesInfo import SeriesInfo
 from modules.SeriesYamlWriter import SeriesYamlWriter
 from modules.Show import Show
@@ -23,6 +25,7 @@ from modules.StandardSummary import StandardSummary
 from modules.StyleSet import StyleSet
 from modules.StylizedSummary import StylizedSummary
 from modules.TautulliInterface import TautulliInterface
+from modules.TextMetricsCache import TextMetricsCache
 from modules.Template import Template
 from modules.TitleCard import TitleCard
 from modules.TMDbInterface import TMDbInterface
@@ -103,9 +106,13 @@ class PreferenceParser(YamlReader):
         self.card_filename_format = TitleCard.DEFAULT_FILENAME_FORMAT
         self.card_extension = TitleCard.DEFAULT_CARD_EXTENSION
         self.card_dimensions = TitleCard.DEFAULT_CARD_DIMENSIONS
+        self.native_resolution = False
         self.image_source_priority = ('tmdb', 'plex', 'emby', 'jellyfin')
         self.episode_data_source = self.DEFAULT_EPISODE_DATA_SOURCE
         self.validate_fonts = True
+        self.render_workers = RenderExecutor.DEFAULT_WORKERS
+        self.render_cache_size = 0
+        self.database_backend = 'tinydb'
         self.season_folder_format = self.DEFAULT_SEASON_FOLDER_FORMAT
         self.sync_specials = True
         self.supported_language_codes = ['en']
@@ -163,6 +170,7 @@ class PreferenceParser(YamlReader):
         self.use_tmdb = False
         self.tmdb_api_key = None
         self.tmdb_retry_count = TMDbInterface.BLACKLIST_THRESHOLD
+        self.tmdb_request_workers = TMDbInterface.REQUEST_WORKERS
         self.tmdb_minimum_resolution = {'width': 0, 'height': 0}
         self.tmdb_skip_localized_images = False
         self.tmdb_logo_language_priority = ['en']
@@ -178,6 +186,13 @@ class PreferenceParser(YamlReader):
 
         self.imagemagick_container = None
         self.imagemagick_timeout = ImageMagickInterface.COMMAND_TIMEOUT_SECONDS
+        self.imagemagick_workers = 0
+        self.imagemagick_text_engine = 'imagemagick'
+        self.imagemagick_text_engine_tolerance = \
+            ImageMagickInterface.DEFAULT_TEXT_ENGINE_TOLERANCE
+        self.text_metrics_cache_size = TextMetricsCache.DEFAULT_SIZE
+        self.source_cache_size = 0
+        self.imagemagick_telemetry = False
 
         # Determine default media server
         if (not self._is_specified('emby')
@@ -453,6 +468,10 @@ class PreferenceParser(YamlReader):
                              f'be larger than 0px')
                 self.valid = False
 
+        if (value := self.get('options', 'native_resolution',
+                               type_=bool)) is not None:
+            self.native_resolution = value
+
         if (value := self.get('options', 'filename_format', type_=str)) is not None:
             if TitleCard.validate_card_format_string(value):
                 self.card_filename_format = value
@@ -478,6 +497,26 @@ class PreferenceParser(YamlReader):
         if (value := self.get('options', 'validate_fonts', type_=bool)) is not None:
             self.validate_fonts = value
 
+        if (value := self.get('options', 'render_workers', type_=int)) is not None:
+            if value < 1:
+                log.critical(f'Render workers must be 1 or greater')
+                self.valid = False
+            else:
+                self.render_workers = value
+
+        if (value := self.get('options', 'render_cache_size',
+                               type_=self.filesize_as_bytes)) is not None:
+            self.render_cache_size = value
+
+        if (value := self.get('options', 'database_backend',
+                               type_=self.TYPE_LOWER_STR)) is not None:
+            if value in PersistentDatabase.BACKENDS:
+                self.database_backend = value
+            else:
+                log.critical(f'Database backend "{value}" is invalid - must be '
+                             f'one of {PersistentDatabase.BACKENDS}')
+                self.valid = False
+
         if (value := self.get('options', 'season_folder_format',
                                type_=str)) is not None:
             self.season_folder_format = value
@@ -750,6 +789,14 @@ class PreferenceParser(YamlReader):
             else:
                 self.tmdb_retry_count = value
 
+        if (value := self.get('tmdb', 'request_workers', type_=int)) is not None:
+            if not 1 <= value <= TMDbInterface.MAX_REQUEST_WORKERS:
+                log.critical(f'TMDb request workers must be between 1 and '
+                             f'{TMDbInterface.MAX_REQUEST_WORKERS}')
+                self.valid = False
+            else:
+                self.tmdb_request_workers = value
+
         if (value := self.get('tmdb', 'minimum_resolution', type_=str)) is not None:
             try:
                 width, height = map(int, value.lower().split('x'))
@@ -838,6 +885,50 @@ class PreferenceParser(YamlReader):
         if (value := self.get('imagemagick', 'timeout',type_=int)) is not None:
             self.imagemagick_timeout = value
 
+        # Workers only run inside an ImageMagick container
+        if (value := self.get('imagemagick', 'workers', type_=int)) is not None:
+            if value < 0:
+                log.critical(f'ImageMagick workers must be 0 or greater')
+                self.valid = False
+            elif value > 0 and self.imagemagick_container is None:
+                log.warning(f'ImageMagick workers are only used with an '
+                            f'ImageMagick container - ignoring')
+            else:
+                self.imagemagick_workers = value
+
+        if (value := self.get('imagemagick', 'source_cache_size',
+                               type_=self.filesize_as_bytes)) is not None:
+            self.source_cache_size = value
+
+        if (value := self.get('imagemagick', 'text_engine',
+                               type_=self.TYPE_LOWER_STR)) is not None:
+            if value in ImageMagickInterface.TEXT_ENGINES:
+                self.imagemagick_text_engine = value
+            else:
+                log.critical(f'Text engine "{value}" is invalid - must be one '
+                             f'of {ImageMagickInterface.TEXT_ENGINES}')
+                self.valid = False
+
+        if (value := self.get('imagemagick', 'text_engine_tolerance',
+                               type_=int)) is not None:
+            if value < 0:
+                log.critical(f'Text engine tolerance must be 0 or greater')
+                self.valid = False
+            else:
+                self.imagemagick_text_engine_tolerance = value
+
+        if (value := self.get('imagemagick', 'text_metrics_cache_size',
+                               type_=int)) is not None:
+            if value < 0:
+                log.critical(f'Text metrics cache size must be 0 or greater')
+                self.valid = False
+            else:
+                self.text_metrics_cache_size = value
+
+        if (value := self.get('imagemagick', 'telemetry',
+                               type_=bool)) is not None:
+            self.imagemagick_telemetry = value
+
         return None
 
 
@@ -1270,11 +1361,25 @@ class PreferenceParser(YamlReader):
         }
 
     @property
-    def tmdb_interface_kwargs(self) -> dict[str, str]:
+    def imagemagick_arguments(self) -> dict[str, Union[str, bool, int]]:
+        """Arguments for initializing a ImageMagickInterface"""
+
+        return {
+            'container': self.imagemagick_container,
+            'use_magick_prefix': self.use_magick_prefix,
+            'timeout': self.imagemagick_timeout,
+            'workers': self.imagemagick_workers,
+            'text_engine': self.imagemagick_text_engine,
+            'text_engine_tolerance': self.imagemagick_text_engine_tolerance,
+        }
+
+    @property
+    def tmdb_interface_kwargs(self) -> dict[str, Union[str, int]]:
         """Arguments for initializing a TMDbInterface"""
 
         return {
             'api_key': self.tmdb_api_key,
+            'request_workers': self.tmdb_request_workers,
         }
 
 
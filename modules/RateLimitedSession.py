@@ -0,0 +1,112 @@
+from concurrent.futures import Future
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any, Optional
+
+from requests import Response, Session
+
+RequestKey = tuple[str, str, str]
+
+
+class RateLimitedSession(Session):
+    """
+    This class describes a requests Session whose requests are limited
+    to a maximum rate by a token bucket. The bucket holds up to `burst`
+    tokens, and is refilled at `rate` tokens per second; every request
+    consumes one token, blocking until one is available.
+
+    Identical GET requests that are made while the first is still in
+    flight (e.g. by multiple threads) are deduplicated - only the first
+    request is sent, and all callers receive its Response.
+
+    >>> session = RateLimitedSession(40)
+    >>> session.get(url, params=params).json()
+    """
+
+    __slots__ = ('rate', 'burst', '__lock', '__tokens', '__refilled',
+                 '__in_flight')
+
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        """
+        Initialize this session. The token bucket starts full.
+
+        Args:
+            rate: Maximum sustained number of requests per second.
+            burst: Maximum number of requests that can be made at once.
+                Defaults to one second's worth of requests.
+        """
+
+        super().__init__()
+
+        self.rate = rate
+        self.burst = max(1, int(rate) if burst is None else burst)
+        self.__lock = Lock()
+        self.__tokens = float(self.burst)
+        self.__refilled = monotonic()
+        self.__in_flight: dict[RequestKey, Future] = {}
+
+
+    def __acquire(self) -> None:
+        """Take a token from the bucket, blocking until one is available."""
+
+        while True:
+            with self.__lock:
+                # Refill the bucket for the time elapsed since the last refill
+                now = monotonic()
+                self.__tokens = min(
+                    self.burst,
+                    self.__tokens + (now - self.__refilled) * self.rate,
+                )
+                self.__refilled = now
+
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return None
+
+                # Wait until the next token is added
+                delay = (1 - self.__tokens) / self.rate
+
+            sleep(delay)
+
+
+    def request(self, method: str, url: str, *args, **kwargs: Any) -> Response:
+        """
+        Make the given request once a token is available. Arguments are
+        passed directly to `Session.request()`.
+
+        Returns:
+            The Response of the request. Deduplicated GET requests share
+            the same Response object, whose content is already read.
+        """
+
+        # Streamed or non-GET requests cannot be shared
+        if method.upper() != 'GET' or kwargs.get('stream'):
+            self.__acquire()
+            return super().request(method, url, *args, **kwargs)
+
+        # Wait for an identical in-flight request if there is one
+        key = (url, repr(args), repr(sorted(kwargs.items())))
+        with self.__lock:
+            if (future := self.__in_flight.get(key)) is not None:
+                owner = False
+            else:
+                future = self.__in_flight[key] = Future()
+                owner = True
+        if not owner:
+            return future.result()
+
+        # Make this request, sharing the result with any waiting requests
+        try:
+            self.__acquire()
+            response = super().request(method, url, *args, **kwargs)
+            response.content # pylint: disable=pointless-statement
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self.__lock:
+                del self.__in_flight[key]
+
+        future.set_result(response)
+        return response
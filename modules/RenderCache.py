@@ -0,0 +1,264 @@
+from hashlib import sha256
+from json import dumps
+from os import link, replace, utime
+from pathlib import Path
+from shutil import copy2
+from threading import Lock
+from typing import Any, Optional
+
+from modules.BaseCardType import BaseCardType
+from modules import global_objects
+from modules.Debug import log
+
+
+class RenderCache:
+    """
+    This class describes a size-bounded, content-addressed cache of
+    created title cards. Entries are keyed by the content hash of the
+    source image (and any mask image alongside it), the card type, and
+    all the (fully resolved) arguments of that card type - as well as
+    any global settings which affect the created card - so an identical
+    card is only ever created once.
+
+    Cards are stored by hardlinking (or copying, if not possible) the
+    created card into the cache, and restored by hardlinking (or
+    copying) the cached card to the new destination. Once the cached
+    cards which are not linked to any other file exceed the size of the
+    cache, the least recently used of those are deleted.
+    """
+
+    """Directory where all cached cards are stored"""
+    CACHE_DIRECTORY = Path(__file__).parent / '.objects' / 'render_cache'
+
+    """Card arguments which do not affect the created card"""
+    __IGNORED_ARGUMENTS = ('card_file', 'preferences')
+
+    __slots__ = ('directory', 'size', '__hashes', '__lock')
+
+
+    def __init__(self, size: int, directory: Path = CACHE_DIRECTORY) -> None:
+        """
+        Initialize this cache.
+
+        Args:
+            size: Maximum size (in bytes) of all unlinked cached cards.
+            directory: Directory to store cached cards in.
+        """
+
+        self.directory = directory
+        self.size = size
+        self.__hashes: dict[tuple[str, int, int], str] = {}
+        self.__lock = Lock()
+
+
+    def __get_file_hash(self, file: Path) -> str:
+        """
+        Get the content hash of the given file. Hashes are stored by
+        file path, size, and modification time so that each unmodified
+        file is only read once.
+
+        Args:
+            file: Path to the file to hash.
+
+        Returns:
+            Hex digest of the file's contents.
+
+        Raises:
+            OSError if the file cannot be read.
+        """
+
+        stat = file.stat()
+        file_key = (str(file), stat.st_size, stat.st_mtime_ns)
+        if (file_hash := self.__hashes.get(file_key)) is None:
+            file_hash = sha256(file.read_bytes()).hexdigest()
+            self.__hashes[file_key] = file_hash
+
+        return file_hash
+
+
+    def __resolve_argument(self, value: Any) -> Any:
+        """
+        Resolve the given card argument into a JSON-serializable value.
+        Files (e.g. fonts, logos, and masks) are resolved into their
+        content hash so that an edited file invalidates any cards which
+        use it.
+
+        Args:
+            value: Argument value to resolve.
+
+        Returns:
+            Resolved value.
+        """
+
+        if isinstance(value, Path):
+            try:
+                return f'file:{self.__get_file_hash(value)}'
+            except OSError:
+                return str(value)
+        if isinstance(value, (list, tuple, set)):
+            return [self.__resolve_argument(sub_value) for sub_value in value]
+        if isinstance(value, dict):
+            return {
+                str(key): self.__resolve_argument(sub_value)
+                for key, sub_value in value.items()
+            }
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+
+        return repr(value)
+
+
+    def get_key(self, card_class: type, kwargs: dict[str, Any]) -> Optional[str]:
+        """
+        Get the cache key of the card created by the given card type and
+        arguments.
+
+        Args:
+            card_class: CardType class which creates the card.
+            kwargs: Keyword arguments the card type is initialized with.
+
+        Returns:
+            Hex digest of the key. None if the source image of the card
+            cannot be read (and therefore the card cannot be cached).
+        """
+
+        # Cards cannot be cached without a readable source
+        try:
+            source_file = Path(kwargs['source_file'])
+            source_hash = self.__get_file_hash(source_file)
+        except (KeyError, TypeError, OSError):
+            return None
+
+        # Font (and other) files may be specified as strings
+        arguments = {'source_file': source_hash}
+        for key, value in kwargs.items():
+            if key in self.__IGNORED_ARGUMENTS or key == 'source_file':
+                continue
+            if (isinstance(value, str)
+                and (key == 'font' or key.endswith('_file'))):
+                value = Path(value)
+            arguments[key] = self.__resolve_argument(value)
+
+        preferences = global_objects.pp
+        key = dumps({
+            'card_type': f'{card_class.__module__}.{card_class.__qualname__}',
+            'arguments': arguments,
+            'mask': self.__resolve_argument(
+                BaseCardType.get_mask_file(source_file)
+            ),
+            'extension': Path(kwargs.get('card_file', '')).suffix.lower(),
+            'card_dimensions': preferences.card_dimensions,
+            'native_resolution': preferences.native_resolution,
+            'text_engine': preferences.imagemagick_text_engine,
+            'text_engine_tolerance':
+                preferences.imagemagick_text_engine_tolerance,
+            'version': str(getattr(preferences, 'version', '')),
+        }, sort_keys=True, default=repr)
+
+        return sha256(key.encode()).hexdigest()
+
+
+    @staticmethod
+    def __link_or_copy(source: Path, destination: Path) -> None:
+        """
+        Hardlink the given file to the given destination, copying it if
+        a hardlink cannot be created (e.g. across filesystems). The copy
+        is written to a temporary file first, so the destination is
+        never partial.
+
+        Args:
+            source: File to link or copy.
+            destination: Path to link or copy the file to.
+
+        Raises:
+            OSError if the file can neither be linked nor copied.
+        """
+
+        try:
+            link(source, destination)
+        except OSError:
+            temp_file = destination.with_name(f'.{destination.name}.tmp')
+            copy2(source, temp_file)
+            replace(temp_file, destination)
+
+
+    def __evict(self) -> None:
+        """
+        Delete the least recently used unlinked cards until under size.
+        Cards which are still hardlinked to their destination take up no
+        additional space, and are never evicted.
+        """
+
+        with self.__lock:
+            entries = []
+            for card in self.directory.iterdir():
+                try:
+                    stat = card.stat()
+                except OSError:
+                    continue
+                if stat.st_nlink == 1:
+                    entries.append((stat.st_mtime, stat.st_size, card))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, card in sorted(entries):
+                if total_size <= self.size:
+                    break
+
+                card.unlink(missing_ok=True)
+                total_size -= size
+                log.debug(f'Evicted cached card "{card.name}"')
+
+
+    def restore(self, key: str, destination: Path) -> bool:
+        """
+        Restore the cached card with the given key to the given
+        destination.
+
+        Args:
+            key: Cache key of the card to restore.
+            destination: Path to restore the cached card to.
+
+        Returns:
+            True if the card was cached and restored, False otherwise.
+        """
+
+        card = self.directory / f'{key}{destination.suffix.lower()}'
+        if not card.exists():
+            return False
+
+        try:
+            self.__link_or_copy(card, destination)
+            utime(card)
+        except OSError:
+            log.exception(f'Unable to restore cached card "{card.name}"')
+            return False
+
+        log.debug(f'Restored cached card "{card.name}"')
+        return True
+
+
+    def store(self, key: str, card: Path) -> None:
+        """
+        Store the given (created) card in this cache.
+
+        Args:
+            key: Cache key of the card to store.
+            card: Path to the created card.
+        """
+
+        cached_card = self.directory / f'{key}{card.suffix.lower()}'
+        if cached_card.exists():
+            return None
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.__link_or_copy(card, cached_card)
+        except FileExistsError:
+            return None
+        except OSError:
+            log.exception(f'Unable to cache card "{card.resolve()}"')
+            return None
+
+        self.__evict()
+
+        return None
@@ -0,0 +1,167 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from tqdm import tqdm
+
+from modules.Debug import log, TQDM_KWARGS
+from modules.TitleCard import TitleCard
+
+
+class RenderExecutor:
+    """
+    This class describes a bounded executor for creating TitleCard
+    objects concurrently. Because all card creation is done by
+    ImageMagick (in separate processes), a pool of threads is sufficient
+    to utilize multiple CPU cores.
+
+    If initialized with a single worker, cards are created serially when
+    they are waited for (or when this executor is shut down) - so each
+    card is created under the progress bar of its `wait()`.
+
+    >>> with RenderExecutor(4) as executor:
+    ...     futures = executor.submit_all(title_cards)
+    ...     created = executor.wait(futures)
+    """
+
+    """Default number of concurrent card renders"""
+    DEFAULT_WORKERS = 1
+
+    __slots__ = ('workers', '__executor', '__pending')
+
+
+    def __init__(self, workers: int = DEFAULT_WORKERS) -> None:
+        """
+        Initialize this executor.
+
+        Args:
+            workers: Maximum number of cards to create at once.
+        """
+
+        self.workers = max(1, workers)
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        if self.workers > 1:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix='TCMRender',
+            )
+
+        # TitleCards submitted for serial creation, created when waited for
+        self.__pending: dict[Future, TitleCard] = {}
+
+
+    def __enter__(self) -> 'RenderExecutor':
+        """Enter a context with this executor."""
+
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        """Exit this executor's context, waiting for all renders."""
+
+        self.shutdown()
+
+
+    def shutdown(self) -> None:
+        """Shutdown this executor, waiting for all pending renders."""
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+
+        # Create any serial cards which were never waited for
+        for future in list(self.__pending):
+            self.__create(future)
+
+
+    def __create(self, future: Future) -> None:
+        """
+        Create the pending (serial) TitleCard of the given Future, and
+        set the Future's result.
+
+        Args:
+            future: Future (returned by `submit()`) to create the card
+                of.
+        """
+
+        title_card = self.__pending.pop(future)
+        try:
+            future.set_result(title_card.create())
+        except Exception as exc: # pylint: disable=broad-except
+            future.set_exception(exc)
+
+
+    def submit(self, title_card: TitleCard) -> Future:
+        """
+        Submit the given TitleCard for creation.
+
+        Args:
+            title_card: TitleCard to create.
+
+        Returns:
+            Future whose result is the return of `TitleCard.create()`.
+            If creating serially, the card is not created until the
+            Future is waited for with `wait()`.
+        """
+
+        # Defer serial creation until this Future is waited for
+        if self.__executor is None:
+            future = Future()
+            self.__pending[future] = title_card
+            return future
+
+        return self.__executor.submit(title_card.create)
+
+
+    def submit_all(self, title_cards: Iterable[TitleCard]) -> list[Future]:
+        """
+        Submit all the given TitleCards for creation.
+
+        Args:
+            title_cards: TitleCards to create.
+
+        Returns:
+            List of Futures corresponding to each submitted TitleCard.
+        """
+
+        return [self.submit(title_card) for title_card in title_cards]
+
+
+    def wait(self,
+            futures: list[Future],
+            description: Optional[str] = None,
+        ) -> list[bool]:
+        """
+        Wait for the given Futures to complete, collecting their results
+        in submission order. Any serially submitted cards are created
+        (in order) now.
+
+        Args:
+            futures: Futures (returned by `submit()`) to wait for.
+            description: Optional description of a progress bar to
+                display while waiting.
+
+        Returns:
+            List of whether each card was created, in the same order as
+            the given Futures.
+        """
+
+        # Only display a progress bar if a description was provided
+        pbar = None
+        if description is not None and futures:
+            futures = pbar = tqdm(futures, desc=description, **TQDM_KWARGS)
+
+        results = []
+        for future in futures:
+            # Create serial cards now, describing each card's Episode
+            if future in self.__pending:
+                if pbar is not None:
+                    pbar.set_description(
+                        f'Creating {self.__pending[future].episode}'
+                    )
+                self.__create(future)
+
+            try:
+                results.append(future.result())
+            except Exception: # pylint: disable=broad-except
+                log.exception(f'Uncaught Exception while creating card')
+                results.append(False)
+
+        return results
@@ -0,0 +1,87 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class RequestExecutor:
+    """
+    This class describes a bounded executor for making web requests
+    concurrently. Requests spend almost all their time waiting on the
+    network, so a pool of threads is sufficient to have many requests
+    in flight at once.
+
+    If initialized with a single worker, requests are made immediately
+    upon submission (i.e. serially).
+
+    >>> executor = RequestExecutor(8)
+    >>> futures = [executor.submit(get_title, info) for info in infos]
+    >>> titles = [future.result() for future in futures]
+    """
+
+    """Default number of concurrent requests"""
+    DEFAULT_WORKERS = 8
+
+    __slots__ = ('workers', '__executor')
+
+
+    def __init__(self,
+            workers: int = DEFAULT_WORKERS,
+            name: str = 'TCMRequest',
+        ) -> None:
+        """
+        Initialize this executor.
+
+        Args:
+            workers: Maximum number of requests to make at once.
+            name: Prefix of the names of this executor's threads.
+        """
+
+        self.workers = max(1, workers)
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        if self.workers > 1:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix=name,
+            )
+
+
+    def __enter__(self) -> 'RequestExecutor':
+        """Enter a context with this executor."""
+
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        """Exit this executor's context, waiting for all requests."""
+
+        self.shutdown()
+
+
+    def shutdown(self) -> None:
+        """Shutdown this executor, waiting for all pending requests."""
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+
+
+    def submit(self, function: Callable, /, *args, **kwargs) -> Future:
+        """
+        Submit the given function to be called with the given arguments.
+
+        Args:
+            function: Function (that makes some requests) to call.
+            args: Positional arguments to call the function with.
+            kwargs: Keyword arguments to call the function with.
+
+        Returns:
+            Future whose result is the return of the function.
+        """
+
+        # Call serially, wrapping result in a completed Future
+        if self.__executor is None:
+            future = Future()
+            try:
+                future.set_result(function(*args, **kwargs))
+            except Exception as exc: # pylint: disable=broad-except
+                future.set_exception(exc)
+            return future
+
+        return self.__executor.submit(function, *args, **kwargs)
@@ -0,0 +1,557 @@
+from contextlib import contextmanager
+from json import JSONDecodeError, dumps, load, loads
+from os import replace
+from pathlib import Path
+from sqlite3 import connect, Connection, DatabaseError
+from threading import RLock
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Union
+
+from tinydb.queries import QueryLike
+from tinydb.table import Document
+
+from modules.Debug import log
+
+
+"""Type of all values which can be indexed"""
+IndexableValue = Union[str, int, float, bool, None]
+
+
+class SQLiteDatabase:
+    """
+    This class describes a SQLite-backed document database which
+    implements the subset of the TinyDB Table interface used by
+    PersistentDatabase (`insert`, `upsert`, `update`, `get`, `search`,
+    `contains`, `remove`, etc.) - so either can be used interchangeably.
+
+    Documents are stored as JSON, and the common lookup keys of all
+    TCM databases (`INDEXED_KEYS`) are additionally stored in indexed
+    columns. Any equality conditions on these keys within a TinyDB query
+    are used to select candidate documents via the indexes, and the full
+    query is then evaluated on only those candidates - so results are
+    always identical to TinyDB, without scanning the entire database.
+
+    The database is written in WAL mode so that concurrent readers are
+    not blocked by writes.
+    """
+
+    """Document keys which are stored in indexed columns"""
+    INDEXED_KEYS = (
+        'library', 'series', 'season', 'episode', 'query', 'file', 'character',
+    )
+
+    """Name of the TinyDB table migrated from JSON databases"""
+    DEFAULT_TABLE = '_default'
+
+    """Statement to insert (or replace) a document by its row"""
+    __INSERT_STATEMENT = (
+        f'INSERT OR REPLACE INTO documents VALUES (?, ?, '
+        f'{", ".join("?" * len(INDEXED_KEYS))})'
+    )
+
+    __slots__ = ('file', '__connection', '__lock', '__batch_depth')
+
+
+    def __init__(self, file: Path, json_file: Optional[Path] = None) -> None:
+        """
+        Initialize this database, creating it if it does not exist.
+
+        Args:
+            file: Path to the SQLite database file.
+            json_file: Path to a TinyDB JSON database to migrate into
+                this database. This is only done if the SQLite database
+                does not already exist.
+        """
+
+        self.file = file
+        self.__lock = RLock()
+        self.__batch_depth = 0
+
+        # Migrate existing JSON database into a new database
+        if not file.exists() and json_file is not None and json_file.exists():
+            self.__migrate(json_file)
+
+        self.__connection = self.__connect(file)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+
+
+    @staticmethod
+    def __connect(file: Path) -> Connection:
+        """
+        Connect to the given database file, creating the document table
+        and indexes if they do not exist.
+
+        Args:
+            file: Path to the SQLite database file.
+
+        Returns:
+            Connection to the database.
+        """
+
+        connection = connect(file, check_same_thread=False, timeout=30)
+        columns = ', '.join(f'"{key}"' for key in SQLiteDatabase.INDEXED_KEYS)
+        with connection:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS documents ('
+                f'id INTEGER PRIMARY KEY, data TEXT NOT NULL, {columns})'
+            )
+            for key in SQLiteDatabase.INDEXED_KEYS:
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS "documents_{key}" '
+                    f'ON documents("{key}")'
+                )
+
+        return connection
+
+
+    def __migrate(self, json_file: Path) -> None:
+        """
+        Migrate all documents of the given TinyDB JSON database into a
+        new SQLite database. The migrated database is written under a
+        temporary name, so an interrupted migration is re-attempted.
+
+        Args:
+            json_file: Path to the TinyDB JSON database to migrate.
+        """
+
+        try:
+            with json_file.open('r', encoding='utf-8') as file_handle:
+                tables = load(file_handle)
+        except (OSError, JSONDecodeError):
+            log.exception(f'Unable to migrate database {json_file.resolve()}')
+            return None
+
+        temp_file = self.file.with_name(f'{self.file.name}.tmp')
+        temp_file.unlink(missing_ok=True)
+        connection = self.__connect(temp_file)
+        documents = tables.get(self.DEFAULT_TABLE, {})
+        with connection:
+            connection.executemany(
+                self.__INSERT_STATEMENT,
+                (self.__get_row(document, int(doc_id))
+                 for doc_id, document in documents.items())
+            )
+        connection.close()
+        replace(temp_file, self.file)
+        log.info(f'Migrated {len(documents)} records from '
+                 f'{json_file.resolve()} to {self.file.resolve()}')
+
+        return None
+
+
+    @staticmethod
+    def __get_row(document: Mapping, doc_id: Optional[int]) -> tuple:
+        """
+        Get the database row of the given document.
+
+        Args:
+            document: Document to get the row of.
+            doc_id: ID of the document. None if a new ID should be
+                assigned.
+
+        Returns:
+            Tuple of the ID, serialized document, and the value of each
+            indexed key.
+        """
+
+        return (
+            doc_id,
+            dumps(document),
+            *(SQLiteDatabase.__get_indexed_value(document.get(key))
+              for key in SQLiteDatabase.INDEXED_KEYS),
+        )
+
+
+    @staticmethod
+    def __get_indexed_value(value: Any) -> IndexableValue:
+        """
+        Get the value stored in an indexed column for the given value.
+        Values which cannot be compared by SQLite (e.g. lists) are not
+        stored.
+        """
+
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+
+        return None
+
+
+    @staticmethod
+    def __get_index_conditions(
+            query_hash: Any,
+        ) -> Optional[dict[str, IndexableValue]]:
+        """
+        Get the equality conditions on indexed keys which must be true
+        for the query with the given hash to match a document.
+
+        Args:
+            query_hash: Hash of the TinyDB query, i.e. `Query._hash`.
+
+        Returns:
+            Dictionary of indexed keys to the value they must equal.
+            None if the conditions are contradictory (and therefore the
+            query can never match).
+        """
+
+        if not isinstance(query_hash, tuple) or not query_hash:
+            return {}
+
+        # Equality of a top-level indexed key
+        if (query_hash[0] == '==' and len(query_hash) == 3
+            and len(query_hash[1]) == 1
+            and query_hash[1][0] in SQLiteDatabase.INDEXED_KEYS
+            and (query_hash[2] is None
+                 or isinstance(query_hash[2], (str, int, float, bool)))):
+            return {query_hash[1][0]: query_hash[2]}
+
+        # All conditions of a conjunction must be true
+        conditions = {}
+        if query_hash[0] == 'and':
+            for sub_hash in query_hash[1]:
+                sub_conditions = SQLiteDatabase.__get_index_conditions(sub_hash)
+                if sub_conditions is None:
+                    return None
+                for key, value in sub_conditions.items():
+                    if key in conditions and conditions[key] != value:
+                        return None
+                    conditions[key] = value
+
+        return conditions
+
+
+    def __select(self,
+            cond: Optional[QueryLike] = None,
+            doc_ids: Optional[Iterable[int]] = None,
+        ) -> Iterator[Document]:
+        """
+        Select all documents which match the given condition.
+
+        Args:
+            cond: Condition the documents must match. If None, all
+                documents are selected.
+            doc_ids: IDs of the documents to select. If None, documents
+                are not selected by ID.
+
+        Yields:
+            Each matching Document.
+        """
+
+        # Narrow candidates by indexed conditions and IDs
+        clauses, parameters = [], []
+        if cond is not None:
+            conditions = self.__get_index_conditions(
+                getattr(cond, '_hash', None)
+            )
+            if conditions is None:
+                return
+            for key, value in conditions.items():
+                clauses.append(f'"{key}" IS ?')
+                parameters.append(value)
+        if doc_ids is not None:
+            doc_ids = list(doc_ids)
+            clauses.append(f'id IN ({", ".join("?" * len(doc_ids))})')
+            parameters.extend(doc_ids)
+
+        statement = 'SELECT id, data FROM documents'
+        if clauses:
+            statement += f' WHERE {" AND ".join(clauses)}'
+        statement += ' ORDER BY id'
+
+        with self.__lock:
+            rows = self.__connection.execute(statement, parameters).fetchall()
+
+        # Evaluate full condition on each candidate
+        for doc_id, data in rows:
+            document = Document(loads(data), doc_id)
+            if cond is None or cond(document):
+                yield document
+
+
+    def __write(self, documents: Iterable[tuple[Mapping, Optional[int]]]
+        ) -> list[int]:
+        """
+        Write the given documents to the database.
+
+        Args:
+            documents: Documents (and their IDs) to write. Documents
+                without an ID are inserted under a new ID.
+
+        Returns:
+            List of the IDs of all written documents.
+        """
+
+        doc_ids = []
+        with self.__transaction():
+            for document, doc_id in documents:
+                cursor = self.__connection.execute(
+                    self.__INSERT_STATEMENT, self.__get_row(document, doc_id)
+                )
+                doc_ids.append(cursor.lastrowid if doc_id is None else doc_id)
+
+        return doc_ids
+
+
+    @contextmanager
+    def __transaction(self) -> Iterator[None]:
+        """
+        Context manager for a write transaction. The transaction is
+        committed on exit (or rolled back if an exception is raised),
+        unless within a batch - in which case it is committed at the end
+        of the batch.
+        """
+
+        with self.__lock:
+            try:
+                yield
+            except Exception:
+                if self.__batch_depth == 0:
+                    self.__connection.rollback()
+                raise
+            if self.__batch_depth == 0:
+                self.__connection.commit()
+
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Context manager to group all writes into a single transaction,
+        which is committed at the end of the (outermost) batch.
+
+        >>> with database.batch():
+        ...     database.upsert(...)
+        ...     database.upsert(...)
+        """
+
+        with self.__lock:
+            self.__batch_depth += 1
+        try:
+            yield
+        finally:
+            with self.__lock:
+                self.__batch_depth -= 1
+                if self.__batch_depth == 0:
+                    self.__connection.commit()
+
+
+    def __len__(self) -> int:
+        """Number of documents in this database."""
+
+        with self.__lock:
+            return self.__connection.execute(
+                'SELECT COUNT(*) FROM documents'
+            ).fetchone()[0]
+
+
+    def __iter__(self) -> Iterator[Document]:
+        """Iterate through all documents in this database."""
+
+        return self.__select()
+
+
+    def all(self) -> list[Document]:
+        """Get all documents in this database."""
+
+        return list(self.__select())
+
+
+    def insert(self, document: Mapping) -> int:
+        """Insert the given document, returning its ID."""
+
+        return self.__write([(document, None)])[0]
+
+
+    def insert_multiple(self, documents: Iterable[Mapping]) -> list[int]:
+        """Insert the given documents, returning their IDs."""
+
+        return self.__write((document, None) for document in documents)
+
+
+    def search(self, cond: QueryLike) -> list[Document]:
+        """Get all documents matching the given condition."""
+
+        return list(self.__select(cond))
+
+
+    def get(self,
+            cond: Optional[QueryLike] = None,
+            doc_id: Optional[int] = None,
+            doc_ids: Optional[list[int]] = None,
+        ) -> Union[Document, list[Document], None]:
+        """
+        Get the first document matching the given condition or ID. If
+        IDs are given, all documents with those IDs are returned.
+        """
+
+        if doc_ids is not None:
+            return list(self.__select(doc_ids=doc_ids))
+        if doc_id is not None:
+            return next(self.__select(doc_ids=[doc_id]), None)
+        if cond is None:
+            raise RuntimeError('You have to pass either cond or doc_id')
+
+        return next(self.__select(cond), None)
+
+
+    def contains(self,
+            cond: Optional[QueryLike] = None,
+            doc_id: Optional[int] = None,
+        ) -> bool:
+        """Whether any document matches the given condition or ID."""
+
+        return self.get(cond, doc_id) is not None
+
+
+    def count(self, cond: QueryLike) -> int:
+        """Number of documents matching the given condition."""
+
+        return len(self.search(cond))
+
+
+    def update(self,
+            fields: Union[Mapping, Callable[[dict], None]],
+            cond: Optional[QueryLike] = None,
+            doc_ids: Optional[Iterable[int]] = None,
+        ) -> list[int]:
+        """
+        Update all documents matching the given condition (or IDs) with
+        the given fields (or function), returning the updated IDs.
+        """
+
+        updated = []
+        with self.__lock:
+            for document in list(self.__select(cond, doc_ids)):
+                if callable(fields):
+                    fields(document)
+                else:
+                    document.update(fields)
+                updated.append((dict(document), document.doc_id))
+
+            return self.__write(updated)
+
+
+    def upsert(self,
+            document: Mapping,
+            cond: Optional[QueryLike] = None,
+        ) -> list[int]:
+        """
+        Update all documents matching the given condition with the given
+        document; or insert the document if none match. Returns the IDs
+        of the updated or inserted documents.
+        """
+
+        if isinstance(document, Document) and cond is None:
+            return self.__write([(document, document.doc_id)])
+        if cond is None:
+            raise ValueError('If you don\'t specify a search query, you must '
+                             'specify a doc_id. Hint: use a table.Document '
+                             'object.')
+
+        with self.__lock:
+            if (updated := self.update(document, cond)):
+                return updated
+
+            return [self.insert(document)]
+
+
+    def remove(self,
+            cond: Optional[QueryLike] = None,
+            doc_ids: Optional[Iterable[int]] = None,
+        ) -> list[int]:
+        """Remove all documents matching the given condition or IDs."""
+
+        if cond is None and doc_ids is None:
+            raise RuntimeError('Use truncate() to remove all documents')
+
+        with self.__transaction():
+            removed = [
+                document.doc_id for document in self.__select(cond, doc_ids)
+            ]
+            self.__connection.executemany(
+                'DELETE FROM documents WHERE id=?',
+                ((doc_id,) for doc_id in removed)
+            )
+
+        return removed
+
+
+    def truncate(self) -> None:
+        """Remove all documents from this database."""
+
+        with self.__transaction():
+            self.__connection.execute('DELETE FROM documents')
+
+
+    def is_intact(self) -> bool:
+        """Whether this database passes SQLite's integrity check."""
+
+        try:
+            with self.__lock:
+                return self.__connection.execute(
+                    'PRAGMA quick_check'
+                ).fetchone()[0] == 'ok'
+        except DatabaseError:
+            return False
+
+
+    def close(self) -> None:
+        """Close the connection to this database."""
+
+        with self.__lock:
+            self.__connection.close()
+
+
+    @staticmethod
+    def recover(file: Path) -> int:
+        """
+        Recover the (corrupted) database at the given file. The corrupted
+        database (and any WAL files) is moved aside, and every document
+        which can still be read from it is written into a new database.
+
+        Args:
+            file: Path to the corrupted SQLite database file.
+
+        Returns:
+            Number of recovered documents.
+        """
+
+        # Move corrupted database aside, keeping it for manual recovery
+        corrupted = file.with_name(f'{file.name}.corrupt')
+        for suffix in ('', '-wal', '-shm'):
+            source = file.with_name(f'{file.name}{suffix}')
+            if source.exists():
+                replace(source, corrupted.with_name(f'{corrupted.name}{suffix}'))
+
+        # Read every document which is still readable
+        documents = []
+        try:
+            connection = connect(corrupted)
+            try:
+                for doc_id, data in connection.execute(
+                        'SELECT id, data FROM documents'):
+                    try:
+                        documents.append((loads(data), doc_id))
+                    except (TypeError, ValueError):
+                        continue
+            finally:
+                connection.close()
+        except DatabaseError:
+            log.exception(f'Unable to read all records of corrupted database '
+                          f'{corrupted.resolve()}')
+
+        # Write recovered documents into a new database
+        temp_file = file.with_name(f'{file.name}.tmp')
+        temp_file.unlink(missing_ok=True)
+        connection = SQLiteDatabase.__connect(temp_file)
+        with connection:
+            connection.executemany(
+                SQLiteDatabase.__INSERT_STATEMENT,
+                (SQLiteDatabase.__get_row(document, doc_id)
+                 for document, doc_id in documents)
+            )
+        connection.close()
+        replace(temp_file, file)
+        log.warning(f'Recovered {len(documents)} records of corrupted database '
+                    f'{file.resolve()} - corrupted database moved to '
+                    f'{corrupted.resolve()}')
+
+        return len(documents)
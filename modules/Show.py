@@ -1,6 +1,7 @@
+from concurrent.futures import Future
 from copy import copy
 from pathlib import Path
-from typing import TYPE_CHECKING, Literal, Optional, Union
+from typing import TYPE_CHECKING, Any, Iterable, Literal, Optional, Union
 
 from tqdm import tqdm
 
@@ -16,6 +17,7 @@ from modules import global_objects
 from modules.JellyfinInterface import JellyfinInterface
 from modules.PlexInterface import PlexInterface
 from modules.Profile import Profile
+from modules.RenderExecutor import RenderExecutor
 from modules.SeasonPosterSet import SeasonPosterSet
 from modules.SeriesInfo import SeriesInfo
 from modules.SonarrInterface import SonarrInterface
@@ -507,24 +509,34 @@ class Show(YamlReader):
         Episode objects to this show's episodes dictionary.
         """
 
-        # Reset episodes dictionary
+        # Reset episodes dictionary, create Episode for each entry
         self.episodes = {}
+        self.__add_episodes(self.file_interface.read())
 
-        # Go through each entry in the file interface
-        seasons, episodes = set(), []
-        for entry, given_keys in self.file_interface.read():
-            # Add season number to set
-            episode_info: EpisodeInfo = entry['episode_info']
-            seasons.add(episode_info.season_number)
 
-            # Update episode list(s) for maxima addition
-            episodes.append((
-                episode_info.season_number,
-                episode_info.episode_number,
-                episode_info.abs_number,
-            ))
+    def __add_episodes(self,
+            entries: Iterable[tuple[dict[str, Any], set[str]]],
+        ) -> None:
+        """
+        Add Episode objects for the given datafile entries to this
+        show's episodes dictionary, replacing any existing Episodes, and
+        then update the maxima of all Episodes. Any MultiEpisodes are
+        removed, as they may no longer be accurate.
+
+        Args:
+            entries: Entries (and their given keys) as read from this
+                show's file interface.
+        """
+
+        # Remove MultiEpisodes
+        self.episodes = {
+            key: episode for key, episode in self.episodes.items()
+            if not isinstance(episode, MultiEpisode)
+        }
 
-            # Create Episode object for this entry, store under key
+        # Go through each entry, creating Episode object stored under key
+        for entry, given_keys in entries:
+            episode_info: EpisodeInfo = entry['episode_info']
             self.episodes[episode_info.key] = Episode(
                 base_source=self.source_directory,
                 destination=self.__get_destination(episode_info),
@@ -533,6 +545,16 @@ class Show(YamlReader):
                 **entry,
             )
 
+        # Get indices of all episodes for maxima addition
+        seasons, episodes = set(), []
+        for episode in self.episodes.values():
+            seasons.add(episode.episode_info.season_number)
+            episodes.append((
+                episode.episode_info.season_number,
+                episode.episode_info.episode_number,
+                episode.episode_info.abs_number,
+            ))
+
         for episode in self.episodes.values():
             episode.add_maxima(
                 # season_episode_count is the number of episodes in the season
@@ -621,8 +643,11 @@ class Show(YamlReader):
             return None
 
         # If any new episodes remain, add to datafile and create Episode object
-        self.file_interface.add_many_entries(new_episodes)
-        self.read_source()
+        with self.file_interface.session():
+            self.file_interface.add_many_entries(new_episodes)
+            self.__add_episodes(self.file_interface.read(new_episodes))
+        self.find_multipart_episodes()
+
         return None
 
 
@@ -695,56 +720,71 @@ class Show(YamlReader):
     def add_translations(self) -> None:
         """
         Add translated episode titles to the Episodes of this series.
-        This  show's source file is re-read if any translations are
-        added.
+        All translations are queried from TMDb concurrently, and are then
+        added to this show's source file (written once), and to the
+        existing Episodes.
         """
 
         # If no translations were specified, or TMDb syncing isn't enabled, skip
         if not self.tmdb_interface or not self.title_languages:
             return None
 
-        # Go through every episode and look for translations
-        modified = False
-        for episode in (pbar := tqdm(self.episodes.values(), **TQDM_KWARGS)):
-            # Get each translation for this series
-            for translation in self.title_languages:
-                # If the key already exists, skip this episode
-                if episode.key_is_specified(translation['key']):
-                    continue
-
-                # Update progress bar
-                pbar.set_description(f'Checking {episode}')
+        # Whether translated preferred titles replace Episode titles
+        use_preferred_titles = not self.get(
+            'ignore_preferred_titles', default=False
+        )
 
-                # Query TMDb for the title of this episode in this language
-                language_title = self.tmdb_interface.get_episode_title(
-                    self.series_info,
-                    episode.episode_info,
-                    translation['language'],
-                )
+        # Query TMDb for all missing translations of every episode at once
+        lookups = [
+            (episode, translation, self.tmdb_interface.submit(
+                self.tmdb_interface.get_episode_title,
+                self.series_info,
+                episode.episode_info,
+                translation['language'],
+            ))
+            for episode in self.episodes.values()
+            for translation in self.title_languages
+            if not episode.key_is_specified(translation['key'])
+        ]
+
+        # Wait for all lookups before any Episode titles are modified
+        language_titles = [
+            future.result() for *_, future in tqdm(
+                lookups, desc=f'Checking translations of {self}',
+                **TQDM_KWARGS,
+            )
+        ]
 
+        # Go through every looked up translation
+        with self.file_interface.session():
+            for (episode, translation, _), language_title in zip(
+                    lookups, language_titles):
                 # If episode wasn't found, or original title was returned, skip
                 if (language_title is None
                     or language_title == episode.episode_info.title.full_title):
                     continue
 
-                # Modify data file entry with new title
-                modified = True
+                # Modify data file entry and Episode with new title
+                key = translation['key']
                 self.file_interface.add_data_to_entry(
-                    episode.episode_info,
-                    **{translation['key']: language_title},
+                    episode.episode_info, **{key: language_title},
                 )
+                episode.given_keys.add(key)
+                episode.extra_characteristics[key] = language_title
+                if (key == 'preferred_title' and use_preferred_titles
+                    and isinstance(episode, Episode)):
+                    episode.episode_info.title = Title(
+                        language_title,
+                        original_title=episode.episode_info.title.title_yaml,
+                    )
 
                 # Adding translated title, log it
-                log.debug(f'Added "{language_title}" to "{translation["key"]}" '
-                          f'for {self} {episode}')
+                log.debug(f'Added "{language_title}" to "{key}" for {self} '
+                          f'{episode}')
 
                 # Delete old card
                 episode.delete_card(reason='adding translation')
 
-        # If any translations were added, re-read source
-        if modified:
-            self.read_source()
-
         return None
 
 
@@ -763,9 +803,10 @@ class Show(YamlReader):
             # SVG logos need to be converted first
             if url.endswith('.svg'):
                 # Download .svgs to temporary location pre-conversion
-                success = self.tmdb_interface.download_image(
-                    url, self.card_class.TEMPORARY_SVG_FILE
+                svg_file = self.card_class.get_temporary_file(
+                    self.card_class.TEMPORARY_SVG_FILE
                 )
+                success = self.tmdb_interface.download_image(url, svg_file)
 
                 # If failed to download, skip
                 if not success:
@@ -773,9 +814,8 @@ class Show(YamlReader):
                     return None
 
                 # Convert temporary SVG to PNG at logo filepath
-                logo = self.card_class.convert_svg_to_png(
-                    self.card_class.TEMPORARY_SVG_FILE, self.logo,
-                )
+                logo = self.card_class.convert_svg_to_png(svg_file, self.logo)
+                svg_file.unlink(missing_ok=True)
 
                 if logo is None:
                     log.warning(f'SVG to PNG conversion failed for {self}')
@@ -913,16 +953,36 @@ class Show(YamlReader):
             and self.plex_interface.has_series(self.library_name,
                                                self.series_info))
 
-        # For each episode, query interfaces (in priority order) for source
-        for episode in (pbar := tqdm(self.episodes.values(), **TQDM_KWARGS)):
-            # If only selecting a specific episode, skip others
-            if select_only is not None and episode is not select_only:
-                continue
-
-            # Skip this episode if not downloadable, or source exists
-            if not episode.downloadable_source or episode.source.exists():
-                continue
+        # Episodes that need a source
+        episodes = [
+            episode for episode in self.episodes.values()
+            if (select_only is None or episode is select_only)
+            and episode.downloadable_source and not episode.source.exists()
+        ]
+
+        # If TMDb is the first interface checked, query all its sources at once
+        always_check = {
+            'emby': always_check_emby, 'jellyfin': always_check_jellyfin,
+            'plex': always_check_plex, 'tmdb': always_check_tmdb,
+        }
+        tmdb_images: dict[Episode, Future] = {}
+        if next((source for source in self.image_source_priority
+                 if always_check.get(source)), None) == 'tmdb':
+            tmdb_images = {
+                episode: self.tmdb_interface.submit(
+                    self.tmdb_interface.get_source_image,
+                    self.series_info,
+                    episode.episode_info,
+                    skip_localized_images=self.tmdb_skip_localized_images,
+                )
+                for episode in episodes
+                if not self.tmdb_interface.is_permanently_blacklisted(
+                    self.series_info, episode.episode_info
+                )
+            }
 
+        # For each episode, query interfaces (in priority order) for source
+        for episode in (pbar := tqdm(episodes, **TQDM_KWARGS)):
             # Update progress bar
             pbar.set_description(f'Selecting {episode}')
 
@@ -930,7 +990,7 @@ class Show(YamlReader):
             check_emby = always_check_emby
             check_jellyfin = always_check_jellyfin
             check_plex = always_check_plex
-            check_tmdb = (
+            check_tmdb = episode in tmdb_images or (
                 always_check_tmdb and not
                 self.tmdb_interface.is_permanently_blacklisted(
                     self.series_info, episode.episode_info
@@ -959,11 +1019,14 @@ class Show(YamlReader):
                         episode.episode_info,
                     )
                 elif source_interface == 'tmdb' and check_tmdb:
-                    image = self.tmdb_interface.get_source_image(
-                        self.series_info,
-                        episode.episode_info,
-                        skip_localized_images=self.tmdb_skip_localized_images,
-                    )
+                    if (future := tmdb_images.get(episode)) is not None:
+                        image = future.result()
+                    else:
+                        image = self.tmdb_interface.get_source_image(
+                            self.series_info,
+                            episode.episode_info,
+                            skip_localized_images=self.tmdb_skip_localized_images,
+                        )
                     # Exit loop or continue depending on permanent blacklist status
                     if not image:
                         pb = self.tmdb_interface.is_permanently_blacklisted(
@@ -1048,21 +1111,32 @@ class Show(YamlReader):
             self.episodes[f'0{mp.season_number}-{mp.episode_start}'] = mp
 
 
-    def create_missing_title_cards(self) -> None:
-        """Create any missing title cards for each episode."""
+    def get_missing_title_cards(self) -> Optional[list[TitleCard]]:
+        """
+        Get the TitleCard objects for each missing title card of this
+        show. If the config of any episodes has changed, their existing
+        cards are deleted (and therefore returned as missing).
+
+        Returns:
+            List of TitleCards to create. None if this show has no media
+            directory.
+        """
 
         # If the media directory is unspecified, exit
         if self.media_directory is None:
             return None
 
-        # See if these cards need to be deleted/updated for new config
-        if global_objects.show_record_keeper.is_updated(self):
-            log.info(f'Detected new YAML for {self} - deleting old cards')
-            for episode in self.episodes.values():
-                episode.delete_card(reason='new config')
+        # See if any cards need to be deleted/updated for new config
+        updated = global_objects.show_record_keeper.get_updated_episodes(self)
+        if updated:
+            log.info(f'Detected new YAML for {len(updated)} episodes of {self} '
+                     f'- deleting old cards')
+            for key in updated:
+                self.episodes[key].delete_card(reason='new config')
 
         # Go through each episode for this show
-        for episode in (pbar := tqdm(self.episodes.values(), **TQDM_KWARGS)):
+        title_cards = []
+        for episode in self.episodes.values():
             # Skip episodes without a destination or that already exist
             if not episode.destination or episode.destination.exists():
                 continue
@@ -1072,9 +1146,6 @@ class Show(YamlReader):
                 and not episode.source.exists()):
                 continue
 
-            # Update progress bar
-            pbar.set_description(f'Creating {episode}')
-
             # Create a TitleCard object for this episode with Show's profile
             title_card = TitleCard(
                 episode,
@@ -1092,11 +1163,54 @@ class Show(YamlReader):
                 log.warning(f'Invalid font for {episode} of {self}')
                 continue
 
-            # Source exists, create the title card
-            title_card.create()
+            title_cards.append(title_card)
+
+        return title_cards
+
+
+    def record_title_cards(self, created: list[bool]) -> None:
+        """
+        Record the results of creating this show's missing title cards.
+
+        Args:
+            created: Whether each TitleCard returned by
+                `get_missing_title_cards()` was created, in order.
+        """
+
+        if created:
+            log.debug(f'Created {sum(created)}/{len(created)} cards for {self}')
 
         # Update record keeeper
         global_objects.show_record_keeper.add_config(self)
+
+
+    def create_missing_title_cards(self,
+            executor: Optional[RenderExecutor] = None,
+        ) -> None:
+        """
+        Create any missing title cards for each episode.
+
+        Args:
+            executor: Executor to create the title cards with. If
+                omitted, an executor with the globally indicated number
+                of workers is used.
+        """
+
+        if (title_cards := self.get_missing_title_cards()) is None:
+            return None
+
+        # Create cards on the given executor, or one for just this show
+        if executor is None:
+            with RenderExecutor(self.preferences.render_workers) as executor:
+                created = executor.wait(
+                    executor.submit_all(title_cards), f'Creating {self}'
+                )
+        else:
+            created = executor.wait(
+                executor.submit_all(title_cards), f'Creating {self}'
+            )
+
+        self.record_title_cards(created)
         return None
 
 
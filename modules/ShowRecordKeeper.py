@@ -3,11 +3,13 @@ from hashlib import sha256
 from typing import TYPE_CHECKING, Any
 
 from tinydb import where
+from tinydb.queries import QueryLike
 
 from modules.BaseCardType import BaseCardType
 from modules.Debug import log
 from modules import global_objects
 from modules.PersistentDatabase import PersistentDatabase
+from modules.TitleCard import TitleCard
 from modules.Version import Version
 
 if TYPE_CHECKING:
@@ -23,6 +25,11 @@ class ShowRecordKeeper:
     and result in a different hash. This can/should be used to detect
     when to delete and remake cards upon changes to the YAML.
 
+    Each record also stores a fingerprint of every Episode, combining
+    the Show hash with the Episode's title and season text, extras, and
+    source. This allows only the cards of the changed Episodes to be
+    remade.
+
     Hashes are stored by the series' full name and associated media
     directory, so changes to the media directory will result in a NEW
     hash, not a changed one.
@@ -30,10 +37,19 @@ class ShowRecordKeeper:
 
     """Attributes of a Show object that should affect a shows record"""
     HASH_RELEVANT_ATTRIBUTES = (
+        'card_class', 'episode_text_format', 'style_set.watched',
+        'title_languages', 'font', 'profile',
+    )
+
+    """Attributes hashed for records without Episode fingerprints"""
+    LEGACY_HASH_RELEVANT_ATTRIBUTES = (
         'card_class', 'episode_text_format', 'style_set.watched',
         '_Show__episode_map', 'title_languages', 'extras', 'font', 'profile',
     )
 
+    """How many hex characters of each Episode fingerprint are stored"""
+    FINGERPRINT_LENGTH = 16
+
     """Record database of hashes corresponding to specified shows"""
     RECORD_DATABASE = 'show_records.json'
 
@@ -100,7 +116,10 @@ class ShowRecordKeeper:
         hash_obj.update(str(record).encode('utf-8'))
 
 
-    def __get_show_hash(self, show: 'Show') -> int:
+    def __get_show_hash(self,
+            show: 'Show',
+            attributes: tuple[str, ...] = HASH_RELEVANT_ATTRIBUTES,
+        ) -> int:
         """
         Get the hash of the given config. This hash is deterministic,
         and is based only on attributes of the config that visually
@@ -108,6 +127,7 @@ class ShowRecordKeeper:
 
         Args:
             show: Show object to hash.
+            attributes: Attributes of the show to hash.
 
         Returns:
             Integer of the (SHA256) hash of the given object.
@@ -117,7 +137,7 @@ class ShowRecordKeeper:
         hash_obj = sha256()
 
         # Hash each relevant attribute of the Show object
-        for attr in self.HASH_RELEVANT_ATTRIBUTES:
+        for attr in attributes:
             # If a nested attribute, iterate through objects
             if '.' in attr:
                 subs = attr.split('.')
@@ -133,54 +153,113 @@ class ShowRecordKeeper:
         return int.from_bytes(hash_obj.digest(), 'big')
 
 
-    def is_updated(self, show: 'Show') -> bool:
+    def __get_episode_fingerprints(self, show: 'Show') -> dict[str, str]:
         """
-        Determine whether the given show is an update on the recorded
-        config.
+        Get the fingerprints of all the given show's Episodes. Each
+        fingerprint is based on the show's hash, and the resolved title
+        text, season text, extras, and source of that Episode.
 
         Args:
-            show: Show object being evaluated.
+            show: Show object whose Episodes to fingerprint.
 
         Returns:
-            True if the given show is different from the recorded show.
-            False if the show is identical OR if there is no existing
-            record.
+            Dictionary of Episode keys to (hex) fingerprints.
         """
 
-        # Condition to get the hash of this show
-        condition = (
+        show_hash = self.__get_show_hash(show)
+        card_class = show.card_class
+
+        fingerprints = {}
+        for key, episode in show.episodes.items():
+            hash_obj = sha256()
+            self.__get_record_hash(hash_obj, show_hash)
+
+            # Hash the resolved title and season text
+            extras = show.extras | episode.extra_characteristics
+            self.__get_record_hash(hash_obj, TitleCard.get_title_text(
+                episode, show.profile, card_class.TITLE_CHARACTERISTICS, extras,
+            ))
+            self.__get_record_hash(hash_obj, show.profile.get_season_text(
+                episode.episode_info,
+                getattr(card_class, 'SEASON_TEXT_FORMATTER', None),
+            ))
+
+            # Hash the extras in a deterministic order
+            self.__get_record_hash(hash_obj, sorted(extras.items()))
+
+            # Hash the source, and its size if the card uses unique sources
+            self.__get_record_hash(hash_obj, episode.source)
+            if card_class.USES_UNIQUE_SOURCES:
+                try:
+                    self.__get_record_hash(hash_obj, episode.source.stat().st_size)
+                except OSError:
+                    self.__get_record_hash(hash_obj, None)
+
+            fingerprints[key] = hash_obj.hexdigest()[:self.FINGERPRINT_LENGTH]
+
+        return fingerprints
+
+
+    @staticmethod
+    def __get_condition(show: 'Show') -> QueryLike:
+        """Get the condition to get the record of the given show."""
+
+        return (
             (where('series') == show.series_info.full_name) &
             (where('directory') == str(show.media_directory.resolve()))
         )
 
-        # If this show has an existing hash, check for equality
-        if self.records.contains(condition):
-            existing_hash = self.records.get(condition)['hash']
-            new_hash = self.__get_show_hash(show)
 
-            return existing_hash != new_hash
+    def get_updated_episodes(self, show: 'Show') -> list[str]:
+        """
+        Get the Episodes of the given show whose config has changed
+        from the recorded config.
+
+        Args:
+            show: Show object being evaluated.
+
+        Returns:
+            List of the keys of all Episodes whose fingerprint differs
+            from the recorded fingerprint. Episodes without an existing
+            fingerprint are not included. If the record has no Episode
+            fingerprints, then all Episodes are returned if the show's
+            hash differs from the recorded hash.
+        """
+
+        # If there is no existing record for this show, nothing is updated
+        if (record := self.records.get(self.__get_condition(show))) is None:
+            return []
 
-        # No existing hash
-        return False
+        # Record predates fingerprints, compare the whole show
+        if (existing := record.get('episodes')) is None:
+            show_hash = self.__get_show_hash(
+                show, self.LEGACY_HASH_RELEVANT_ATTRIBUTES
+            )
+            if record.get('hash') == show_hash:
+                return []
+            return list(show.episodes)
+
+        # Compare all new fingerprints against the existing ones
+        return [
+            key
+            for key, fingerprint in self.__get_episode_fingerprints(show).items()
+            if existing.get(key, fingerprint) != fingerprint
+        ]
 
 
     def add_config(self, show: 'Show') -> None:
         """
-        Add the given show's hash to this object's record database.
+        Add the given show's hash and Episode fingerprints to this
+        object's record database.
 
         Args:
             show: Show object being evaluated.
         """
 
-        # Condition to get the hash of this show
-        condition = (
-            (where('series') == show.series_info.full_name) &
-            (where('directory') == str(show.media_directory.resolve()))
-        )
-
         # Either insert or update hash of this show
         self.records.upsert({
             'series': show.series_info.full_name,
             'directory': str(show.media_directory.resolve()),
             'hash': self.__get_show_hash(show),
-        }, condition)
+            'episodes': self.__get_episode_fingerprints(show),
+        }, self.__get_condition(show))
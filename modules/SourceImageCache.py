@@ -0,0 +1,189 @@
+from hashlib import sha256
+from os import replace, utime
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, Optional
+
+from modules.Debug import log
+
+if TYPE_CHECKING:
+    from modules.ImageMagickInterface import ImageMagickInterface
+
+
+class SourceImageCache:
+    """
+    This class describes a size-bounded, on-disk cache of preprocessed
+    (resized and styled) source images. Cached images are stored in
+    ImageMagick's memory-mappable MPC format, so reading them requires
+    no decoding, resizing, or styling.
+
+    Entries are keyed by the content hash of the source image and the
+    exact preprocessing commands - which include the title card size,
+    blur profile, and grayscale modifiers - so an edited source image or
+    different style results in a new entry. Once the cache exceeds its
+    size, the least recently used entries are deleted - except for any
+    entries used within the last `IN_USE_DURATION` seconds, as these may
+    still be read by a card being rendered (by any thread or process).
+    """
+
+    """Directory where all cached images are stored"""
+    CACHE_DIRECTORY = Path(__file__).parent / '.objects' / 'source_cache'
+
+    """How long (in seconds) after its last use an image cannot be evicted"""
+    IN_USE_DURATION = 300
+
+    __slots__ = ('directory', 'size', '__hashes', '__lock')
+
+
+    def __init__(self, size: int, directory: Path = CACHE_DIRECTORY) -> None:
+        """
+        Initialize this cache.
+
+        Args:
+            size: Maximum size (in bytes) of all cached images.
+            directory: Directory to store cached images in.
+        """
+
+        self.directory = directory
+        self.size = size
+        self.__hashes: dict[tuple[str, int, int], str] = {}
+        self.__lock = Lock()
+
+
+    def __get_source_hash(self, source: Path) -> str:
+        """
+        Get the content hash of the given source image. Hashes are
+        stored by file path, size, and modification time so that each
+        unmodified file is only read once.
+
+        Args:
+            source: Path to the source image to hash.
+
+        Returns:
+            Hex digest of the file's contents.
+
+        Raises:
+            OSError if the file cannot be read.
+        """
+
+        stat = source.stat()
+        file_key = (str(source), stat.st_size, stat.st_mtime_ns)
+        if (source_hash := self.__hashes.get(file_key)) is None:
+            source_hash = sha256(source.read_bytes()).hexdigest()
+            self.__hashes[file_key] = source_hash
+
+        return source_hash
+
+
+    def __evict(self, keep: Path, reserve: int = 0) -> None:
+        """
+        Delete the least recently used images until there is room for
+        the given number of bytes. Images used within the last
+        `IN_USE_DURATION` seconds are never deleted.
+
+        Args:
+            keep: Image which is being returned, and is never deleted.
+            reserve: Size (in bytes) of the image being added to the
+                cache.
+        """
+
+        with self.__lock:
+            entries = []
+            for image in self.directory.glob('*.mpc'):
+                # Skip images still being created
+                if '.' in image.stem:
+                    continue
+                try:
+                    cache = image.with_suffix('.cache')
+                    size = image.stat().st_size
+                    if cache.exists():
+                        size += cache.stat().st_size
+                    entries.append((image.stat().st_mtime, size, image))
+                except OSError:
+                    continue
+
+            total_size = reserve + sum(size for _, size, _ in entries)
+            in_use = time() - self.IN_USE_DURATION
+            for modified, size, image in sorted(entries):
+                if total_size <= self.size:
+                    break
+                if image == keep or modified > in_use:
+                    continue
+
+                image.unlink(missing_ok=True)
+                image.with_suffix('.cache').unlink(missing_ok=True)
+                total_size -= size
+                log.debug(f'Evicted cached source image "{image.name}"')
+
+
+    def get(self,
+            image_magick: 'ImageMagickInterface',
+            source: Path,
+            commands: list[str],
+        ) -> Optional[Path]:
+        """
+        Get the cached version of the given source image with the given
+        preprocessing commands applied. If not cached, the image is
+        created (with the given interface) and cached.
+
+        Args:
+            image_magick: Interface to create uncached images with.
+            source: Path to the source image.
+            commands: ImageMagick commands to preprocess the source
+                image with.
+
+        Returns:
+            Path to the cached MPC image. None if the source does not
+            exist, could not be preprocessed, or cannot be cached - in
+            which case the source should be preprocessed directly.
+        """
+
+        # Determine key of this image
+        try:
+            source_hash = self.__get_source_hash(source)
+        except OSError:
+            return None
+        command = ' '.join(filter(None, commands))
+        key = sha256(f'{source_hash}\0{command}'.encode()).hexdigest()
+
+        # Already cached, mark as recently used
+        image = self.directory / f'{key}.mpc'
+        if image.exists() and image.with_suffix('.cache').exists():
+            try:
+                utime(image)
+                return image
+            except OSError:
+                pass
+
+        # Create preprocessed image under a temporary name
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_image = image_magick.get_random_filename(image, 'mpc')
+        image_magick.run(' '.join([
+            f'convert "{source.resolve()}"',
+            command,
+            f'"{temp_image.resolve()}"',
+        ]))
+
+        # Skip caching images which can never fit in the cache
+        temp_cache = temp_image.with_suffix('.cache')
+        if not (temp_image.exists() and temp_cache.exists()):
+            image_magick.delete_intermediate_images(temp_image, temp_cache)
+            return None
+        size = temp_image.stat().st_size + temp_cache.stat().st_size
+        if size > self.size:
+            image_magick.delete_intermediate_images(temp_image, temp_cache)
+            return None
+
+        # Make room for this image, then move pixel cache before header so
+        # the entry is never partial
+        self.__evict(image, size)
+        replace(temp_cache, image.with_suffix('.cache'))
+        replace(temp_image, image)
+        log.debug(f'Cached preprocessed source "{source.resolve()}"')
+
+        # Entry may have been deleted (e.g. by another process)
+        if not (image.exists() and image.with_suffix('.cache').exists()):
+            return None
+
+        return image
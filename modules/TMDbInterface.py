@@ -1,9 +1,13 @@
+from concurrent.futures import Future
+from copy import copy
 from datetime import datetime, timedelta
 from pathlib import Path
 from sys import exit as sys_exit
+from threading import local, Lock, RLock
 from typing import Any, Callable, Iterable, Optional
 
-from tinydb import Query, where
+from tinydb import where
+from tinydb.table import Document
 from tmdbapis import TMDbAPIs, NotFound, Unauthorized, TMDbException
 from tmdbapis.objs.reload import Episode as TMDbEpisode
 from tmdbapis.objs.image import Still as TMDbStill
@@ -13,9 +17,13 @@ from modules.Debug import log
 from modules.EpisodeDataSource import EpisodeDataSource
 from modules.EpisodeInfo import EpisodeInfo
 from modules.PersistentDatabase import PersistentDatabase
+from modules.RateLimitedSession import RateLimitedSession
+from modules.RequestExecutor import RequestExecutor
 from modules.SeriesInfo import SeriesInfo
 from modules.WebInterface import WebInterface
 
+BlacklistKey = tuple[str, Optional[int], Optional[int]]
+
 
 def catch_and_log(
         message: str,
@@ -56,11 +64,22 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
     initialized  with a valid API key, the primary purpose of this class
     is to gather images for title cards, logos for summaries, or
     translations for titles.
+
+    All requests are limited to TMDb's rate limit, and can be made
+    concurrently with `submit()`. Because tmdbapis objects are not
+    thread-safe, each thread uses its own API object.
     """
 
     """Default for how many failed requests lead to a blacklisted entry"""
     BLACKLIST_THRESHOLD = 5
 
+    """Maximum requests per second (TMDb allows ~50 per second per IP)"""
+    REQUESTS_PER_SECOND = 40
+
+    """Default and maximum (TMDb allows 20 connections) concurrent requests"""
+    REQUEST_WORKERS = RequestExecutor.DEFAULT_WORKERS
+    MAX_REQUEST_WORKERS = 20
+
     """Series ID's that can be set by TMDb"""
     SERIES_IDS = ('imdb_id', 'tmdb_id', 'tvdb_id', 'tvrage_id')
 
@@ -156,13 +175,25 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
     """Filename for where to store blacklisted entries"""
     __BLACKLIST_DB = 'tmdb_blacklist.json'
 
+    """How long after expiring temporary blacklist entries are deleted"""
+    EXPIRED_BLACKLIST_AGE = timedelta(days=30)
 
-    def __init__(self, api_key: str) -> None:
+    """Request executors (by worker count) shared by all interfaces"""
+    __executors: dict[int, RequestExecutor] = {}
+    __executors_lock = Lock()
+
+
+    def __init__(self,
+            api_key: str,
+            request_workers: int = REQUEST_WORKERS,
+        ) -> None:
         """
         Construct a new instance of an interface to TMDb.
 
         Args:
             api_key: The API key to communicate with TMDb.
+            request_workers: Maximum number of concurrent requests made
+                by `submit()`.
 
         Raises:
             SystemExit (1): The API key is invalid.
@@ -170,16 +201,28 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
 
         super().__init__('TMDb')
 
+        # Rate limit (and deduplicate) all requests, get request executor
+        self.session = RateLimitedSession(self.REQUESTS_PER_SECOND)
+        self.__executor = self.__get_executor(
+            min(request_workers, self.MAX_REQUEST_WORKERS)
+        )
+
         # Store global objects
         self.preferences = global_objects.pp
         self.info_set = global_objects.info_set
 
-        # Create/read blacklist database
+        # Create/read blacklist database, entries are read per-series
         self.__blacklist = PersistentDatabase(self.__BLACKLIST_DB)
+        self.__series_blacklists: dict[str, dict[BlacklistKey, dict]] = {}
+        self.__modified_blacklist: set[tuple[str, BlacklistKey]] = set()
+        self.__blacklist_lock = RLock()
 
-        # Create API object, validate key
+        # Create API object, validate key; other threads use copies of it
+        self.__local = local()
         try:
-            self.api = TMDbAPIs(api_key, self.session)
+            self.__api = self.__local.api = TMDbAPIs(
+                api_key, session=self.session,
+            )
         except Unauthorized:
             log.critical(f'TMDb API key "{api_key}" is invalid')
             sys_exit(1)
@@ -191,37 +234,114 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
         return f'<TMDbInterface {self.api=}>'
 
 
-    def __get_condition(self,
-            query_type: str,
+    @staticmethod
+    def __get_executor(workers: int) -> RequestExecutor:
+        """
+        Get the request executor with the given number of workers. One
+        executor is shared by all interfaces, so repeated runs (and
+        previews) re-use the same threads.
+        """
+
+        with TMDbInterface.__executors_lock:
+            if (executor := TMDbInterface.__executors.get(workers)) is None:
+                executor = RequestExecutor(workers, 'TCMTMDb')
+                TMDbInterface.__executors[workers] = executor
+
+            return executor
+
+
+    @property
+    def api(self) -> TMDbAPIs:
+        """
+        The TMDb API object of the current thread. Each thread's object
+        is a copy of the initial (configured) API object, with its own
+        request state, so the configuration is not requested again.
+        """
+
+        if (api := getattr(self.__local, 'api', None)) is None:
+            api = copy(self.__api)
+            api._api = copy(self.__api._api) # pylint: disable=protected-access
+            self.__local.api = api
+
+        return api
+
+
+    def submit(self, function: Callable, /, *args, **kwargs) -> Future:
+        """
+        Submit the given function (e.g. a method of this interface) to
+        be called concurrently with the given arguments.
+
+        >>> futures = [
+        ...     tmdb_interface.submit(
+        ...         tmdb_interface.get_episode_title, series_info, info
+        ...     ) for info in episode_infos
+        ... ]
+        >>> titles = [future.result() for future in futures]
+
+        Args:
+            function: Function to call.
+            args: Positional arguments to call the function with.
+            kwargs: Keyword arguments to call the function with.
+
+        Returns:
+            Future whose result is the return of the function.
+        """
+
+        return self.__executor.submit(function, *args, **kwargs)
+
+
+    def __get_series_blacklist(self,
             series_info: SeriesInfo,
+        ) -> dict[BlacklistKey, dict[str, Any]]:
+        """
+        Get the blacklist entries of the given series. All entries of a
+        series are read from the blacklist database the first time the
+        series is accessed, and all subsequent accesses are in memory.
+
+        Args:
+            series_info: SeriesInfo whose entries to get.
+
+        Returns:
+            Dictionary of blacklist keys to entries of the given series.
+        """
+
+        with self.__blacklist_lock:
+            if (entries := self.__series_blacklists.get(
+                    series_info.full_name)) is None:
+                entries = self.__series_blacklists[series_info.full_name] = {
+                    (entry['query'], entry.get('season'), entry.get('episode')):
+                        entry
+                    for entry in self.__blacklist.search(
+                        where('series') == series_info.full_name
+                    )
+                }
+
+            return entries
+
+
+    @staticmethod
+    def __get_key(
+            query_type: str,
             episode_info: Optional[EpisodeInfo] = None,
-        ) -> Query:
+        ) -> BlacklistKey:
         """
-        Get the tinydb query condition for the given query.
+        Get the blacklist key for the given query.
 
         Args:
             query_type: The type of request being updated.
-            series_info: SeriesInfo for the request.
             episode_info: EpisodeInfo for the request.
 
         Returns:
-            The condition that matches the given query type, series, and
-            Episode season + episode number and episode.
+            The key that identifies the given query type and Episode
+            season + episode number within a series.
         """
 
         # Logo and backdrop queries don't use episode index
         if query_type in ('logo', 'backdrop'):
-            return (
-                (where('query') == query_type) &
-                (where('series') == series_info.full_name)
-            )
+            return query_type, None, None
 
-        # Query by series name and episode index
         return (
-            (where('query') == query_type) &
-            (where('series') == series_info.full_name) &
-            (where('season') == episode_info.season_number) &
-            (where('episode') == episode_info.episode_number)
+            query_type, episode_info.season_number, episode_info.episode_number
         )
 
 
@@ -232,8 +352,8 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
         ) -> None:
         """
         Adds the given request to the blacklist; indicating that this
-        exact request shouldn't be queried to TMDb for another day.
-        Write the updated blacklist to file.
+        exact request shouldn't be queried to TMDb for another day. The
+        updated blacklist is written to file with `write_blacklist()`.
 
         Args:
             series_info: SeriesInfo for the request.
@@ -242,36 +362,65 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
         """
 
         # Get the entry for this request
-        condition = self.__get_condition(query_type, series_info, episode_info)
-        entry = self.__blacklist.get(condition)
+        key = self.__get_key(query_type, episode_info)
+        entries = self.__get_series_blacklist(series_info)
 
         # If previously indexed and next has passed, increase count and set next
         later = (datetime.now() + timedelta(hours=12)).timestamp()
 
         # If this entry exists, check that next has passed
-        if entry is not None:
-            if datetime.now().timestamp() >= entry['next']:
-                self.__blacklist.upsert(
-                    {'failures': entry['failures']+1, 'next': later},
-                    condition
-                )
-        else:
-            if query_type in ('logo', 'backdrop'):
-                self.__blacklist.upsert({
-                    'query': query_type,
-                    'series': series_info.full_name,
-                    'failures': 1,
-                    'next': later,
-                }, condition)
+        with self.__blacklist_lock:
+            if (entry := entries.get(key)) is not None:
+                if datetime.now().timestamp() >= entry['next']:
+                    entry.update({'failures': entry['failures']+1, 'next': later})
+                    self.__modified_blacklist.add((series_info.full_name, key))
             else:
-                self.__blacklist.upsert({
+                entry = entries[key] = {
                     'query': query_type,
                     'series': series_info.full_name,
-                    'season': episode_info.season_number,
-                    'episode': episode_info.episode_number,
                     'failures': 1,
                     'next': later,
-                }, condition)
+                }
+                if query_type not in ('logo', 'backdrop'):
+                    entry['season'] = episode_info.season_number
+                    entry['episode'] = episode_info.episode_number
+                self.__modified_blacklist.add((series_info.full_name, key))
+
+
+    def write_blacklist(self) -> None:
+        """
+        Write all updated blacklist entries to the blacklist database,
+        and delete any long-expired (non-permanent) entries of all read
+        series. All changes are written in a single batch.
+        """
+
+        expired = (datetime.now() - self.EXPIRED_BLACKLIST_AGE).timestamp()
+        with self.__blacklist_lock, self.__blacklist.batch():
+            # Write all updated entries
+            for series, key in self.__modified_blacklist:
+                entries = self.__series_blacklists.get(series, {})
+                if (entry := entries.get(key)) is None:
+                    continue
+                if isinstance(entry, Document):
+                    self.__blacklist.update(dict(entry), doc_ids=[entry.doc_id])
+                else:
+                    doc_id = self.__blacklist.insert(entry)
+                    entries[key] = Document(entry, doc_id)
+            self.__modified_blacklist.clear()
+
+            # Delete expired entries
+            expired_ids = []
+            for entries in self.__series_blacklists.values():
+                for key, entry in list(entries.items()):
+                    if (isinstance(entry, Document)
+                        and entry['failures'] <= self.preferences.tmdb_retry_count
+                        and entry['next'] < expired):
+                        expired_ids.append(entry.doc_id)
+                        del entries[key]
+            if expired_ids:
+                self.__blacklist.remove(doc_ids=expired_ids)
+                log.debug(f'Deleted {len(expired_ids)} expired blacklist '
+                          f'entries')
 
 
     def __is_blacklisted(self,
@@ -293,8 +442,8 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
         """
 
         # Get the blacklist entry for this request
-        entry = self.__blacklist.get(
-            self.__get_condition(query_type, series_info, episode_info)
+        entry = self.__get_series_blacklist(series_info).get(
+            self.__get_key(query_type, episode_info)
         )
 
         # If request DNE, not blacklisted
@@ -326,8 +475,8 @@ class TMDbInterface(EpisodeDataSource, WebInterface):
         """
 
         # Get the blacklist entry for this request
-        entry = self.__blacklist.get(
-            self.__get_condition(query_type, series_info, episode_info)
+        entry = self.__get_series_blacklist(series_info).get(
+            self.__get_key(query_type, episode_info)
         )
 
         # If request hasn't been blacklisted, not blacklisted
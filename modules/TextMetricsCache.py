@@ -0,0 +1,165 @@
+from atexit import register as atexit_register
+from collections import OrderedDict
+from hashlib import sha256
+from json import JSONDecodeError, dump, load
+from os import getpid, replace
+from pathlib import Path
+from shlex import split as command_split
+from threading import Lock
+from typing import Optional
+
+from modules.Debug import log
+
+
+class TextMetricsCache:
+    """
+    This class describes a persistent, size-bounded cache of the text
+    metrics reported by ImageMagick. Entries are keyed by the normalized
+    measurement command - which contains the font, pointsize, kerning,
+    interline spacing, density, and text - as well as the modification
+    time of any font files, so that changing a font file invalidates its
+    metrics.
+
+    The least recently used entries are evicted once the cache is full.
+    The cache is read from disk on initialization and written back with
+    `flush()` (and automatically at exit).
+    """
+
+    """File (within the database directory) the cache is stored in"""
+    CACHE_FILE = 'text_metrics.json'
+
+    """Default maximum number of cached measurements"""
+    DEFAULT_SIZE = 10000
+
+    __slots__ = ('file', 'size', '__entries', '__lock', '__modified')
+
+
+    def __init__(self,
+            database_directory: Path,
+            size: int = DEFAULT_SIZE,
+        ) -> None:
+        """
+        Initialize this cache, reading any existing entries from disk.
+
+        Args:
+            database_directory: Directory to read/write the cache file
+                from/to.
+            size: Maximum number of measurements to cache.
+        """
+
+        self.file = database_directory / self.CACHE_FILE
+        self.size = size
+        self.__entries: OrderedDict[str, dict[str, list[int]]] = OrderedDict()
+        self.__lock = Lock()
+        self.__modified = False
+
+        # Read existing cache file
+        if self.file.exists():
+            try:
+                with self.file.open('r', encoding='utf-8') as file_handle:
+                    self.__entries.update(load(file_handle))
+            except (OSError, JSONDecodeError, TypeError, ValueError):
+                log.warning(f'Text metrics cache is corrupted - resetting')
+                self.__entries.clear()
+            log.debug(f'Read {len(self.__entries)} cached text metrics')
+
+        atexit_register(self.flush)
+
+
+    def __len__(self) -> int:
+        """Number of measurements in this cache."""
+
+        return len(self.__entries)
+
+
+    @staticmethod
+    def get_key(command: str) -> str:
+        """
+        Get the cache key of the given measurement command. The command
+        is split into its arguments (so formatting whitespace does not
+        matter), and the modification time of each font file is added.
+
+        Args:
+            command: ImageMagick measurement command to get the key of.
+
+        Returns:
+            Hex digest of the normalized command.
+        """
+
+        try:
+            arguments = command_split(command)
+        except ValueError:
+            arguments = command.split()
+
+        # Add font file modification times so edited fonts are re-measured
+        for index, argument in enumerate(arguments[:-1]):
+            if argument == '-font':
+                try:
+                    mtime = Path(arguments[index + 1]).stat().st_mtime_ns
+                    arguments.append(f'mtime={mtime}')
+                except OSError:
+                    pass
+
+        return sha256('\0'.join(arguments).encode()).hexdigest()
+
+
+    def get(self, command: str) -> Optional[dict[str, list[int]]]:
+        """
+        Get the cached metrics of the given measurement command.
+
+        Args:
+            command: ImageMagick measurement command.
+
+        Returns:
+            Cached metrics, or None if the command is not cached.
+        """
+
+        key = self.get_key(command)
+        with self.__lock:
+            if (metrics := self.__entries.get(key)) is not None:
+                self.__entries.move_to_end(key)
+
+            return metrics
+
+
+    def set(self, command: str, metrics: dict[str, list[int]]) -> None:
+        """
+        Cache the given metrics for the given measurement command. This
+        evicts the least recently used entries if the cache is full.
+
+        Args:
+            command: ImageMagick measurement command.
+            metrics: Metrics of the command to cache.
+        """
+
+        key = self.get_key(command)
+        with self.__lock:
+            self.__entries[key] = metrics
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.size:
+                self.__entries.popitem(last=False)
+            self.__modified = True
+
+
+    def flush(self) -> None:
+        """
+        Write this cache to disk if it has been modified. The cache is
+        written to a temporary file which then replaces the cache file,
+        so a partial write never corrupts the cache.
+        """
+
+        with self.__lock:
+            if not self.__modified:
+                return None
+
+            temp_file = self.file.with_name(f'.{self.file.name}.{getpid()}.tmp')
+            try:
+                self.file.parent.mkdir(parents=True, exist_ok=True)
+                with temp_file.open('w', encoding='utf-8') as file_handle:
+                    dump(self.__entries, file_handle)
+                replace(temp_file, self.file)
+                self.__modified = False
+            except OSError:
+                log.exception(f'Unable to write text metrics cache')
+
+        return None
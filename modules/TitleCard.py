@@ -119,7 +119,9 @@ class TitleCard:
         'white border': WhiteBorderTitleCard,
     }
 
-    __slots__ = ('episode', 'profile', 'converted_title', 'maker', 'file')
+    __slots__ = (
+        'episode', 'profile', 'converted_title', 'maker', 'file', '__kwargs',
+    )
 
 
     def __init__(self,
@@ -146,22 +148,11 @@ class TitleCard:
         self.episode = episode
         self.profile = profile
 
-        # Apply the given profile to the Title
-        self.converted_title = episode.episode_info.title.apply_profile(
-            profile, **title_characteristics
+        # Apply the given profile and any formatting to the Title
+        self.converted_title = self.get_title_text(
+            episode, profile, title_characteristics, extra_characteristics
         )
 
-        # Apply any custom title text formatting if supplied
-        if 'title_text_format' in extra_characteristics:
-            try:
-                self.converted_title = extra_characteristics['title_text_format'].format(
-                    title_text=self.converted_title,
-                    **self.episode.episode_info.characteristics,
-                    **extra_characteristics,
-                )
-            except Exception as exc:
-                log.error(f'Invalid title text format - {exc}')
-
         # Initialize this episode's CardType instance
         kwargs = {
             'source_file': episode.source,
@@ -179,6 +170,7 @@ class TitleCard:
         } | profile.font.attributes \
           | self.episode.episode_info.indices \
           | extra_characteristics
+        self.__kwargs = kwargs
 
         try:
             self.maker = self.episode.card_class(**kwargs)
@@ -190,6 +182,49 @@ class TitleCard:
         self.file = episode.destination
 
 
+    @staticmethod
+    def get_title_text(
+            episode: 'Episode',
+            profile: 'Profile',
+            title_characteristics: dict,
+            extra_characteristics: dict,
+        ) -> str:
+        """
+        Get the title text of the given Episode's card. This is the
+        title with the given profile applied, and then formatted with
+        any custom title text format.
+
+        Args:
+            episode: The episode whose title text to get.
+            profile: The profile to apply to the title.
+            title_characteristics: Dictionary of characteristics from
+                the CardType class to pass to Title.apply_profile().
+            extra_characteristics: Any extra characteristics of the
+                card, including an optional title_text_format.
+
+        Returns:
+            The converted title text.
+        """
+
+        # Apply the given profile to the Title
+        title_text = episode.episode_info.title.apply_profile(
+            profile, **title_characteristics
+        )
+
+        # Apply any custom title text formatting if supplied
+        if 'title_text_format' in extra_characteristics:
+            try:
+                title_text = extra_characteristics['title_text_format'].format(
+                    title_text=title_text,
+                    **episode.episode_info.characteristics,
+                    **extra_characteristics,
+                )
+            except Exception as exc:
+                log.error(f'Invalid title text format - {exc}')
+
+        return title_text
+
+
     @staticmethod
     def get_output_filename(
             format_string: str,
@@ -356,6 +391,16 @@ class TitleCard:
         # Create parent folders if necessary for this card
         self.file.parent.mkdir(parents=True, exist_ok=True)
 
+        # If an identical card was already created, restore it
+        cache_key = None
+        if (render_cache := global_objects.render_cache) is not None:
+            cache_key = render_cache.get_key(
+                self.episode.card_class, self.__kwargs
+            )
+            if cache_key is not None and render_cache.restore(cache_key, self.file):
+                log.debug(f'Created card "{self.file.resolve()}" from cache')
+                return True
+
         # Create card
         try:
             self.maker.create()
@@ -366,6 +411,8 @@ class TitleCard:
         # Return whether card creation was successful or not
         if self.file.exists():
             log.debug(f'Created card "{self.file.resolve()}"')
+            if cache_key is not None:
+                render_cache.store(cache_key, self.file)
             return True
 
         # Card doesn't exist, log commands to debug
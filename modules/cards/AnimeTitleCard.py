@@ -419,9 +419,9 @@ class AnimeTitleCard(BaseCardType):
 
         contrast = [f'-modulate 100,125']
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and optionally blur source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Increase contrast of source image
             *contrast,
             # Overlay gradient
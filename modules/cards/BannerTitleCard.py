@@ -365,9 +365,9 @@ class BannerTitleCard(BaseCardType):
         """Create this object's defined Title Card."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Add text and banner
             *self.title_text_commands,
             *self.index_text_commands,
@@ -592,9 +592,9 @@ class ComicBookTitleCard(BaseCardType):
         """Create this object's defined Title Card."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # # Draw title text rectangles
             *self.title_text_box_commands,
             # Draw index text rectangles
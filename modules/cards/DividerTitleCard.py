@@ -384,9 +384,9 @@ class DividerTitleCard(BaseCardType):
         divider_height = self.divider_height
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Add blurred stroke behind the title text
             f'-background transparent',
             f'-bordercolor transparent',
@@ -374,9 +374,9 @@ class FormulaOneTitleCard(BaseCardType):
         """Create this object's defined Title Card."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             *self.static_commands,
             *self.race_commands,
             *self.episode_text_commands,
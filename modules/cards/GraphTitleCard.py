@@ -587,10 +587,10 @@ class GraphTitleCard(BaseCardType):
         """Create this object's defined Title Card."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             f'-density 100',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Overlay gradient
             *self.gradient_commands,
             # Draw the graph
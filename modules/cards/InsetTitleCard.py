@@ -327,9 +327,9 @@ class InsetTitleCard(BaseCardType):
         """Create this object's defined Title Card."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Add gradient overlay
             *self.gradient_commands,
             # Add title text with a drop shadow
@@ -187,8 +187,8 @@ class LandscapeTitleCard(BaseCardType):
         """Only resize and apply style to this source image."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
-            *self.resize_and_style,
+            f'convert',
+            *self.styled_source,
             *self.darken_commands((0, 0, 0, 0)),
             f'"{self.output_file.resolve()}"',
         ])
@@ -396,9 +396,9 @@ class LandscapeTitleCard(BaseCardType):
 
         # Generate command to create card
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply any style modifiers
-            *self.resize_and_style,
+            *self.styled_source,
             # Add box or image darkening
             *self.darken_commands(bounding_box),
             # Add title text
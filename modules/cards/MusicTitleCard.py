@@ -899,10 +899,10 @@ class MusicTitleCard(BaseCardType):
         """Create this object's defined Title Card."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             f'-density 100',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Add background player glass
             *self.glass_command,
             # Add the indicated album cover art/logo
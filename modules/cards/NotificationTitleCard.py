@@ -397,10 +397,10 @@ class NotificationTitleCard(BaseCardType):
         """Create this object's defined Title Card."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             f'-density 100',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Add background player glass
             *self.get_glass_commands(
                 self.title_text_commands,
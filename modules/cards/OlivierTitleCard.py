@@ -323,8 +323,8 @@ class OlivierTitleCard(BaseCardType):
         """Create the title card as defined by this object."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
-            *self.resize_and_style,
+            f'convert',
+            *self.styled_source,
             # Overlay gradient
             *self.gradient_commands,
             # Add text
@@ -394,9 +394,9 @@ class OverlineTitleCard(BaseCardType):
         )
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Add gradient overlay
             *self.gradient_commands,
             # Add text
@@ -1123,9 +1123,9 @@ class ShapeTitleCard(BaseCardType):
         """
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Overlay gradient
             *self.gradient_commands,
             # Add each component of the image
@@ -38,6 +38,9 @@ class StandardTitleCard(BaseCardType):
     """Standard class has standard archive name"""
     ARCHIVE_NAME = 'standard'
 
+    """This class can render directly at the global card dimensions"""
+    SUPPORTS_NATIVE_RESOLUTION = True
+
     """Default fonts and color for series count text"""
     SEASON_COUNT_FONT = REF_DIRECTORY / 'Proxima Nova Semibold.otf'
     EPISODE_COUNT_FONT = REF_DIRECTORY / 'Proxima Nova Regular.otf'
@@ -125,28 +128,30 @@ class StandardTitleCard(BaseCardType):
             return []
 
         # Base commands
-        size = 67.75 * self.episode_text_font_size
+        size = self.scaled(67.75 * self.episode_text_font_size)
         base_commands = [
             f'-background transparent',
-            f'-kerning 5.42',
+            f'-kerning {self.scaled(5.42)}',
             f'-pointsize {size:.2f}',
-            f'-interword-spacing 14.5',
+            f'-interword-spacing {self.scaled(14.5)}',
             f'-gravity north',
         ]
 
         # Sub-command for adding season/episode text
-        y = 1555 + self.episode_text_vertical_shift
+        y = self.scaled_offset(1555 + self.episode_text_vertical_shift)
+        stroke_width = self.scaled(6)
+        primary_stroke_width = self.scaled(0.75)
         if self.hide_season_text:
             return [
                 *base_commands,
                 f'-font "{self.EPISODE_COUNT_FONT.resolve()}"',
                 f'-fill black',
                 f'-stroke black',
-                f'-strokewidth 6',
+                f'-strokewidth {stroke_width}',
                 f'-annotate +0{y:+} "{self.episode_text}"',
                 f'-fill "{self.episode_text_color}"',
                 f'-stroke "{self.episode_text_color}"',
-                f'-strokewidth 0.75',
+                f'-strokewidth {primary_stroke_width}',
                 f'-annotate +0{y:+} "{self.episode_text}"',
             ]
 
@@ -156,14 +161,14 @@ class StandardTitleCard(BaseCardType):
                 # Black stroke behind primary text
                 f'-fill black',
                 f'-stroke black',
-                f'-strokewidth 6',
+                f'-strokewidth {stroke_width}',
                 # Add season text
                 f'-font "{self.SEASON_COUNT_FONT.resolve()}"',
                 f'-annotate +0{y:+} "{self.season_text}"',
                 # Primary text
                 f'-fill "{self.episode_text_color}"',
                 f'-stroke "{self.episode_text_color}"',
-                f'-strokewidth 0.75',
+                f'-strokewidth {primary_stroke_width}',
                 # Add season text
                 f'-annotate +0{y:+} "{self.season_text}"',
             ]
@@ -174,7 +179,7 @@ class StandardTitleCard(BaseCardType):
             # Black stroke behind primary text
             f'\( -fill black',
             f'-stroke black',
-            f'-strokewidth 6',
+            f'-strokewidth {stroke_width}',
             # Add season text
             f'-font "{self.SEASON_COUNT_FONT.resolve()}"',
             f'label:"{self.season_text} {self.separator}"',
@@ -182,7 +187,7 @@ class StandardTitleCard(BaseCardType):
             f'-font "{self.EPISODE_COUNT_FONT.resolve()}"',
             f'label:"{self.episode_text}"',
             # Combine season+episode text into one "image"
-            f'+smush 25 \)',
+            f'+smush {self.scaled_offset(25)} \)',
             # Add season+episode text "image" to source image
             f'-gravity north',
             f'-geometry +0{y:+}',
@@ -191,17 +196,17 @@ class StandardTitleCard(BaseCardType):
             f'-gravity center',
             f'\( -fill "{self.episode_text_color}"',
             f'-stroke "{self.episode_text_color}"',
-            f'-strokewidth 0.75',
+            f'-strokewidth {primary_stroke_width}',
             # Add season text
             f'-font "{self.SEASON_COUNT_FONT.resolve()}"',
             f'label:"{self.season_text} {self.separator}"',
             # Add episode text
             f'-font "{self.EPISODE_COUNT_FONT.resolve()}"',
             f'label:"{self.episode_text}"',
-            f'+smush 30 \)',
+            f'+smush {self.scaled_offset(30)} \)',
             # Add text to source image
             f'-gravity north',
-            f'-geometry +0{y+2:+}',
+            f'-geometry +0{y + self.scaled_offset(2):+}',
             f'-composite',
         ]
 
@@ -214,8 +219,8 @@ class StandardTitleCard(BaseCardType):
         if self.font_stroke_width == 0:
             return []
 
-        stroke_width = 3.0 * self.font_stroke_width
-        vertical_shift = 245 + self.font_vertical_shift
+        stroke_width = self.scaled(3.0 * self.font_stroke_width)
+        vertical_shift = self.scaled_offset(245 + self.font_vertical_shift)
 
         return [
             f'-fill "{self.stroke_color}"',
@@ -313,24 +318,24 @@ class StandardTitleCard(BaseCardType):
         """
 
         # Font customizations
-        font_size = 157.41 * self.font_size
-        interline_spacing = -22 + self.font_interline_spacing
-        interword_spacing = 50 + self.font_interword_spacing
-        kerning = -1.25 * self.font_kerning
-        vertical_shift = 245 + self.font_vertical_shift
+        font_size = self.scaled(157.41 * self.font_size)
+        interline_spacing = self.scaled(-22 + self.font_interline_spacing)
+        interword_spacing = self.scaled(50 + self.font_interword_spacing)
+        kerning = self.scaled(-1.25 * self.font_kerning)
+        vertical_shift = self.scaled_offset(245 + self.font_vertical_shift)
 
         # Sub-command to optionally add gradient
         gradient_command = []
         if not self.omit_gradient:
             gradient_command = [
-                f'"{self.__GRADIENT_IMAGE.resolve()}"',
+                *self.scaled_image(self.__GRADIENT_IMAGE),
                 f'-composite',
             ]
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and optionally blur source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Overlay gradient
             *gradient_command,
             # Global title text options
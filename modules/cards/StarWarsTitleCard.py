@@ -240,9 +240,9 @@ class StarWarsTitleCard(BaseCardType):
         """Create the title card as defined by this object."""
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles
-            *self.resize_and_style,
+            *self.styled_source,
             # Overlay star gradient
             f'"{self.__STAR_GRADIENT_IMAGE.resolve()}"',
             f'-composite',
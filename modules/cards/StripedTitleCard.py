@@ -683,10 +683,10 @@ class StripedTitleCard(BaseCardType):
         mask = self._create_polygon_mask()
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             f'-density 100',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Create mask
             f'\( -size "{self.TITLE_CARD_SIZE}"',
             f'xc:"{self.overlay_color}" \)',
@@ -636,9 +636,9 @@ class TintedFrameTitleCard(BaseCardType):
             return None
 
         command = ' '.join([
-            f'convert "{self.source_file.resolve()}"',
+            f'convert',
             # Resize and apply styles to source image
-            *self.resize_and_style,
+            *self.styled_source,
             # Add blurred edges (if indicated)
             *self.blur_commands,
             # Add remaining sub-components
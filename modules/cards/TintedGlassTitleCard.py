@@ -97,7 +97,7 @@ class TintedGlassTitleCard(BaseCardType):
         super().__init__(blur, grayscale, preferences=preferences)
 
         # Store object attributes
-        self.source = source_file
+        self.source_file = source_file
         self.output_file = card_file
 
         self.title_text = self.image_magick.escape_chars(title_text)
@@ -418,9 +418,9 @@ class TintedGlassTitleCard(BaseCardType):
 
         # Generate command to create card
         command = ' '.join([
-            f'convert "{self.source.resolve()}"',
+            f'convert',
             # Resize and apply any style modifiers
-            *self.resize_and_style,
+            *self.styled_source,
             # Blur area behind title text
             *self.blur_rectangle_command(
                 title_box_coordinates,
@@ -431,7 +431,7 @@ class TintedGlassTitleCard(BaseCardType):
             # Add episode text
             *self.episode_text_commands(title_box_coordinates),
             # Attempt to overlay mask
-            *self.add_overlay_mask(self.source),
+            *self.add_overlay_mask(self.source_file),
             # Create card
             *self.resize_output,
             f'"{self.output_file.resolve()}"',
@@ -3,9 +3,13 @@ from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from modules.FontValidator import FontValidator
+    from modules.ImageMagickTelemetry import ImageMagickTelemetry
     from modules.MediaInfoSet import MediaInfoSet
     from modules.PreferenceParser import PreferenceParser
+    from modules.RenderCache import RenderCache
     from modules.ShowRecordKeeper import ShowRecordKeeper
+    from modules.SourceImageCache import SourceImageCache
+    from modules.TextMetricsCache import TextMetricsCache
 
 
 class TemporaryPreferenceParser:
@@ -20,11 +24,30 @@ class TemporaryPreferenceParser:
         """Fake initialize this object"""
 
         self.card_dimensions = '3200x1800'
+        self.native_resolution = False
         self.card_quality = 95
         self.database_directory = Path(database_directory)
+        self.database_backend = 'tinydb'
         self.imagemagick_container = None
+        self.imagemagick_timeout = 60
+        self.imagemagick_workers = 0
+        self.imagemagick_text_engine = 'imagemagick'
+        self.imagemagick_text_engine_tolerance = 2
         self.use_magick_prefix = False
 
+    @property
+    def imagemagick_arguments(self) -> dict:
+        """Arguments for initializing a ImageMagickInterface"""
+
+        return {
+            'container': self.imagemagick_container,
+            'use_magick_prefix': self.use_magick_prefix,
+            'timeout': self.imagemagick_timeout,
+            'workers': self.imagemagick_workers,
+            'text_engine': self.imagemagick_text_engine,
+            'text_engine_tolerance': self.imagemagick_text_engine_tolerance,
+        }
+
 # pylint: disable=global-statement
 pp = TemporaryPreferenceParser(Path(__file__).parent / '.objects')
 def set_preference_parser(to: 'PreferenceParser') -> None: # type: ignore
@@ -53,3 +76,31 @@ def set_show_record_keeper(to: 'ShowRecordKeeper') -> None: # type: ignore
 
     global show_record_keeper
     show_record_keeper = to
+
+text_metrics_cache: Optional['TextMetricsCache'] = None
+def set_text_metrics_cache(to: 'TextMetricsCache') -> None: # type: ignore
+    """Update the global TextMetricsCache `text_metrics_cache` object."""
+
+    global text_metrics_cache
+    text_metrics_cache = to
+
+source_image_cache: Optional['SourceImageCache'] = None
+def set_source_image_cache(to: 'SourceImageCache') -> None: # type: ignore
+    """Update the global SourceImageCache `source_image_cache` object."""
+
+    global source_image_cache
+    source_image_cache = to
+
+render_cache: Optional['RenderCache'] = None
+def set_render_cache(to: 'RenderCache') -> None: # type: ignore
+    """Update the global RenderCache `render_cache` object."""
+
+    global render_cache
+    render_cache = to
+
+imagemagick_telemetry: Optional['ImageMagickTelemetry'] = None
+def set_imagemagick_telemetry(to: 'ImageMagickTelemetry') -> None: # type: ignore
+    """Update the global ImageMagickTelemetry `imagemagick_telemetry` object."""
+
+    global imagemagick_telemetry
+    imagemagick_telemetry = to
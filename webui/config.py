@@ -7,9 +7,13 @@ from threading import Lock
 from typing import Optional
 
 from modules.FontValidator import FontValidator
+from modules.ImageMagickTelemetry import ImageMagickTelemetry
 from modules.MediaInfoSet import MediaInfoSet
 from modules.PreferenceParser import PreferenceParser
+from modules.RenderCache import RenderCache
 from modules.ShowRecordKeeper import ShowRecordKeeper
+from modules.SourceImageCache import SourceImageCache
+from modules.TextMetricsCache import TextMetricsCache
 from modules import global_objects
 
 
@@ -116,6 +120,22 @@ def create_app_context() -> AppContext:
     global_objects.set_show_record_keeper(
         ShowRecordKeeper(parser.database_directory)
     )
+    if parser.text_metrics_cache_size > 0:
+        global_objects.set_text_metrics_cache(
+            TextMetricsCache(
+                parser.database_directory, parser.text_metrics_cache_size
+            )
+        )
+    if parser.source_cache_size > 0:
+        global_objects.set_source_image_cache(
+            SourceImageCache(parser.source_cache_size)
+        )
+    if parser.render_cache_size > 0:
+        global_objects.set_render_cache(RenderCache(parser.render_cache_size))
+    if parser.imagemagick_telemetry:
+        global_objects.set_imagemagick_telemetry(
+            ImageMagickTelemetry(parser.database_directory)
+        )
 
     return AppContext(
         preference_parser=parser,
@@ -115,6 +115,8 @@ def generate_preview(
 
     episode = next(iter(show.episodes.values()))
     show.select_source_images(select_only=episode)
+    if manager.tmdb_interface is not None:
+        manager.tmdb_interface.write_blacklist()
 
     if not episode.source.exists():
         raise RuntimeError("Episode source image is missing; run sync first")